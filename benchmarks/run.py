@@ -0,0 +1,205 @@
+"""
+Backtest throughput benchmarks.
+
+    python -m benchmarks.run --output benchmark.json
+
+Every measurement is written as one record with the benchmark name, its
+parameters, the elapsed seconds, the throughput and (unless --no-memory) the
+peak traced memory, so the output of two releases can be compared.
+"""
+
+import argparse
+import json
+import platform
+import time
+import tracemalloc
+import uuid
+from datetime import datetime, timezone
+from importlib.metadata import version
+from typing import Any, Callable
+
+import numpy as np
+import pandas as pd
+
+from benchmarks.strategies import REFERENCE_STRATEGIES
+from benchmarks.synthetic import generate_candles
+from dijkies.entities import Order, State
+from dijkies.executors import BacktestExchangeAssetClient
+from dijkies.performance import (
+    DrawDown,
+    MetricsEngine,
+    NormalizedReturnOnInvestment,
+    ReturnOnInvestment,
+    SharpeRatio,
+)
+
+
+def measure(function: Callable[[], Any], trace_memory: bool) -> dict[str, float]:
+    started_at = time.perf_counter()
+    function()
+    measurement = {"seconds": time.perf_counter() - started_at}
+
+    if trace_memory:
+        tracemalloc.start()
+        function()
+        measurement["peak_memory_bytes"] = tracemalloc.get_traced_memory()[1]
+        tracemalloc.stop()
+    return measurement
+
+
+def new_executor() -> BacktestExchangeAssetClient:
+    state = State(base="BTC", total_base=1, total_quote=50_000)
+    return BacktestExchangeAssetClient(state, 0.0025, 0.0015)
+
+
+def benchmark_backtests(
+    lengths: list[int], lookbacks: list[int], strategies: list[str], trace_memory: bool
+) -> list[dict[str, Any]]:
+    records = []
+    for length in lengths:
+        for lookback in lookbacks:
+            candles = generate_candles(length + lookback, seed=length)
+            for name in strategies:
+                strategy_class = REFERENCE_STRATEGIES[name]
+                measurement = measure(
+                    lambda: strategy_class(new_executor(), lookback).backtest(candles),
+                    trace_memory,
+                )
+                records.append(
+                    {
+                        "benchmark": "strategy_backtest",
+                        "strategy": name,
+                        "number_of_candles": length,
+                        "lookback_in_minutes": lookback,
+                        "candles_per_second": length / measurement["seconds"],
+                        **measurement,
+                    }
+                )
+    return records
+
+
+def benchmark_state(
+    numbers_of_orders: list[int], trace_memory: bool
+) -> list[dict[str, Any]]:
+    records = []
+    for number_of_orders in numbers_of_orders:
+        state = State(base="BTC", total_base=1e6, total_quote=1e9)
+        for i in range(number_of_orders):
+            state.add_order(
+                Order(
+                    order_id=str(uuid.uuid4()),
+                    exchange="backtest",
+                    time_created=0,
+                    market="BTC",
+                    side="buy" if i % 2 == 0 else "sell",
+                    limit_price=1000 + i,
+                    on_hold=1,
+                    status="open",
+                    is_taker=False,
+                )
+            )
+        last_order_id = state.orders[-1].order_id
+
+        operations = {
+            "open_orders": lambda: state.open_orders,
+            "base_available": lambda: state.base_available,
+            "quote_available": lambda: state.quote_available,
+            "total_fee_paid": lambda: state.total_fee_paid,
+            "get_order": lambda: state.get_order(last_order_id),
+        }
+        repetitions = 100
+        for operation, function in operations.items():
+            measurement = measure(
+                lambda: [function() for _ in range(repetitions)], trace_memory
+            )
+            records.append(
+                {
+                    "benchmark": "state_operation",
+                    "operation": operation,
+                    "number_of_orders": number_of_orders,
+                    "operations_per_second": repetitions / measurement["seconds"],
+                    **measurement,
+                }
+            )
+    return records
+
+
+def benchmark_metrics(lengths: list[int], trace_memory: bool) -> list[dict[str, Any]]:
+    metrics = [
+        DrawDown(),
+        ReturnOnInvestment(),
+        NormalizedReturnOnInvestment(1),
+        SharpeRatio(0.02, 1),
+    ]
+    records = []
+    for length in lengths:
+        equity_curve = generate_candles(length, seed=length).close
+        for metric in metrics:
+            measurement = measure(lambda: metric.calculate(equity_curve), trace_memory)
+            records.append(
+                {
+                    "benchmark": "metric",
+                    "metric": metric.metric_name,
+                    "number_of_candles": length,
+                    "candles_per_second": length / measurement["seconds"],
+                    **measurement,
+                }
+            )
+        engine = MetricsEngine(metrics)
+        measurement = measure(lambda: engine.calculate(equity_curve), trace_memory)
+        records.append(
+            {
+                "benchmark": "metric",
+                "metric": "metrics_engine",
+                "number_of_candles": length,
+                "candles_per_second": length / measurement["seconds"],
+                **measurement,
+            }
+        )
+    return records
+
+
+def environment() -> dict[str, str]:
+    return {
+        "dijkies": version("dijkies"),
+        "python": platform.python_version(),
+        "numpy": np.__version__,
+        "pandas": pd.__version__,
+        "platform": platform.platform(),
+        "time": datetime.now(timezone.utc).isoformat(),
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--lengths", type=int, nargs="+", default=[1_000, 5_000])
+    parser.add_argument("--lookbacks", type=int, nargs="+", default=[60, 240])
+    parser.add_argument(
+        "--strategies",
+        nargs="+",
+        default=list(REFERENCE_STRATEGIES),
+        choices=list(REFERENCE_STRATEGIES),
+    )
+    parser.add_argument(
+        "--numbers-of-orders", type=int, nargs="+", default=[10, 100, 1_000]
+    )
+    parser.add_argument("--metric-lengths", type=int, nargs="+", default=[100_000])
+    parser.add_argument("--no-memory", action="store_true")
+    parser.add_argument("--output", default="benchmark.json")
+    args = parser.parse_args()
+
+    trace_memory = not args.no_memory
+    records = (
+        benchmark_backtests(args.lengths, args.lookbacks, args.strategies, trace_memory)
+        + benchmark_state(args.numbers_of_orders, trace_memory)
+        + benchmark_metrics(args.metric_lengths, trace_memory)
+    )
+
+    with open(args.output, "w") as file:
+        json.dump({"environment": environment(), "records": records}, file, indent=2)
+
+    print(pd.DataFrame(records).to_string())
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,93 @@
+from pandas.core.frame import DataFrame as PandasDataFrame
+from ta.momentum import RSIIndicator
+
+from dijkies.executors import ExchangeAssetClient
+from dijkies.interfaces import Strategy
+
+
+class NoOpStrategy(Strategy):
+    """
+    does nothing, measures the overhead of the backtest loop itself.
+    """
+
+    analysis_dataframe_size_in_minutes = None
+
+    def __init__(
+        self, executor: ExchangeAssetClient, analysis_dataframe_size_in_minutes: int
+    ) -> None:
+        self.analysis_dataframe_size_in_minutes = analysis_dataframe_size_in_minutes
+        super().__init__(executor)
+
+    def execute(self, candle_df: PandasDataFrame) -> None:
+        pass
+
+
+class RSICrossoverStrategy(NoOpStrategy):
+    """
+    the RSI strategy of the README, recomputing the RSI on every window.
+    """
+
+    lower_threshold = 35
+    higher_threshold = 65
+
+    def execute(self, candle_df: PandasDataFrame) -> None:
+        rsi = RSIIndicator(candle_df.close).rsi()
+        previous_rsi, current_rsi = rsi.iloc[-2], rsi.iloc[-1]
+
+        if previous_rsi > self.lower_threshold > current_rsi:
+            self.executor.place_market_buy_order(
+                self.state.base, self.state.quote_available
+            )
+        if previous_rsi < self.higher_threshold < current_rsi:
+            self.executor.place_market_sell_order(
+                self.state.base, self.state.base_available
+            )
+
+
+class LimitOrderGridStrategy(NoOpStrategy):
+    """
+    keeps a grid of resting limit orders around the price: number_of_levels
+    buy orders below and sell orders above, each step_fraction apart. Filled
+    levels are placed again on the next candle.
+    """
+
+    number_of_levels = 20
+    step_fraction = 0.001
+
+    def execute(self, candle_df: PandasDataFrame) -> None:
+        price = candle_df.close.iloc[-1]
+        buy_prices = {round(o.limit_price, 8) for o in self.state.buy_orders}
+        sell_prices = {round(o.limit_price, 8) for o in self.state.sell_orders}
+        quote_per_level = self.state.total_quote / (4 * self.number_of_levels)
+        base_per_level = self.state.total_base / (4 * self.number_of_levels)
+
+        for level in range(1, self.number_of_levels + 1):
+            buy_price = round(price * (1 - level * self.step_fraction), 8)
+            if (
+                buy_price not in buy_prices
+                and self.state.quote_available > quote_per_level
+            ):
+                self.executor.place_limit_buy_order(
+                    self.state.base, buy_price, quote_per_level
+                )
+            sell_price = round(price * (1 + level * self.step_fraction), 8)
+            if (
+                sell_price not in sell_prices
+                and self.state.base_available > base_per_level
+            ):
+                self.executor.place_limit_sell_order(
+                    self.state.base, sell_price, base_per_level
+                )
+
+        lowest_buy = price * (1 - 2 * self.number_of_levels * self.step_fraction)
+        highest_sell = price * (1 + 2 * self.number_of_levels * self.step_fraction)
+        for order in self.state.open_orders:
+            if not lowest_buy <= order.limit_price <= highest_sell:
+                self.executor.cancel_order(order)
+
+
+REFERENCE_STRATEGIES = {
+    "noop": NoOpStrategy,
+    "rsi_crossover": RSICrossoverStrategy,
+    "limit_order_grid": LimitOrderGridStrategy,
+}
@@ -0,0 +1,54 @@
+import numpy as np
+import pandas as pd
+from pandas.core.frame import DataFrame as PandasDataFrame
+
+
+def generate_candles(
+    number_of_candles: int,
+    interval_in_minutes: int = 1,
+    seed: int = 0,
+    start_price: float = 50_000.0,
+    start_time: str = "2024-01-01",
+    volatilities: tuple[float, ...] = (0.0005, 0.002),
+    regime_switch_probability: float = 0.001,
+    drift: float = 0.0,
+) -> PandasDataFrame:
+    """
+    seeded random walk of OHLCV candles. The volatility of the log returns
+    switches between the given regimes with regime_switch_probability per
+    candle, so the series alternates between calm and turbulent periods.
+    """
+    rng = np.random.default_rng(seed)
+
+    switches = rng.random(number_of_candles) < regime_switch_probability
+    regime = np.cumsum(switches) % len(volatilities)
+    volatility = np.asarray(volatilities)[regime]
+
+    log_returns = drift + volatility * rng.standard_normal(number_of_candles)
+    close = start_price * np.exp(np.cumsum(log_returns))
+    open_ = np.concatenate([[start_price], close[:-1]])
+
+    wick = volatility * np.abs(rng.standard_normal((2, number_of_candles)))
+    high = np.maximum(open_, close) * (1 + wick[0])
+    low = np.minimum(open_, close) * (1 - wick[1])
+    volume = rng.lognormal(mean=0.0, sigma=0.5, size=number_of_candles) * (
+        volatility / volatilities[0]
+    )
+
+    time = pd.date_range(
+        start_time,
+        periods=number_of_candles,
+        freq=pd.Timedelta(minutes=interval_in_minutes),
+        tz="UTC",
+    )
+
+    return pd.DataFrame(
+        {
+            "time": time,
+            "open": open_,
+            "high": high,
+            "low": low,
+            "close": close,
+            "volume": volume,
+        }
+    )
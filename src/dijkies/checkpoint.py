@@ -0,0 +1,109 @@
+import os
+import pickle
+import time
+from pathlib import Path
+from typing import Optional
+
+from pandas.core.frame import DataFrame as PandasDataFrame
+
+from dijkies.interfaces import Strategy
+from dijkies.performance import PerformanceRecorder
+
+
+class BacktestCheckpoint:
+    """
+    periodically saves a running backtest: the strategy, its executor (and
+    with it the state) and the performance recorded so far. A checkpoint is
+    written after every_n_candles candles or every_seconds of wall time,
+    whichever comes first. resume() continues an interrupted backtest.
+
+    The performance rows are appended to a side file next to path, so a save
+    only writes the rows recorded since the previous save.
+    """
+
+    def __init__(
+        self,
+        path: Path,
+        every_n_candles: Optional[int] = None,
+        every_seconds: Optional[float] = None,
+    ) -> None:
+        if every_n_candles is None and every_seconds is None:
+            raise ValueError("set every_n_candles and/or every_seconds")
+        self.path = Path(path)
+        self.rows_path = self.path.with_suffix(self.path.suffix + ".rows")
+        self.every_n_candles = every_n_candles
+        self.every_seconds = every_seconds
+        self._candles_since_save = 0
+        self._last_save = time.monotonic()
+        self._rows_saved = 0
+        self._rows_file_size = 0
+
+    def step(self, strategy: Strategy, recorder: PerformanceRecorder) -> None:
+        self._candles_since_save += 1
+        is_due = (
+            self.every_n_candles is not None
+            and self._candles_since_save >= self.every_n_candles
+        ) or (
+            self.every_seconds is not None
+            and time.monotonic() - self._last_save >= self.every_seconds
+        )
+        if is_due:
+            self.save(strategy, recorder)
+
+    def _append_rows(self, recorder: PerformanceRecorder) -> None:
+        # bytes after _rows_file_size belong to a save that did not complete
+        # and are overwritten
+        mode = "r+b" if self._rows_file_size > 0 and self.rows_path.exists() else "wb"
+        with open(self.rows_path, mode) as file:
+            file.truncate(self._rows_file_size)
+            file.seek(self._rows_file_size)
+            pickle.dump(recorder.rows(self._rows_saved, recorder.size), file)
+            self._rows_file_size = file.tell()
+        self._rows_saved = recorder.size
+
+    def save(self, strategy: Strategy, recorder: PerformanceRecorder) -> None:
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._append_rows(recorder)
+
+        temporary_path = self.path.with_suffix(self.path.suffix + ".tmp")
+        with open(temporary_path, "wb") as file:
+            pickle.dump(
+                {
+                    "strategy": strategy,
+                    "executor": strategy.executor,
+                    "recorder": recorder.empty_copy(),
+                    "rows_saved": self._rows_saved,
+                    "rows_file_size": self._rows_file_size,
+                },
+                file,
+            )
+        os.replace(temporary_path, self.path)
+        self._candles_since_save = 0
+        self._last_save = time.monotonic()
+
+    def exists(self) -> bool:
+        return self.path.exists()
+
+    def load(self) -> tuple[Strategy, PerformanceRecorder]:
+        with open(self.path, "rb") as file:
+            checkpoint = pickle.load(file)
+        strategy = checkpoint["strategy"]
+        strategy.executor = checkpoint["executor"]
+
+        recorder = checkpoint["recorder"]
+        with open(self.rows_path, "rb") as file:
+            while file.tell() < checkpoint["rows_file_size"]:
+                recorder.append_rows(pickle.load(file))
+
+        self._rows_saved = checkpoint["rows_saved"]
+        self._rows_file_size = checkpoint["rows_file_size"]
+        return strategy, recorder
+
+    def resume(self, data: PandasDataFrame) -> PandasDataFrame:
+        """
+        continues the backtest after the last checkpointed candle. data should
+        be the same data the backtest was started with.
+        """
+        strategy, recorder = self.load()
+        data = strategy._validate_backtest_data(data)
+        return strategy._run_backtest(data, checkpoint=self, recorder=recorder)
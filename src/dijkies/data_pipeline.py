@@ -1,7 +1,10 @@
+from typing import Optional
+
 import pandas as pd
 from pandas.core.frame import DataFrame as PandasDataFrame
 
 from dijkies.interfaces import DataPipeline, ExchangeMarketAPI
+from dijkies.resampling import CandleResampler
 
 
 class NoDataPipeline(DataPipeline):
@@ -20,19 +23,37 @@ class CurrentValueDataPipeline(DataPipeline):
 
 
 class OHLCVDataPipeline(DataPipeline):
+    """
+    fetches candles of candle_interval_in_minutes. When a resampler is given,
+    candles of base_interval_in_minutes are fetched instead and resampled, so
+    intervals the exchange does not offer can be used.
+    """
+
     def __init__(
         self,
         exchange_market_api: ExchangeMarketAPI,
         base: str,
         candle_interval_in_minutes: int,
         lookback_in_minutes: int,
+        resampler: Optional[CandleResampler] = None,
+        base_interval_in_minutes: int = 1,
     ) -> None:
         self.exchange_market_api = exchange_market_api
         self.base = base
         self.candle_interval_in_minutes = candle_interval_in_minutes
         self.lookback_in_minutes = lookback_in_minutes
+        self.resampler = resampler
+        self.base_interval_in_minutes = base_interval_in_minutes
 
     def run(self) -> PandasDataFrame:
-        return self.exchange_market_api.get_candles(
-            self.base, self.candle_interval_in_minutes, self.lookback_in_minutes
+        if getattr(self, "resampler", None) is None:
+            return self.exchange_market_api.get_candles(
+                self.base, self.candle_interval_in_minutes, self.lookback_in_minutes
+            )
+
+        candles = self.exchange_market_api.get_candles(
+            self.base,
+            self.base_interval_in_minutes,
+            self.lookback_in_minutes + self.candle_interval_in_minutes,
         )
+        return self.resampler.resample(candles, self.candle_interval_in_minutes)
@@ -0,0 +1,114 @@
+from typing import Optional
+
+import numpy as np
+import pandas as pd
+from pandas.core.frame import DataFrame as PandasDataFrame
+
+from dijkies.exceptions import InvalidCandleIntervalError, IrregularCandleSpacingError
+from dijkies.interfaces import validate_candle_columns
+from dijkies.windows import NANOSECONDS_PER_MINUTE, time_to_int64
+
+
+class CandleDataset:
+    """
+    candles that passed validation once: OHLCV columns, sorted by time and one
+    candle per time. Backtests and sweeps accept a CandleDataset in place of
+    a DataFrame and skip validation. When the dataset is regular, all candles
+    are interval_in_minutes apart and analysis windows are found by index
+    arithmetic instead of time comparisons.
+
+    The dataset trusts data not to change after validation.
+    """
+
+    def __init__(
+        self,
+        data: PandasDataFrame,
+        interval_in_minutes: int,
+        gaps: PandasDataFrame,
+        is_regular: bool,
+        number_of_duplicates: int = 0,
+    ) -> None:
+        self.data = data
+        self.interval_in_minutes = interval_in_minutes
+        self.gaps = gaps
+        self.is_regular = is_regular
+        self.number_of_duplicates = number_of_duplicates
+
+    def __len__(self) -> int:
+        return len(self.data)
+
+    @classmethod
+    def validate(
+        cls,
+        data: PandasDataFrame,
+        interval_in_minutes: Optional[int] = None,
+        fill_gaps: bool = False,
+    ) -> "CandleDataset":
+        """
+        sorts data by time and keeps the last candle of duplicate times. The
+        interval defaults to the smallest spacing in data. Gaps are reported in
+        gaps; with fill_gaps they are filled with flat candles at the previous
+        close and zero volume.
+        """
+        validate_candle_columns(data)
+        if not data.time.is_monotonic_increasing:
+            data = data.sort_values("time", kind="stable")
+
+        times = time_to_int64(data.time)
+        last_of_time = np.r_[times[1:] != times[:-1], True]
+        number_of_duplicates = int(len(times) - last_of_time.sum())
+        if number_of_duplicates:
+            data = data[last_of_time]
+            times = times[last_of_time]
+        data = data.reset_index(drop=True)
+
+        spacing = np.diff(times)
+        if interval_in_minutes is None:
+            interval_in_minutes = (
+                int(spacing.min() // NANOSECONDS_PER_MINUTE) if len(spacing) else 1
+            )
+        interval = interval_in_minutes * NANOSECONDS_PER_MINUTE
+        if interval <= 0 or (len(spacing) and spacing.min() < interval):
+            raise InvalidCandleIntervalError(interval_in_minutes)
+
+        gap_positions = np.flatnonzero(spacing != interval)
+        gaps = pd.DataFrame(
+            {
+                "start": data.time.iloc[gap_positions].reset_index(drop=True),
+                "end": data.time.iloc[gap_positions + 1].reset_index(drop=True),
+                "missing_candles": spacing[gap_positions] // interval - 1,
+            }
+        )
+
+        is_regular = gaps.empty
+        if fill_gaps and not is_regular:
+            if np.any(spacing[gap_positions] % interval):
+                raise IrregularCandleSpacingError(interval_in_minutes)
+            data = _fill_gaps(data, times, interval_in_minutes)
+            is_regular = True
+
+        return cls(data, interval_in_minutes, gaps, is_regular, number_of_duplicates)
+
+
+def _fill_gaps(
+    data: PandasDataFrame, times: np.ndarray, interval_in_minutes: int
+) -> PandasDataFrame:
+    """
+    reindexes data on a regular grid, missing candles repeat the previous
+    close with zero volume.
+    """
+    positions = (times - times[0]) // (interval_in_minutes * NANOSECONDS_PER_MINUTE)
+    present = np.zeros(positions[-1] + 1, dtype=bool)
+    present[positions] = True
+    source = np.cumsum(present) - 1
+
+    filled = data.iloc[source].reset_index(drop=True)
+    filled["time"] = data.time.iloc[0] + pd.to_timedelta(
+        np.arange(len(filled)) * interval_in_minutes, unit="min"
+    )
+    missing = ~present
+    close = filled.close.to_numpy()
+    for name in ("open", "high", "low"):
+        filled.loc[missing, name] = close[missing]
+    filled.loc[missing, "volume"] = 0.0
+    return filled
@@ -4,6 +4,8 @@ import pickle
 import shutil
 from pathlib import Path
 
+import pandas as pd
+
 from dijkies.constants import ASSET_HANDLING, BOT_STATUS, SUPPORTED_EXCHANGES
 from dijkies.interfaces import (
     CredentialsRepository,
@@ -121,6 +123,8 @@ class Bot:
 
         try:
             strategy.run(data)
+            if "close" in data.columns and len(data) and pd.notna(data.close.iloc[-1]):
+                strategy.update_online_metrics(data.close.iloc[-1])
             self.strategy_repository.store(
                 strategy, person_id, exchange, bot_id, status
             )
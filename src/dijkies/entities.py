@@ -1,6 +1,8 @@
-from typing import Literal, Optional, Union
+from abc import abstractmethod
+from typing import Any, Literal, Optional, Union
 
-from pydantic import BaseModel
+import numpy as np
+from pydantic import BaseModel, PrivateAttr
 
 from dijkies.constants import SUPPORTED_EXCHANGES
 from dijkies.exceptions import (
@@ -45,72 +47,491 @@ class Order(BaseModel):
         return not self.is_equal(order)
 
 
-class State(BaseModel):
-    base: str
-    total_base: float
-    total_quote: float
-    orders: list[Order] = []
+class ClosedOrderArchive:
+    """
+    append-only columnar store of filled and cancelled orders. Every field of
+    Order is a NumPy column, missing values are NaN or MISSING_TIME. The
+    number of filled orders and the fees paid are kept as counters, so they
+    are available without reading the columns.
+    """
+
+    MISSING_TIME = np.iinfo(np.int64).min
+    float_fields = (
+        "on_hold",
+        "limit_price",
+        "actual_price",
+        "filled",
+        "filled_quote",
+        "fee",
+    )
+    time_fields = ("time_created", "time_canceled", "time_filled")
+    text_fields = ("order_id", "exchange", "market")
+
+    def __init__(self, capacity: int = 1024) -> None:
+        self.size = 0
+        self.number_of_filled_orders = 0
+        self.total_fee_paid = 0.0
+        self._allocate(max(capacity, 1))
+
+    def _allocate(self, capacity: int) -> None:
+        self.capacity = capacity
+        for field in self.float_fields:
+            setattr(self, field, np.empty(capacity, dtype=np.float64))
+        for field in self.time_fields:
+            setattr(self, field, np.empty(capacity, dtype=np.int64))
+        for field in self.text_fields:
+            setattr(self, field, np.empty(capacity, dtype=object))
+        self.is_buy = np.empty(capacity, dtype=bool)
+        self.is_filled = np.empty(capacity, dtype=bool)
+        self.is_taker = np.empty(capacity, dtype=bool)
+
+    def _fields(self) -> tuple[str, ...]:
+        return (
+            self.float_fields
+            + self.time_fields
+            + self.text_fields
+            + ("is_buy", "is_filled", "is_taker")
+        )
+
+    def _grow(self) -> None:
+        old = {field: getattr(self, field)[: self.size] for field in self._fields()}
+        self._allocate(self.capacity * 2)
+        for field, values in old.items():
+            getattr(self, field)[: self.size] = values
+
+    def __len__(self) -> int:
+        return self.size
+
+    def __getstate__(self):
+        state = self.__dict__.copy()
+        for field in self._fields():
+            state[field] = state[field][: self.size]
+        state["capacity"] = self.size
+        return state
+
+    def append(self, order: Order) -> None:
+        if order.is_open:
+            raise ValueError("only filled and cancelled orders can be archived")
+        if self.size == self.capacity:
+            self._grow()
+        row = self.size
+        for field in self.float_fields:
+            value = getattr(order, field)
+            getattr(self, field)[row] = np.nan if value is None else value
+        for field in self.time_fields:
+            value = getattr(order, field)
+            getattr(self, field)[row] = self.MISSING_TIME if value is None else value
+        for field in self.text_fields:
+            getattr(self, field)[row] = getattr(order, field)
+        self.is_buy[row] = order.side == "buy"
+        self.is_filled[row] = order.is_filled
+        self.is_taker[row] = order.is_taker
+        self.size += 1
+
+        if order.is_filled:
+            self.number_of_filled_orders += 1
+            self.total_fee_paid += order.fee
+
+    def _order(self, row: int) -> Order:
+        fields = {}
+        for field in self.float_fields:
+            value = float(getattr(self, field)[row])
+            fields[field] = None if np.isnan(value) else value
+        for field in self.time_fields:
+            value = int(getattr(self, field)[row])
+            fields[field] = None if value == self.MISSING_TIME else value
+        for field in self.text_fields:
+            fields[field] = getattr(self, field)[row]
+        return Order(
+            side="buy" if self.is_buy[row] else "sell",
+            status="filled" if self.is_filled[row] else "cancelled",
+            is_taker=bool(self.is_taker[row]),
+            **fields,
+        )
+
+    def get_order(self, order_id: str) -> Optional[Order]:
+        """
+        copy of the archived order with order_id, None when it is not archived.
+        """
+        rows = np.flatnonzero(self.order_id[: self.size] == order_id)
+        if len(rows) > 1:
+            raise MultipleOrdersFoundError(order_id)
+        return self._order(int(rows[0])) if len(rows) == 1 else None
+
+    def orders(self, filled: bool) -> list[Order]:
+        """
+        copies of the archived filled (or cancelled) orders.
+        """
+        rows = np.flatnonzero(self.is_filled[: self.size] == filled)
+        return [self._order(int(row)) for row in rows]
+
+
+ORDER_EVENT_FIELDS = (
+    "order_id",
+    "market",
+    "side",
+    "status",
+    "is_taker",
+    "limit_price",
+    "on_hold",
+    "filled",
+    "filled_quote",
+    "fee",
+)
+
+
+class OrderLedger(BaseModel):
+    """
+    order bookkeeping shared by State and PortfolioState. Subclasses define
+    the orders field and how a fill changes their balances.
+
+    Orders are indexed by id and status, and the amounts on hold and the fees
+    paid are kept as running totals, so none of the properties scan orders.
+    The index is maintained by add_order, cancel_order and
+    process_filled_order, and rebuilt when orders is appended to or replaced
+    directly. Changing the status of an order directly is not noticed.
+    """
+
+    # the status collections map the position of an order in orders to it
+    _indexed_orders: Optional[list[Order]] = PrivateAttr(default=None)
+    _position_by_id: dict[str, int] = PrivateAttr(default_factory=dict)
+    _duplicate_ids: set[str] = PrivateAttr(default_factory=set)
+    _open: dict[int, Order] = PrivateAttr(default_factory=dict)
+    _open_buy: dict[int, Order] = PrivateAttr(default_factory=dict)
+    _open_sell: dict[int, Order] = PrivateAttr(default_factory=dict)
+    _open_sell_count: dict[str, int] = PrivateAttr(default_factory=dict)
+    _filled: dict[int, Order] = PrivateAttr(default_factory=dict)
+    _cancelled: dict[int, Order] = PrivateAttr(default_factory=dict)
+    _quote_on_hold: float = PrivateAttr(default=0.0)
+    _base_on_hold: dict[str, float] = PrivateAttr(default_factory=dict)
+    _total_fee_paid: float = PrivateAttr(default=0.0)
+    _archive: Optional[ClosedOrderArchive] = PrivateAttr(default=None)
+    _max_closed_orders: Optional[int] = PrivateAttr(default=None)
+    _archive_generation: int = PrivateAttr(default=0)
+    _order_events: Optional[list[tuple]] = PrivateAttr(default=None)
+
+    def __eq__(self, other: object) -> bool:
+        # the index is a cache of the fields and is left out of equality,
+        # pydantic would compare the private attributes too
+        if not isinstance(other, BaseModel):
+            return NotImplemented
+        return self.__class__ is other.__class__ and self.__dict__ == other.__dict__
+
+    def _ensure_index(self) -> dict[str, Any]:
+        """
+        returns the private attributes, the hot paths read the index from
+        it directly because attribute access of private attributes is slow.
+        """
+        index = self.__pydantic_private__
+        if (
+            index is None
+            or index.get("_indexed_orders") is not self.orders
+            or len(index["_open"]) + len(index["_filled"]) + len(index["_cancelled"])
+            != len(self.orders)
+        ):
+            self._rebuild_index()
+            index = self.__pydantic_private__
+        return index
+
+    def _rebuild_index(self) -> None:
+        # also restores the private attributes of states pickled before the
+        # index existed
+        if self.__pydantic_private__ is None:
+            self.__pydantic_private__ = {}
+        self.__pydantic_private__.update(
+            _indexed_orders=self.orders,
+            _position_by_id={},
+            _duplicate_ids=set(),
+            _open={},
+            _open_buy={},
+            _open_sell={},
+            _open_sell_count={},
+            _filled={},
+            _cancelled={},
+            _quote_on_hold=0.0,
+            _base_on_hold={},
+            _total_fee_paid=0.0,
+        )
+        for position, order in enumerate(self.orders):
+            self._index_order_id(position, order)
+            self._index_status(position, order)
+
+    def _index_order_id(self, position: int, order: Order) -> None:
+        index = self.__pydantic_private__
+        if order.order_id in index["_position_by_id"]:
+            index["_duplicate_ids"].add(order.order_id)
+        index["_position_by_id"][order.order_id] = position
+
+    def _index_status(self, position: int, order: Order) -> None:
+        index = self.__pydantic_private__
+        if order.is_open:
+            index["_open"][position] = order
+            if order.side == "buy":
+                index["_open_buy"][position] = order
+                index["_quote_on_hold"] += order.on_hold
+            else:
+                index["_open_sell"][position] = order
+                index["_open_sell_count"][order.market] = (
+                    index["_open_sell_count"].get(order.market, 0) + 1
+                )
+                index["_base_on_hold"][order.market] = (
+                    index["_base_on_hold"].get(order.market, 0.0) + order.on_hold
+                )
+        elif order.is_filled:
+            index["_filled"][position] = order
+            index["_total_fee_paid"] += order.fee
+        else:
+            index["_cancelled"][position] = order
+
+    def _unindex_status(self, position: int, order: Order) -> None:
+        # running totals are reset when the last order they hold is removed,
+        # so rounding errors do not accumulate
+        index = self.__pydantic_private__
+        if order.is_open:
+            del index["_open"][position]
+            if order.side == "buy":
+                del index["_open_buy"][position]
+                index["_quote_on_hold"] -= order.on_hold
+                if not index["_open_buy"]:
+                    index["_quote_on_hold"] = 0.0
+            else:
+                del index["_open_sell"][position]
+                index["_open_sell_count"][order.market] -= 1
+                index["_base_on_hold"][order.market] -= order.on_hold
+                if index["_open_sell_count"][order.market] == 0:
+                    del index["_open_sell_count"][order.market]
+                    del index["_base_on_hold"][order.market]
+        elif order.is_filled:
+            del index["_filled"][position]
+            index["_total_fee_paid"] -= order.fee
+            if not index["_filled"]:
+                index["_total_fee_paid"] = 0.0
+        else:
+            del index["_cancelled"][position]
+
+    @staticmethod
+    def _in_order_of_position(orders: dict[int, Order]) -> list[Order]:
+        return [orders[position] for position in sorted(orders)]
 
     @property
     def number_of_transactions(self) -> int:
-        return len(self.filled_orders)
+        index = self._ensure_index()
+        archive = self.closed_order_archive
+        archived = 0 if archive is None else archive.number_of_filled_orders
+        return archived + len(index["_filled"])
 
     @property
     def total_fee_paid(self) -> float:
-        return sum([o.fee for o in self.filled_orders])
+        index = self._ensure_index()
+        archive = self.closed_order_archive
+        archived = 0.0 if archive is None else archive.total_fee_paid
+        return archived + index["_total_fee_paid"]
 
     @property
     def filled_orders(self) -> list[Order]:
-        return [o for o in self.orders if o.is_filled]
+        """
+        archived filled orders come first, as copies.
+        """
+        index = self._ensure_index()
+        archive = self.closed_order_archive
+        archived = [] if archive is None else archive.orders(filled=True)
+        return archived + self._in_order_of_position(index["_filled"])
 
     @property
     def open_orders(self) -> list[Order]:
-        return [o for o in self.orders if o.is_open]
+        index = self._ensure_index()
+        return list(index["_open"].values())
 
     @property
     def cancelled_orders(self) -> list[Order]:
-        return [o for o in self.orders if o.is_cancelled]
+        """
+        archived cancelled orders come first, as copies.
+        """
+        index = self._ensure_index()
+        archive = self.closed_order_archive
+        archived = [] if archive is None else archive.orders(filled=False)
+        return archived + self._in_order_of_position(index["_cancelled"])
 
     @property
-    def base_on_hold(self) -> float:
-        return sum([order.on_hold for order in self.sell_orders])
+    def buy_orders(self) -> list[Order]:
+        index = self._ensure_index()
+        return list(index["_open_buy"].values())
 
     @property
-    def quote_on_hold(self) -> float:
-        return sum([order.on_hold for order in self.buy_orders])
+    def sell_orders(self) -> list[Order]:
+        index = self._ensure_index()
+        return list(index["_open_sell"].values())
 
     @property
-    def base_available(self) -> float:
-        return self.total_base - self.base_on_hold
+    def number_of_open_buy_orders(self) -> int:
+        index = self._ensure_index()
+        return len(index["_open_buy"])
+
+    @property
+    def number_of_open_sell_orders(self) -> int:
+        index = self._ensure_index()
+        return len(index["_open_sell"])
+
+    @property
+    def quote_on_hold(self) -> float:
+        index = self._ensure_index()
+        return index["_quote_on_hold"]
 
     @property
     def quote_available(self) -> float:
         return self.total_quote - self.quote_on_hold
 
+    def _base_on_hold_of(self, base: str) -> float:
+        index = self._ensure_index()
+        return index["_base_on_hold"].get(base, 0.0)
+
     @property
-    def buy_orders(self) -> list[Order]:
-        return [o for o in self.open_orders if o.side == "buy"]
+    def number_of_orders(self) -> int:
+        """
+        number of orders in orders and in closed_order_archive.
+        """
+        archive = self.closed_order_archive
+        return len(self.orders) + (0 if archive is None else len(archive))
 
     @property
-    def sell_orders(self) -> list[Order]:
-        return [o for o in self.open_orders if o.side == "sell"]
+    def closed_order_archive(self) -> Optional[ClosedOrderArchive]:
+        return (self.__pydantic_private__ or {}).get("_archive")
+
+    def enable_closed_order_archive(self, max_closed_orders: int = 1000) -> None:
+        """
+        from now on, filled and cancelled orders are moved from orders to
+        closed_order_archive whenever more than max_closed_orders of them
+        are in orders, so orders only grows with the open orders.
+        """
+        self._ensure_index()
+        if self.closed_order_archive is None:
+            self._archive = ClosedOrderArchive()
+        self._max_closed_orders = max_closed_orders
+        self._archive_if_needed()
+
+    @property
+    def archive_generation(self) -> int:
+        """
+        number of times archive_closed_orders moved orders out of orders.
+        Positions in orders from before an archive are no longer valid.
+        """
+        return (self.__pydantic_private__ or {}).get("_archive_generation", 0)
+
+    def archive_closed_orders(self) -> None:
+        """
+        moves the filled and cancelled orders from orders to
+        closed_order_archive. orders is changed in place and
+        archive_generation is increased.
+        """
+        index = self._ensure_index()
+        archive = self.closed_order_archive
+        if archive is None:
+            archive = self._archive = ClosedOrderArchive()
+        for order in self.orders:
+            if not order.is_open:
+                archive.append(order)
+        self.orders[:] = index["_open"].values()
+        self._rebuild_index()
+        self.__pydantic_private__["_archive_generation"] = self.archive_generation + 1
+
+    def _archive_if_needed(self) -> None:
+        index = self.__pydantic_private__
+        max_closed_orders = index.get("_max_closed_orders")
+        if (
+            max_closed_orders is not None
+            and len(index["_filled"]) + len(index["_cancelled"]) > max_closed_orders
+        ):
+            self.archive_closed_orders()
+
+    def collect_order_events(self) -> None:
+        """
+        starts collecting a snapshot of the ORDER_EVENT_FIELDS of every order
+        that add_order, cancel_order or process_filled_order changes, see
+        pop_order_events.
+        """
+        index = self._ensure_index()
+        if index.get("_order_events") is None:
+            index["_order_events"] = []
+
+    def stop_collecting_order_events(self) -> None:
+        """
+        stops collecting order events and drops the ones not popped yet.
+        """
+        index = self._ensure_index()
+        index["_order_events"] = None
+
+    def pop_order_events(self) -> list[tuple]:
+        """
+        returns the snapshots collected since the last call and clears them.
+        """
+        index = self._ensure_index()
+        events = index.get("_order_events")
+        if not events:
+            return []
+        index["_order_events"] = []
+        return events
+
+    def _collect_order_event(self, order: Order) -> None:
+        events = self.__pydantic_private__.get("_order_events")
+        if events is not None:
+            events.append(tuple(getattr(order, field) for field in ORDER_EVENT_FIELDS))
 
     def add_order(self, order: Order) -> None:
+        self._ensure_index()
+        position = len(self.orders)
         self.orders.append(order)
+        self._index_order_id(position, order)
+        self._index_status(position, order)
+        self._collect_order_event(order)
+        self._archive_if_needed()
+
+    def _position_of(self, order_id: str) -> int:
+        index = self._ensure_index()
+        if order_id in index["_duplicate_ids"]:
+            raise MultipleOrdersFoundError(order_id)
+        if order_id not in index["_position_by_id"]:
+            raise NoOrderFoundError(order_id)
+        return index["_position_by_id"][order_id]
 
     def get_order(self, order_id: str) -> Order:
-        list_found_order = [o for o in self.orders if o.order_id == order_id]
-        if len(list_found_order) == 0:
-            raise NoOrderFoundError(order_id)
-        elif len(list_found_order) > 1:
-            raise MultipleOrdersFoundError(order_id)
-        return list_found_order[0]
+        """
+        archived orders are returned as copies.
+        """
+        archive = self.closed_order_archive
+        index = self._ensure_index()
+        if archive is not None and order_id not in index["_position_by_id"]:
+            archived_order = archive.get_order(order_id)
+            if archived_order is not None:
+                return archived_order
+        return self.orders[self._position_of(order_id)]
+
+    def _update_order(self, order_id: str, **fields) -> None:
+        position = self._position_of(order_id)
+        found_order = self.orders[position]
+        self._unindex_status(position, found_order)
+        for name, value in fields.items():
+            setattr(found_order, name, value)
+        self._index_status(position, found_order)
+        self._collect_order_event(found_order)
+        self._archive_if_needed()
 
     def cancel_order(self, order: Order) -> None:
-        found_order = self.get_order(order.order_id)
-        found_order.status = "cancelled"
+        self._update_order(order.order_id, status="cancelled")
+
+    @abstractmethod
+    def _mutate_base(self, base: str, base_mutation: float) -> None:
+        pass
+
+    @abstractmethod
+    def _base_available(self, base: str) -> float:
+        pass
 
     def process_filled_order(self, filled_order: Order) -> None:
+        """
+        books a fill. A taker order is added, for a maker order the open order
+        in orders takes the status, fee, fill time and filled amounts of
+        filled_order, as reported by the exchange or the simulator.
+        """
         if filled_order.side == "buy":
             quote_mutation = -(filled_order.filled_quote + filled_order.fee)
             base_mutation = filled_order.filled
@@ -119,23 +540,51 @@ class State(BaseModel):
             base_mutation = -filled_order.filled
 
         self.total_quote += quote_mutation
-        self.total_base += base_mutation
+        self._mutate_base(filled_order.market, base_mutation)
 
         if filled_order.is_taker:
             self.add_order(filled_order)
         else:
-            found_order = self.get_order(filled_order.order_id)
-            found_order.status = "filled"
-            found_order.fee = filled_order.fee
-
-        self._check_non_negative()
-
-    def _check_non_negative(self) -> None:
-        if self.base_available < -1e-9:
-            raise ValueError(f"Negative base balance: {self.base_available}")
+            self._update_order(
+                filled_order.order_id,
+                status="filled",
+                fee=filled_order.fee,
+                time_filled=filled_order.time_filled,
+                filled=filled_order.filled,
+                filled_quote=filled_order.filled_quote,
+            )
+
+        self._check_non_negative(filled_order.market)
+
+    def _check_non_negative(self, base: str) -> None:
+        base_available = self._base_available(base)
+        if base_available < -1e-9:
+            raise ValueError(f"Negative {base} balance: {base_available}")
         if self.quote_available < -1e-9:
             raise ValueError(f"Negative quote balance: {self.quote_available}")
 
+
+class State(OrderLedger):
+    base: str
+    total_base: float
+    total_quote: float
+    orders: list[Order] = []
+
+    @property
+    def base_on_hold(self) -> float:
+        index = self._ensure_index()
+        return sum(index["_base_on_hold"].values())
+
+    @property
+    def base_available(self) -> float:
+        return self.total_base - self.base_on_hold
+
+    def _mutate_base(self, base: str, base_mutation: float) -> None:
+        self.total_base += base_mutation
+
+    def _base_available(self, base: str) -> float:
+        return self.base_available
+
     def total_value_in_base(self, price: float) -> float:
         return self.total_base + self.total_quote / price
 
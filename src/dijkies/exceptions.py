@@ -84,3 +84,23 @@ class InsufficientOrderValueError(Exception):
             order value should be at least 5 euro:
             """
         )
+
+
+class InvalidCandleIntervalError(Exception):
+    def __init__(self, interval_in_minutes):
+        super().__init__(
+            f"""
+            cannot resample to {interval_in_minutes} minute candles, the interval
+            should be positive and not shorter than the spacing of the data.
+            """
+        )
+
+
+class IrregularCandleSpacingError(Exception):
+    def __init__(self, interval_in_minutes):
+        super().__init__(
+            f"""
+            cannot fill gaps, not all candles lie on a {interval_in_minutes}
+            minute grid.
+            """
+        )
@@ -10,6 +10,7 @@ from pandas.core.frame import DataFrame as PandasDataFrame
 from python_bitvavo_api.bitvavo import Bitvavo
 
 from dijkies.interfaces import ExchangeMarketAPI
+from dijkies.resampling import bitvavo_interval
 
 logger = logging.getLogger(__name__)
 
@@ -117,46 +118,7 @@ class BitvavoMarketAPI(ExchangeMarketAPI):
     ) -> PandasDataFrame:
         trading_pair = base + "-EUR"
 
-        # Determine correct Bitvavo interval
-        if interval_in_minutes < 3:
-            corrected_interval = 1
-            interval = "1m"
-        elif interval_in_minutes < 10:
-            corrected_interval = 5
-            interval = "5m"
-        elif interval_in_minutes < 23:
-            corrected_interval = 15
-            interval = "15m"
-        elif interval_in_minutes < 45:
-            corrected_interval = 30
-            interval = "30m"
-        elif interval_in_minutes < 90:
-            corrected_interval = 60
-            interval = "1h"
-        elif interval_in_minutes < 180:
-            corrected_interval = 120
-            interval = "2h"
-        elif interval_in_minutes < 300:
-            corrected_interval = 240
-            interval = "4h"
-        elif interval_in_minutes < 420:
-            corrected_interval = 360
-            interval = "6h"
-        elif interval_in_minutes < 600:
-            corrected_interval = 480
-            interval = "8h"
-        elif interval_in_minutes < 1080:
-            corrected_interval = 720
-            interval = "12h"
-        elif interval_in_minutes < 4 * 1440:
-            corrected_interval = 1440
-            interval = "1d"
-        elif interval_in_minutes < 19 * 1440:
-            corrected_interval = 1440 * 7
-            interval = "1W"
-        else:
-            corrected_interval = 1440 * 30
-            interval = "1M"
+        corrected_interval, interval = bitvavo_interval(interval_in_minutes)
 
         now = int(time.time() * 1000)
         start = now - lookback_in_minutes * 60000
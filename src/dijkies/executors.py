@@ -1,6 +1,7 @@
+import bisect
 import logging
+import math
 import time
-import uuid
 from decimal import ROUND_DOWN, Decimal, getcontext
 
 import pandas as pd
@@ -8,7 +9,7 @@ from pandas.core.series import Series
 from python_bitvavo_api.bitvavo import Bitvavo
 
 from dijkies.constants import SUPPORTED_EXCHANGES
-from dijkies.entities import Order, State
+from dijkies.entities import Order, OrderLedger, State
 from dijkies.exceptions import (
     GetOrderInfoError,
     InsufficientBalanceError,
@@ -19,7 +20,65 @@ from dijkies.interfaces import CredentialsRepository, ExchangeAssetClient
 logger = logging.getLogger(__name__)
 
 
+def market_buy_fill(
+    amount_in_quote: float, price: float, fee_market_order: float
+) -> tuple[float, float, float]:
+    """
+    returns filled, filled_quote and fee of a backtest market buy order that
+    spends amount_in_quote, fee included.
+    """
+    fee = amount_in_quote * fee_market_order / (1 + fee_market_order)
+    return (amount_in_quote - fee) / price, amount_in_quote - fee, fee
+
+
+def market_sell_fill(
+    amount_in_base: float, price: float, fee_market_order: float
+) -> tuple[float, float, float]:
+    """
+    returns filled, filled_quote and fee of a backtest market sell order.
+    """
+    amount_in_quote = amount_in_base * price
+    return amount_in_base, amount_in_quote, amount_in_quote * fee_market_order
+
+
+def limit_order_fill(
+    side: str, on_hold: float, limit_price: float, fee_limit_order: float
+) -> tuple[float, float, float]:
+    """
+    returns filled, filled_quote and fee of a backtest limit order that is
+    filled completely at its limit price.
+    """
+    if side == "buy":
+        fee = on_hold * fee_limit_order / (1 + fee_limit_order)
+        filled_quote = on_hold - fee
+        return filled_quote / limit_price, filled_quote, fee
+    filled_quote = on_hold * limit_price
+    return on_hold, filled_quote, filled_quote * fee_limit_order
+
+
+def backtest_order(
+    state: OrderLedger, time_created: int, exchange: str = "bitvavo", **fields
+) -> Order:
+    """
+    builds an order of the simulator. Its values are trusted, so validation is
+    skipped. Ids count the orders of state, which makes them reproducible
+    between runs.
+    """
+    return Order.model_construct(
+        order_id=f"backtest-{state.number_of_orders}",
+        exchange=exchange,
+        time_created=time_created,
+        **fields,
+    )
+
+
 class BacktestExchangeAssetClient(ExchangeAssetClient):
+    """
+    simulates orders against the current candle. Open limit orders are kept in
+    an order book sorted by limit price, so update_state finds the orders the
+    candle fills with two binary searches instead of checking every order.
+    """
+
     def __init__(
         self, state: State, fee_market_order: float, fee_limit_order: float
     ) -> None:
@@ -27,24 +86,79 @@ class BacktestExchangeAssetClient(ExchangeAssetClient):
         self.fee_market_order = fee_market_order
         self.fee_limit_order = fee_limit_order
         self.current_candle = pd.Series({"high": 80000, "low": 78000, "close": 79000})
+        self._reset_order_book()
+
+    def _reset_order_book(self) -> None:
+        # entries are (limit_price, sequence, order), sequence is the position
+        # of the order in state.orders so fills keep the order of placement
+        self._buy_book: list[tuple[float, int, Order]] = []
+        self._sell_book: list[tuple[float, int, Order]] = []
+        self._book_state = self.state
+        self._book_orders = self.state.orders
+        self._book_generation = self.state.archive_generation
+        self._n_seen_orders = 0
+
+    def _sync_order_book(self) -> None:
+        """
+        adds the open limit orders that were added to the state since the last
+        sync, also when they were not placed through this client. The book is
+        rebuilt when orders was replaced or archived, because the positions of
+        the orders changed.
+        """
+        orders = self.state.orders
+        if (
+            getattr(self, "_book_state", None) is not self.state
+            or getattr(self, "_book_orders", None) is not orders
+            or getattr(self, "_book_generation", 0) != self.state.archive_generation
+            or len(orders) < self._n_seen_orders
+        ):
+            self._reset_order_book()
+
+        for sequence in range(self._n_seen_orders, len(orders)):
+            order = orders[sequence]
+            if order.is_open and order.limit_price is not None:
+                book = self._buy_book if order.side == "buy" else self._sell_book
+                bisect.insort(book, (order.limit_price, sequence, order))
+        self._n_seen_orders = len(orders)
+
+    def _remove_from_order_book(self, order: Order) -> None:
+        if order.limit_price is None:
+            return
+        book = self._buy_book if order.side == "buy" else self._sell_book
+        position = bisect.bisect_left(book, (order.limit_price,))
+        while position < len(book) and book[position][0] == order.limit_price:
+            if book[position][2].order_id == order.order_id:
+                del book[position]
+                return
+            position += 1
 
     def assets_in_state_are_available(self) -> bool:
         return True
 
     def update_current_candle(self, current_candle: Series) -> None:
         self.current_candle = current_candle
+        time_of_candle = current_candle.get("time")
+        self._candle_time = (
+            None
+            if time_of_candle is None
+            else int(pd.Timestamp(time_of_candle).timestamp())
+        )
+
+    def _order_time(self) -> int:
+        candle_time = getattr(self, "_candle_time", None)
+        return int(time.time()) if candle_time is None else candle_time
+
+    def _new_order(self, **fields) -> Order:
+        return backtest_order(self.state, self._order_time(), **fields)
 
     def place_limit_buy_order(
         self, base: str, limit_price: float, amount_in_quote: float
     ) -> Order:
-        order = Order(
-            order_id=str(uuid.uuid4()),
-            exchange="bitvavo",
-            time_created=int(time.time()),
+        order = self._new_order(
             market=base,
             side="buy",
-            limit_price=limit_price,
-            on_hold=amount_in_quote,
+            limit_price=float(limit_price),
+            on_hold=float(amount_in_quote),
             status="open",
             is_taker=False,
         )
@@ -56,14 +170,11 @@ class BacktestExchangeAssetClient(ExchangeAssetClient):
     def place_limit_sell_order(
         self, base: str, limit_price: float, amount_in_base: float
     ) -> Order:
-        order = Order(
-            order_id=str(uuid.uuid4()),
-            exchange="bitvavo",
-            time_created=int(time.time()),
+        order = self._new_order(
             market=base,
             side="sell",
-            limit_price=limit_price,
-            on_hold=amount_in_base,
+            limit_price=float(limit_price),
+            on_hold=float(amount_in_base),
             status="open",
             is_taker=False,
         )
@@ -73,19 +184,18 @@ class BacktestExchangeAssetClient(ExchangeAssetClient):
         return order
 
     def place_market_buy_order(self, base: str, amount_in_quote: float) -> Order:
-        fee = amount_in_quote * self.fee_market_order / (1 + self.fee_market_order)
-        amount_in_base = (amount_in_quote - fee) / self.current_candle.close
+        filled, filled_quote, fee = market_buy_fill(
+            amount_in_quote, self.current_candle.close, self.fee_market_order
+        )
 
-        order = Order(
-            order_id=str(uuid.uuid4()),
-            exchange="bitvavo",
-            time_created=int(time.time()),
+        order = self._new_order(
             market=base,
             side="buy",
-            filled=amount_in_base,
-            filled_quote=amount_in_quote - fee,
+            time_filled=self._order_time(),
+            filled=float(filled),
+            filled_quote=float(filled_quote),
             status="filled",
-            fee=fee,
+            fee=float(fee),
             is_taker=True,
         )
 
@@ -94,19 +204,18 @@ class BacktestExchangeAssetClient(ExchangeAssetClient):
         return order
 
     def place_market_sell_order(self, base: str, amount_in_base: float) -> Order:
-        amount_in_quote = amount_in_base * self.current_candle.close
-        fee = amount_in_quote * self.fee_market_order
+        filled, filled_quote, fee = market_sell_fill(
+            amount_in_base, self.current_candle.close, self.fee_market_order
+        )
 
-        order = Order(
-            order_id=str(uuid.uuid4()),
-            exchange="bitvavo",
-            time_created=int(time.time()),
+        order = self._new_order(
             market=base,
             side="sell",
-            filled=amount_in_base,
-            filled_quote=amount_in_quote,
+            time_filled=self._order_time(),
+            filled=float(filled),
+            filled_quote=float(filled_quote),
             status="filled",
-            fee=fee,
+            fee=float(fee),
             is_taker=True,
         )
 
@@ -130,33 +239,51 @@ class BacktestExchangeAssetClient(ExchangeAssetClient):
 
     def cancel_order(self, order: Order) -> Order:
         self.state.cancel_order(order)
+        self._sync_order_book()
+        self._remove_from_order_book(order)
         return order
 
+    def update_state(self) -> None:
+        """
+        fills every open buy order with a limit price at or above the low of
+        the current candle and every open sell order at or below its high, in
+        the order they were placed. Orders that were cancelled or filled
+        outside of this client are dropped from the book when reached.
+        """
+        self._sync_order_book()
+        low, high = self.current_candle.low, self.current_candle.high
+
+        crossed = []
+        if not math.isnan(low):
+            first_filled = bisect.bisect_left(self._buy_book, (low,))
+            crossed += self._buy_book[first_filled:]
+            del self._buy_book[first_filled:]
+        if not math.isnan(high):
+            last_filled = bisect.bisect_right(self._sell_book, (high, math.inf))
+            crossed += self._sell_book[:last_filled]
+            del self._sell_book[:last_filled]
+
+        crossed.sort(key=lambda entry: entry[1])
+        for _, _, order in crossed:
+            if order.is_open:
+                self.state.process_filled_order(self.fill_open_order(order))
+
     def fill_open_order(self, order: Order) -> Order:
-        fee_limit_order = self.fee_limit_order
         if order.status != "open":
             raise ValueError("only open orders can be filled")
-        if order.side == "buy":
-            fee = order.on_hold * fee_limit_order / (1 + fee_limit_order)
-            filled_quote = order.on_hold - fee
-            filled = filled_quote / order.limit_price  # type: ignore
-        else:
-            filled = order.on_hold
-            filled_quote = order.on_hold * order.limit_price  # type: ignore
-            fee = filled_quote * fee_limit_order
-        return Order(
-            order_id=order.order_id,
-            exchange=order.exchange,
-            time_created=order.time_created,
-            market=order.market,
-            side=order.side,
-            limit_price=order.limit_price,
-            on_hold=0,
-            status="filled",
-            is_taker=False,
-            fee=fee,
-            filled_quote=filled_quote,
-            filled=filled,
+        filled, filled_quote, fee = limit_order_fill(
+            order.side, order.on_hold, order.limit_price, self.fee_limit_order
+        )
+        return order.model_copy(
+            update={
+                "time_filled": self._order_time(),
+                "on_hold": 0,
+                "status": "filled",
+                "is_taker": False,
+                "fee": float(fee),
+                "filled_quote": float(filled_quote),
+                "filled": float(filled),
+            }
         )
 
 
@@ -0,0 +1,231 @@
+import math
+from abc import ABC, abstractmethod
+from collections import deque
+from typing import Optional, Union
+
+import pandas as pd
+from pandas.core.frame import DataFrame as PandasDataFrame
+from pandas.core.series import Series as PandasSeries
+
+from dijkies.windows import CandleWindow
+
+
+def _positional(column):
+    return column.array if isinstance(column, PandasSeries) else column
+
+
+class Indicator(ABC):
+    """
+    stateful indicator that is updated with one candle at a time in O(1).
+    Indicators are plain python objects, so they can be kept as strategy
+    attributes and are pickled together with the strategy.
+    """
+
+    source_columns: tuple[str, ...] = ("close",)
+
+    def __init__(self) -> None:
+        self.value = None
+        self.last_time: Optional[int] = None
+
+    @abstractmethod
+    def _update(self, *values: float):
+        pass
+
+    def update(self, *values: float):
+        self.value = self._update(*values)
+        return self.value
+
+    def update_from_data(self, data: Union[PandasDataFrame, CandleWindow]):
+        """
+        feeds the candles of data that are newer than the last candle seen by
+        this indicator. Only the new candles at the end of data are visited.
+        """
+        time = _positional(data["time"])
+        columns = [_positional(data[name]) for name in self.source_columns]
+
+        start = len(data)
+        while start > 0 and (
+            self.last_time is None
+            or pd.Timestamp(time[start - 1]).value > self.last_time
+        ):
+            start -= 1
+
+        for position in range(start, len(data)):
+            self.update(*[float(column[position]) for column in columns])
+
+        if start < len(data):
+            self.last_time = pd.Timestamp(time[len(data) - 1]).value
+
+        return self.value
+
+
+class ExponentialMovingAverage(Indicator):
+    """
+    same as pandas ewm(span=window, adjust=False, min_periods=window).mean()
+    """
+
+    def __init__(self, window: int, alpha: Optional[float] = None) -> None:
+        super().__init__()
+        self.window = window
+        self.alpha = 2 / (window + 1) if alpha is None else alpha
+        self.average: Optional[float] = None
+        self.count = 0
+
+    def _update(self, value: float) -> Optional[float]:
+        if self.average is None:
+            self.average = value
+        else:
+            self.average = self.alpha * value + (1 - self.alpha) * self.average
+        self.count += 1
+        return self.average if self.count >= self.window else None
+
+
+class RelativeStrengthIndex(Indicator):
+    """
+    same as ta.momentum.RSIIndicator(close, window).rsi()
+    """
+
+    def __init__(self, window: int = 14) -> None:
+        super().__init__()
+        self.window = window
+        self.average_up = ExponentialMovingAverage(window, alpha=1 / window)
+        self.average_down = ExponentialMovingAverage(window, alpha=1 / window)
+        self.previous_close: Optional[float] = None
+
+    def _update(self, close: float) -> Optional[float]:
+        previous_close, self.previous_close = self.previous_close, close
+        difference = 0.0 if previous_close is None else close - previous_close
+        up = self.average_up.update(max(difference, 0.0))
+        down = self.average_down.update(max(-difference, 0.0))
+        if up is None or down is None:
+            return None
+        if down == 0:
+            return 100.0
+        return 100 - 100 / (1 + up / down)
+
+
+class AverageTrueRange(Indicator):
+    """
+    same as ta.volatility.AverageTrueRange(high, low, close, window)
+    """
+
+    source_columns = ("high", "low", "close")
+
+    def __init__(self, window: int = 14) -> None:
+        super().__init__()
+        self.window = window
+        self.previous_close: Optional[float] = None
+        self.true_range_sum = 0.0
+        self.count = 0
+        self.average: Optional[float] = None
+
+    def _update(self, high: float, low: float, close: float) -> Optional[float]:
+        true_range = high - low
+        if self.previous_close is not None:
+            true_range = max(
+                true_range,
+                abs(high - self.previous_close),
+                abs(low - self.previous_close),
+            )
+        self.previous_close = close
+        self.count += 1
+
+        if self.count < self.window:
+            self.true_range_sum += true_range
+            return None
+        if self.count == self.window:
+            self.average = (self.true_range_sum + true_range) / self.window
+        else:
+            self.average = (self.average * (self.window - 1) + true_range) / self.window
+        return self.average
+
+
+class BollingerBands(Indicator):
+    """
+    value is a (lower, middle, upper) tuple, same as
+    ta.volatility.BollingerBands(close, window, window_dev)
+    """
+
+    def __init__(self, window: int = 20, window_dev: float = 2) -> None:
+        super().__init__()
+        self.window = window
+        self.window_dev = window_dev
+        self.values: deque[float] = deque()
+        self.total = 0.0
+        self.total_of_squares = 0.0
+
+    def _update(self, close: float) -> Optional[tuple[float, float, float]]:
+        self.values.append(close)
+        self.total += close
+        self.total_of_squares += close * close
+        if len(self.values) > self.window:
+            dropped = self.values.popleft()
+            self.total -= dropped
+            self.total_of_squares -= dropped * dropped
+        if len(self.values) < self.window:
+            return None
+
+        middle = self.total / self.window
+        variance = max(self.total_of_squares / self.window - middle * middle, 0.0)
+        deviation = self.window_dev * math.sqrt(variance)
+        return middle - deviation, middle, middle + deviation
+
+
+class MovingAverageConvergenceDivergence(Indicator):
+    """
+    value is a (macd, signal, histogram) tuple, same as
+    ta.trend.MACD(close, window_slow, window_fast, window_sign)
+    """
+
+    def __init__(
+        self, window_fast: int = 12, window_slow: int = 26, window_sign: int = 9
+    ) -> None:
+        super().__init__()
+        self.fast = ExponentialMovingAverage(window_fast)
+        self.slow = ExponentialMovingAverage(window_slow)
+        self.signal = ExponentialMovingAverage(window_sign)
+
+    def _update(self, close: float) -> Optional[tuple[float, float, float]]:
+        fast = self.fast.update(close)
+        slow = self.slow.update(close)
+        if fast is None or slow is None:
+            return None
+        macd = fast - slow
+        signal = self.signal.update(macd)
+        if signal is None:
+            return None
+        return macd, signal, macd - signal
+
+
+class _RollingExtreme(Indicator):
+    def __init__(self, window: int) -> None:
+        super().__init__()
+        self.window = window
+        self.count = 0
+        self.candidates: deque[tuple[int, float]] = deque()
+
+    @staticmethod
+    @abstractmethod
+    def _dominates(new: float, old: float) -> bool:
+        pass
+
+    def _update(self, value: float) -> Optional[float]:
+        while self.candidates and self._dominates(value, self.candidates[-1][1]):
+            self.candidates.pop()
+        self.candidates.append((self.count, value))
+        if self.candidates[0][0] <= self.count - self.window:
+            self.candidates.popleft()
+        self.count += 1
+        return self.candidates[0][1] if self.count >= self.window else None
+
+
+class RollingMinimum(_RollingExtreme):
+    @staticmethod
+    def _dominates(new: float, old: float) -> bool:
+        return new <= old
+
+
+class RollingMaximum(_RollingExtreme):
+    @staticmethod
+    def _dominates(new: float, old: float) -> bool:
+        return new >= old
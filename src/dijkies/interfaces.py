@@ -1,8 +1,9 @@
 import inspect
 import logging
 from abc import ABC, abstractmethod
-from datetime import datetime, timedelta
+from typing import TYPE_CHECKING, Any, Optional
 
+import numpy as np
 import pandas as pd
 from pandas.core.frame import DataFrame as PandasDataFrame
 from pandas.core.series import Series as PandasSeries
@@ -16,7 +17,18 @@ from dijkies.exceptions import (
     MissingOHLCVColumnsError,
     TimeColumnNotDefinedError,
 )
-from dijkies.performance import PerformanceInformationRow
+from dijkies.windows import (
+    CandleWindow,
+    analysis_window_positions,
+    time_to_int64,
+)
+
+if TYPE_CHECKING:
+    from dijkies.checkpoint import BacktestCheckpoint
+    from dijkies.datasets import CandleDataset
+    from dijkies.performance import EquityCurves, OnlineMetrics, PerformanceRecorder
+    from dijkies.profiling import BacktestProfiler
+    from dijkies.resampling import CandleResampler
 
 logger = logging.getLogger(__name__)
 
@@ -31,6 +43,26 @@ class Metric(ABC):
     def calculate(self, time_series: PandasSeries) -> float:
         pass
 
+    def calculate_curves(self, curves: "EquityCurves") -> np.ndarray:
+        """
+        calculates the metric for every curve in curves. Metrics override this
+        to use the intermediates curves shares, the default calls calculate
+        once per curve.
+        """
+        return np.array([self.calculate(pd.Series(curve)) for curve in curves.values])
+
+    def calculate_rolling(self, time_series: PandasSeries, window: int) -> PandasSeries:
+        """
+        calculates the metric on the last window values at every position, the
+        first window - 1 positions are NaN. Metrics override this with a single
+        pass, the default calls calculate on every window.
+        """
+        values = np.full(len(time_series), np.nan)
+        for end in range(window, len(time_series) + 1):
+            start = end - window
+            values[end - 1] = self.calculate(time_series.iloc[start:end])
+        return pd.Series(values, index=time_series.index)
+
 
 class DataPipeline(ABC):
     @abstractmethod
@@ -38,6 +70,31 @@ class DataPipeline(ABC):
         pass
 
 
+class ResultSink(ABC):
+    """
+    receives the result of a backtest in batches of at most batch_size rows
+    instead of returning it as one DataFrame, see dijkies.sinks.
+    """
+
+    def __init__(self, batch_size: int = 10_000) -> None:
+        self.batch_size = batch_size
+
+    def open(self) -> None:
+        """
+        called before the first batch.
+        """
+
+    @abstractmethod
+    def write(self, batch: PandasDataFrame) -> None:
+        pass
+
+    @abstractmethod
+    def close(self) -> Any:
+        """
+        called after the last batch, returns what backtest returns.
+        """
+
+
 class ExchangeMarketAPI(ABC):
     @abstractmethod
     def get_candles(
@@ -96,22 +153,74 @@ class ExchangeAssetClient(ABC):
                 self.state.process_filled_order(newest_info_order)
 
 
+def validate_candle_columns(data: PandasDataFrame) -> None:
+    """
+    checks that data has a datetime time column and the OHLCV columns.
+    """
+    if "time" not in data.columns:
+        raise TimeColumnNotDefinedError()
+
+    if not pd.api.types.is_datetime64_any_dtype(data.time):
+        raise InvalidTypeForTimeColumnError()
+
+    if not {"open", "high", "low", "close", "volume"}.issubset(data.columns):
+        raise MissingOHLCVColumnsError()
+
+
 class Strategy(ABC):
+    uses_candle_window: bool = False
+    # online_metrics receives a value every time Bot.run runs the strategy,
+    # set the interval to how often the bot is scheduled
+    online_metrics_interval_in_minutes: int = 60
+    online_metrics_risk_free_rate_per_year: float = 0.0
+
     def __init__(
         self,
         executor: ExchangeAssetClient,
     ) -> None:
         self.executor = executor
         self.state = self.executor.state
+        self.online_metrics = self._new_online_metrics()
 
     @abstractmethod
-    def execute(self, data: PandasDataFrame) -> None:
+    def execute(self, data: PandasDataFrame | CandleWindow) -> None:
+        """
+        receives a CandleWindow instead of a DataFrame when
+        uses_candle_window is set to True.
+        """
         pass
 
-    def run(self, data: PandasDataFrame) -> None:
+    def run(self, data: PandasDataFrame | CandleWindow) -> None:
+        if self.uses_candle_window and isinstance(data, PandasDataFrame):
+            data = CandleWindow.from_dataframe(data)
         self.executor.update_state()
         self.execute(data)
 
+    def update_online_metrics(self, price: float) -> "OnlineMetrics":
+        """
+        adds the value of the state at price to online_metrics, which is
+        stored with the strategy. Bot.run calls this after every run. The
+        Sharpe ratio is annualised with online_metrics_interval_in_minutes.
+        """
+        if getattr(self, "online_metrics", None) is None:
+            self.online_metrics = self._new_online_metrics()
+        self.online_metrics.candle_interval_in_minutes = (
+            self.online_metrics_interval_in_minutes
+        )
+        self.online_metrics.risk_free_rate_per_year = (
+            self.online_metrics_risk_free_rate_per_year
+        )
+        self.online_metrics.update(self.state.total_value_in_quote(price))
+        return self.online_metrics
+
+    def _new_online_metrics(self) -> "OnlineMetrics":
+        from dijkies.performance import OnlineMetrics
+
+        return OnlineMetrics(
+            self.online_metrics_risk_free_rate_per_year,
+            self.online_metrics_interval_in_minutes,
+        )
+
     @classmethod
     def _get_strategy_params(cls) -> list[str]:
         subclass_sig = inspect.signature(cls.__init__)
@@ -151,64 +260,298 @@ class Strategy(ABC):
         """
         raise NotImplementedError()
 
-    def backtest(self, data: PandasDataFrame) -> PandasDataFrame:
+    def _validate_backtest_data(
+        self, data: "PandasDataFrame | CandleDataset"
+    ) -> PandasDataFrame:
         """
-        This method runs the backtest.
-        It expects data, this should have the following properties:
+        validates the backtest data and executor, returns the data sorted by time.
+        A CandleDataset is validated already, only its timespan is checked.
         """
 
+        from dijkies.datasets import CandleDataset
         from dijkies.executors import BacktestExchangeAssetClient
 
-        # validate args
-
-        if "time" not in data.columns:
-            raise TimeColumnNotDefinedError()
-
-        if not pd.api.types.is_datetime64_any_dtype(data.time):
-            raise InvalidTypeForTimeColumnError()
+        trusted = isinstance(data, CandleDataset)
+        if trusted:
+            data = data.data
+        else:
+            validate_candle_columns(data)
 
         lookback_in_min = self.analysis_dataframe_size_in_minutes
-        timespan_data_in_min = (data.time.max() - data.time.min()).total_seconds() / 60
+        if trusted:
+            timespan = data.time.iloc[-1] - data.time.iloc[0]
+        else:
+            timespan = data.time.max() - data.time.min()
+        timespan_data_in_min = timespan.total_seconds() / 60
 
         if lookback_in_min > timespan_data_in_min:
             raise DataTimeWindowShorterThanSuggestedAnalysisWindowError()
 
-        if not {"open", "high", "low", "close", "volume"}.issubset(data.columns):
-            raise MissingOHLCVColumnsError()
-
         if not isinstance(self.executor, BacktestExchangeAssetClient):
             raise InvalidExchangeAssetClientError()
 
-        start_time = data.iloc[0].time + timedelta(minutes=lookback_in_min)
-        simulation_df: PandasDataFrame = data.loc[data.time >= start_time]
-        start_candle = simulation_df.iloc[0]
-        start_value_in_quote = self.state.total_value_in_quote(start_candle.open)
-        result: list[PerformanceInformationRow] = []
+        if not trusted and not data.time.is_monotonic_increasing:
+            data = data.sort_values("time", kind="stable")
 
-        def get_analysis_df(
-            data: PandasDataFrame, current_time: datetime, look_back_in_min: int
-        ) -> PandasDataFrame:
-            start_analysis_df = current_time - timedelta(minutes=look_back_in_min)
+        return data
 
-            analysis_df = data.loc[
-                (data.time >= start_analysis_df) & (data.time <= current_time)
-            ]
+    def backtest(
+        self,
+        data: "PandasDataFrame | CandleDataset",
+        checkpoint: Optional["BacktestCheckpoint"] = None,
+        profiler: Optional["BacktestProfiler"] = None,
+        candle_interval_in_minutes: Optional[int] = None,
+        resampler: Optional["CandleResampler"] = None,
+        sink: Optional[ResultSink] = None,
+    ) -> PandasDataFrame:
+        """
+        This method runs the backtest.
+        It expects data, this should have the following properties:
 
-            return analysis_df
+        When a checkpoint is given, the strategy, its executor and the partial
+        results are saved periodically, see dijkies.checkpoint. When a profiler
+        is given, the time spent per phase is collected, see dijkies.profiling.
+        When candle_interval_in_minutes is given, data is resampled to that
+        interval first with resampler, see dijkies.resampling. Data wrapped in
+        a CandleDataset skips validation, see dijkies.datasets. When a sink is
+        given, the result is written to it in batches and what sink.close
+        returns is returned instead, see dijkies.sinks.
+        """
+        if sink is not None and checkpoint is not None:
+            raise ValueError("a backtest with a result sink cannot be checkpointed")
+
+        data, interval_in_minutes = self._prepare_backtest_data(
+            data, candle_interval_in_minutes, resampler
+        )
+        if sink is None:
+            return self._run_backtest(
+                data,
+                checkpoint,
+                profiler=profiler,
+                interval_in_minutes=interval_in_minutes,
+            )
 
-        for _, candle in simulation_df.iterrows():
-            analysis_df = get_analysis_df(data, candle.time, lookback_in_min)
+        sink.open()
+        try:
+            self._record_backtest(
+                data,
+                profiler=profiler,
+                interval_in_minutes=interval_in_minutes,
+                sink=sink,
+            )
+        except BaseException:
+            # close what was written, but raise the error of the backtest
+            try:
+                sink.close()
+            except Exception:
+                logger.exception("closing the result sink failed")
+            raise
+        return sink.close()
+
+    def slim_backtest(
+        self,
+        data: "PandasDataFrame | CandleDataset",
+        candle_interval_in_minutes: Optional[int] = None,
+        resampler: Optional["CandleResampler"] = None,
+    ) -> tuple[PandasDataFrame, PandasDataFrame]:
+        """
+        runs the backtest without the buy_orders and sell_orders columns, which
+        hold every open order at every candle. The result has the number of
+        open buy and sell orders and the exposure (the fraction of the value
+        held in base) instead. The orders are returned in a second table with
+        one row per order event.
+        """
+        data, interval_in_minutes = self._prepare_backtest_data(
+            data, candle_interval_in_minutes, resampler
+        )
+        try:
+            recorder = self._record_backtest(
+                data, interval_in_minutes=interval_in_minutes, slim=True
+            )
+        finally:
+            self.state.stop_collecting_order_events()
+        return recorder.to_dataframe(), recorder.order_event_dataframe()
+
+    def _prepare_backtest_data(
+        self,
+        data: "PandasDataFrame | CandleDataset",
+        candle_interval_in_minutes: Optional[int] = None,
+        resampler: Optional["CandleResampler"] = None,
+    ) -> tuple[PandasDataFrame, Optional[int]]:
+        """
+        resamples and validates data, returns it with the candle interval when
+        the candles are known to be regular.
+        """
+        from dijkies.datasets import CandleDataset
+
+        interval_in_minutes = None
+        if candle_interval_in_minutes is not None:
+            from dijkies.resampling import default_resampler
+
+            if isinstance(data, CandleDataset):
+                data = data.data
+            resampler = resampler or default_resampler
+            data = resampler.resample(data, candle_interval_in_minutes)
+        elif isinstance(data, CandleDataset) and data.is_regular:
+            interval_in_minutes = data.interval_in_minutes
+
+        return self._validate_backtest_data(data), interval_in_minutes
+
+    def profile_backtest(
+        self, data: PandasDataFrame
+    ) -> tuple[PandasDataFrame, PandasDataFrame]:
+        """
+        runs the backtest with a BacktestProfiler and returns the result
+        together with the profiler summary.
+        """
+        from dijkies.profiling import BacktestProfiler
+
+        profiler = BacktestProfiler()
+        result = self.backtest(data, profiler=profiler)
+        return result, profiler.summary()
+
+    def _run_backtest(
+        self,
+        data: PandasDataFrame,
+        checkpoint: Optional["BacktestCheckpoint"] = None,
+        recorder: Optional["PerformanceRecorder"] = None,
+        profiler: Optional["BacktestProfiler"] = None,
+        interval_in_minutes: Optional[int] = None,
+    ) -> PandasDataFrame:
+        """
+        runs the backtest on data that passed _validate_backtest_data. When a
+        recorder is given, the backtest continues after its last candle. When
+        interval_in_minutes is given, all candles are that far apart.
+        """
+        recorder = self._record_backtest(
+            data, checkpoint, recorder, profiler, interval_in_minutes
+        )
+        return recorder.to_dataframe()
+
+    def _record_backtest(
+        self,
+        data: PandasDataFrame,
+        checkpoint: Optional["BacktestCheckpoint"] = None,
+        recorder: Optional["PerformanceRecorder"] = None,
+        profiler: Optional["BacktestProfiler"] = None,
+        interval_in_minutes: Optional[int] = None,
+        slim: bool = False,
+        sink: Optional[ResultSink] = None,
+    ) -> "PerformanceRecorder":
+        """
+        the loop of _run_backtest, returns the recorder. slim is used when a
+        new recorder is created. With a sink, the recorded rows are written to
+        it every sink.batch_size candles and the recorder is cleared.
+        """
+
+        from dijkies.performance import PerformanceRecorder
+        from dijkies.profiling import no_phase
+
+        lookback_in_min = self.analysis_dataframe_size_in_minutes
+
+        times = time_to_int64(data.time)
+        first_position, window_starts, window_ends = analysis_window_positions(
+            times, lookback_in_min, interval_in_minutes
+        )
+
+        candles = CandleWindow.from_dataframe(data) if self.uses_candle_window else None
+
+        if recorder is None:
+            start_candle = data.iloc[first_position]
+            start_value_in_quote = self.state.total_value_in_quote(start_candle.open)
+            capacity = len(data) - first_position
+            if sink is not None:
+                capacity = min(capacity, sink.batch_size)
+            recorder = PerformanceRecorder(
+                start_candle, start_value_in_quote, capacity=capacity, slim=slim
+            )
+        elif recorder.size > 0:
+            first_position = int(
+                np.searchsorted(times, recorder.last_candle_time, side="right")
+            )
+
+        recorder.watch(self.state)
+        simulation_df: PandasDataFrame = data.iloc[first_position:]
+        phase = no_phase if profiler is None else profiler.phase
+        if profiler is not None:
+            profiler.start()
+
+        for position, (_, candle) in enumerate(
+            simulation_df.iterrows(), start=first_position
+        ):
+            with phase("window"):
+                window_start = window_starts[position]
+                window_end = window_ends[position]
+                if candles is None:
+                    analysis_data = data.iloc[window_start:window_end]
+                else:
+                    analysis_data = candles.window(window_start, window_end)
             self.executor.update_current_candle(candle)
 
-            self.run(analysis_df)
+            if profiler is None:
+                self.run(analysis_data)
+            else:
+                profiler.run_strategy(self, analysis_data)
+
+            with phase("record"):
+                recorder.record(candle, self.state)
+                if sink is not None and recorder.size >= sink.batch_size:
+                    sink.write(recorder.to_dataframe())
+                    recorder.clear()
+
+            if checkpoint is not None:
+                checkpoint.step(self, recorder)
+
+        if sink is not None and recorder.size > 0:
+            sink.write(recorder.to_dataframe())
+            recorder.clear()
+
+        if profiler is not None:
+            profiler.stop()
+
+        return recorder
+
+
+class SignalStrategy(Strategy):
+    """
+    Strategy that is fully described by signals computed on the candle data:
+    1 buys with all available quote, -1 sells all available base and 0 holds.
+    Consecutive signals in the same direction are ignored. Such strategies can
+    also be backtested with vectorized_backtest.
+    """
 
-            result.append(
-                PerformanceInformationRow.from_objects(
-                    candle, start_candle, self.state, start_value_in_quote
-                )
+    def __init__(self, executor: ExchangeAssetClient) -> None:
+        super().__init__(executor)
+        self.last_signal = 0
+
+    @abstractmethod
+    def generate_signals(self, data: PandasDataFrame) -> PandasSeries:
+        pass
+
+    def execute(self, data: PandasDataFrame) -> None:
+        signal = np.nan_to_num(np.sign(self.generate_signals(data).iloc[-1]))
+
+        if signal == 0 or signal == self.last_signal:
+            return
+
+        if signal > 0:
+            self.executor.place_market_buy_order(
+                self.state.base, self.state.quote_available
+            )
+        else:
+            self.executor.place_market_sell_order(
+                self.state.base, self.state.base_available
             )
+        self.last_signal = signal
+
+    def vectorized_backtest(self, data: PandasDataFrame) -> PandasDataFrame:
+        """
+        computes the backtest from generate_signals on the full data at once.
+        Orders are not placed, so the state is left untouched.
+        """
+        from dijkies.vectorized import vectorized_backtest
 
-        return pd.DataFrame([r.model_dump() for r in result])
+        return vectorized_backtest(self, data)
 
 
 class StrategyRepository(ABC):
@@ -0,0 +1,431 @@
+import itertools
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing.shared_memory import SharedMemory
+from typing import Any, Optional
+
+import numpy as np
+import pandas as pd
+from pandas.core.frame import DataFrame as PandasDataFrame
+
+from dijkies.datasets import CandleDataset
+from dijkies.entities import State
+from dijkies.exceptions import InvalidExchangeAssetClientError
+from dijkies.executors import BacktestExchangeAssetClient
+from dijkies.interfaces import Metric, Strategy
+from dijkies.performance import (
+    DrawDown,
+    MetricsEngine,
+    PerformanceRecorder,
+    ReturnOnInvestment,
+)
+from dijkies.windows import (
+    NANOSECONDS_PER_MINUTE,
+    CandleWindow,
+    analysis_window_positions,
+    time_to_int64,
+)
+
+
+class SharedCandles:
+    """
+    places the numeric columns and the time column of a candle DataFrame in
+    one shared memory block, so worker processes can rebuild the DataFrame
+    without the data being pickled to every task.
+    """
+
+    def __init__(self, data: PandasDataFrame) -> None:
+        self.columns = [
+            name
+            for name in data.columns
+            if name != "time" and pd.api.types.is_numeric_dtype(data[name])
+        ]
+        self.time_dtype = data.time.dtype
+        self.length = len(data)
+        shape = (len(self.columns) + 1, self.length)
+
+        self.shared_memory = SharedMemory(
+            create=True, size=max(int(np.prod(shape)) * 8, 1)
+        )
+        array = np.ndarray(shape, dtype=np.float64, buffer=self.shared_memory.buf)
+        array[0].view(np.int64)[:] = data.time.to_numpy(dtype="datetime64[ns]").view(
+            np.int64
+        )
+        for row, name in enumerate(self.columns, start=1):
+            array[row] = data[name].to_numpy(dtype=np.float64)
+
+    @property
+    def descriptor(self) -> dict[str, Any]:
+        return {
+            "name": self.shared_memory.name,
+            "columns": self.columns,
+            "time_dtype": self.time_dtype,
+            "length": self.length,
+        }
+
+    @staticmethod
+    def attach(descriptor: dict[str, Any]) -> tuple[SharedMemory, PandasDataFrame]:
+        shared_memory = SharedMemory(name=descriptor["name"])
+
+        shape = (len(descriptor["columns"]) + 1, descriptor["length"])
+        array = np.ndarray(shape, dtype=np.float64, buffer=shared_memory.buf)
+
+        time = pd.Series(array[0].view(np.int64).view("datetime64[ns]"))
+        time_dtype = descriptor["time_dtype"]
+        if getattr(time_dtype, "tz", None) is not None:
+            time = time.dt.tz_localize("UTC")
+        columns = {"time": time.astype(time_dtype)}
+        for row, name in enumerate(descriptor["columns"], start=1):
+            columns[name] = array[row]
+        return shared_memory, pd.DataFrame(columns, copy=False)
+
+    def close(self) -> None:
+        self.shared_memory.close()
+        self.shared_memory.unlink()
+
+
+_worker_shared_memory: Optional[SharedMemory] = None
+_worker_data: Optional[PandasDataFrame] = None
+
+
+def _attach_worker(descriptor: dict[str, Any]) -> None:
+    global _worker_shared_memory, _worker_data
+    _worker_shared_memory, _worker_data = SharedCandles.attach(descriptor)
+
+
+def parameter_combinations(parameter_grid: dict[str, list]) -> list[dict[str, Any]]:
+    names = list(parameter_grid)
+    return [
+        dict(zip(names, values))
+        for values in itertools.product(*[parameter_grid[name] for name in names])
+    ]
+
+
+def create_strategy(
+    strategy_class: type[Strategy],
+    params: dict[str, Any],
+    state: State,
+    fee_market_order: float,
+    fee_limit_order: float,
+) -> Strategy:
+    executor = BacktestExchangeAssetClient(
+        state.model_copy(deep=True), fee_market_order, fee_limit_order
+    )
+    return strategy_class(executor, **params)
+
+
+def longest_lookback_strategy(
+    strategy_class: type[Strategy],
+    combinations: list[dict[str, Any]],
+    state: State,
+    fee_market_order: float,
+    fee_limit_order: float,
+) -> Strategy:
+    """
+    returns the strategy of the combination with the longest analysis window,
+    data that is validated for it is long enough for every combination.
+    """
+    strategies = (
+        create_strategy(
+            strategy_class, params, state, fee_market_order, fee_limit_order
+        )
+        for params in combinations
+    )
+    return max(strategies, key=lambda s: s.analysis_dataframe_size_in_minutes)
+
+
+def run_backtest(
+    strategy_class: type[Strategy],
+    params: dict[str, Any],
+    data: PandasDataFrame,
+    state: State,
+    fee_market_order: float,
+    fee_limit_order: float,
+) -> PandasDataFrame:
+    """
+    backtests a fresh strategy on data that is already validated.
+    """
+    strategy = create_strategy(
+        strategy_class, params, state, fee_market_order, fee_limit_order
+    )
+    return strategy._run_backtest(data)
+
+
+def score_backtest(result: PandasDataFrame, metrics: list[Metric]) -> dict[str, float]:
+    return MetricsEngine(metrics).calculate(result.total_value_strategy)
+
+
+def _sweep_task(
+    strategy_class: type[Strategy],
+    params: dict[str, Any],
+    state: State,
+    fee_market_order: float,
+    fee_limit_order: float,
+    metrics: list[Metric],
+) -> dict[str, Any]:
+    result = run_backtest(
+        strategy_class, params, _worker_data, state, fee_market_order, fee_limit_order
+    )
+    return {**params, **score_backtest(result, metrics)}
+
+
+def parameter_sweep(
+    strategy_class: type[Strategy],
+    parameter_grid: dict[str, list],
+    data: PandasDataFrame,
+    state: State,
+    fee_market_order: float = 0.0025,
+    fee_limit_order: float = 0.0015,
+    metrics: Optional[list[Metric]] = None,
+    max_workers: Optional[int] = None,
+) -> PandasDataFrame:
+    """
+    runs one backtest per combination of parameter_grid in a process pool and
+    returns a table with one row per combination: the parameters followed by
+    the metrics calculated on total_value_strategy.
+
+    Every backtest starts from a copy of state. The candle data is placed in
+    shared memory once, only numeric columns and time are shared.
+    """
+    metrics = [ReturnOnInvestment(), DrawDown()] if metrics is None else metrics
+    combinations = parameter_combinations(parameter_grid)
+
+    strategy = longest_lookback_strategy(
+        strategy_class, combinations, state, fee_market_order, fee_limit_order
+    )
+    data = strategy._validate_backtest_data(data)
+
+    shared_candles = SharedCandles(data)
+    try:
+        with ProcessPoolExecutor(
+            max_workers=max_workers,
+            initializer=_attach_worker,
+            initargs=(shared_candles.descriptor,),
+        ) as pool:
+            rows = list(
+                pool.map(
+                    _sweep_task,
+                    itertools.repeat(strategy_class),
+                    combinations,
+                    itertools.repeat(state),
+                    itertools.repeat(fee_market_order),
+                    itertools.repeat(fee_limit_order),
+                    itertools.repeat(metrics),
+                )
+            )
+    finally:
+        shared_candles.close()
+
+    return pd.DataFrame(
+        rows, columns=list(parameter_grid) + [m.metric_name for m in metrics]
+    )
+
+
+def broadcast_backtest(
+    strategies: list[Strategy], data: "PandasDataFrame | CandleDataset"
+) -> list[PandasDataFrame]:
+    """
+    backtests many independent strategies in one pass over the candles and
+    returns their results in the same order, equal to calling backtest on
+    each of them. The data is validated once, and every candle and analysis
+    window is built once for all strategies with the same lookback.
+
+    Strategies receive a shallow copy of the shared DataFrame window, or a
+    CandleWindow with their own scratch area, so derived columns do not
+    leak between strategies. A regular CandleDataset skips validation and
+    finds the windows by index arithmetic.
+    """
+    interval_in_minutes = None
+    if isinstance(data, CandleDataset) and data.is_regular:
+        interval_in_minutes = data.interval_in_minutes
+    longest = max(strategies, key=lambda s: s.analysis_dataframe_size_in_minutes)
+    data = longest._validate_backtest_data(data)
+    if not all(isinstance(s.executor, BacktestExchangeAssetClient) for s in strategies):
+        raise InvalidExchangeAssetClientError()
+
+    times = time_to_int64(data.time)
+    groups: dict[int, list[int]] = {}
+    for i, strategy in enumerate(strategies):
+        groups.setdefault(strategy.analysis_dataframe_size_in_minutes, []).append(i)
+    first_positions = {}
+    window_bounds = {}
+    for lookback in groups:
+        first_position, window_starts, window_ends = analysis_window_positions(
+            times, lookback, interval_in_minutes
+        )
+        first_positions[lookback] = first_position
+        window_bounds[lookback] = (window_starts, window_ends)
+
+    candles = None
+    if any(s.uses_candle_window for s in strategies):
+        candles = CandleWindow.from_dataframe(data)
+    strategy_candles = [
+        candles.with_own_scratch() if s.uses_candle_window else None for s in strategies
+    ]
+    recorders: list[Optional[PerformanceRecorder]] = [None] * len(strategies)
+
+    first_position = min(first_positions.values())
+    for position, (_, candle) in enumerate(
+        data.iloc[first_position:].iterrows(), start=first_position
+    ):
+        for lookback, group in groups.items():
+            if position < first_positions[lookback]:
+                continue
+            window_starts, window_ends = window_bounds[lookback]
+            window_start, window_end = window_starts[position], window_ends[position]
+            window = None
+
+            for i in group:
+                strategy = strategies[i]
+                if recorders[i] is None:
+                    recorders[i] = PerformanceRecorder(
+                        candle,
+                        strategy.state.total_value_in_quote(candle.open),
+                        capacity=len(data) - position,
+                    )
+
+                if strategy_candles[i] is not None:
+                    analysis_data = strategy_candles[i].window(window_start, window_end)
+                else:
+                    if window is None:
+                        window = data.iloc[window_start:window_end]
+                    analysis_data = window.copy(deep=False)
+
+                strategy.executor.update_current_candle(candle)
+                strategy.run(analysis_data)
+                recorders[i].record(candle, strategy.state)
+
+    return [recorder.to_dataframe() for recorder in recorders]
+
+
+def walk_forward_folds(
+    data: PandasDataFrame,
+    lookback_in_minutes: int,
+    window_size_in_minutes: int,
+) -> list[tuple[int, int, int, int]]:
+    """
+    splits sorted data into consecutive windows of window_size_in_minutes,
+    starting after the first lookback. Returns for every fold the positional
+    (start, stop) of window k and of window k + 1, both including the lookback
+    candles needed before the window starts.
+    """
+    times = time_to_int64(data.time)
+    first_window_start = times[0] + lookback_in_minutes * NANOSECONDS_PER_MINUTE
+    window_size = window_size_in_minutes * NANOSECONDS_PER_MINUTE
+    boundaries = np.arange(first_window_start, times[-1] + 1, window_size)
+
+    starts = np.searchsorted(
+        times, boundaries - lookback_in_minutes * NANOSECONDS_PER_MINUTE, side="left"
+    )
+    stops = np.searchsorted(times, boundaries + window_size, side="left")
+    has_candles = stops > np.searchsorted(times, boundaries, side="left")
+
+    return [
+        (int(starts[k]), int(stops[k]), int(starts[k + 1]), int(stops[k + 1]))
+        for k in range(len(boundaries) - 1)
+        if has_candles[k] and has_candles[k + 1]
+    ]
+
+
+def _walk_forward_task(
+    fold: tuple[int, int, int, int],
+    strategy_class: type[Strategy],
+    combinations: list[dict[str, Any]],
+    state: State,
+    fee_market_order: float,
+    fee_limit_order: float,
+    objective: Metric,
+    metrics: list[Metric],
+) -> dict[str, Any]:
+    in_sample_start, in_sample_stop, out_of_sample_start, out_of_sample_stop = fold
+    in_sample = _worker_data.iloc[in_sample_start:in_sample_stop]
+    out_of_sample = _worker_data.iloc[out_of_sample_start:out_of_sample_stop]
+
+    scores = [
+        objective.calculate(
+            run_backtest(
+                strategy_class,
+                params,
+                in_sample,
+                state,
+                fee_market_order,
+                fee_limit_order,
+            ).total_value_strategy
+        )
+        for params in combinations
+    ]
+    best = int(np.nanargmax(scores))
+
+    result = run_backtest(
+        strategy_class,
+        combinations[best],
+        out_of_sample,
+        state,
+        fee_market_order,
+        fee_limit_order,
+    )
+    return {
+        "out_of_sample_start": result.candle_time.iloc[0],
+        "out_of_sample_end": result.candle_time.iloc[-1],
+        **combinations[best],
+        f"in_sample_{objective.metric_name}": scores[best],
+        **score_backtest(result, metrics),
+    }
+
+
+def walk_forward(
+    strategy_class: type[Strategy],
+    parameter_grid: dict[str, list],
+    data: PandasDataFrame,
+    state: State,
+    window_size_in_minutes: int,
+    fee_market_order: float = 0.0025,
+    fee_limit_order: float = 0.0015,
+    objective: Optional[Metric] = None,
+    metrics: Optional[list[Metric]] = None,
+    max_workers: Optional[int] = None,
+) -> PandasDataFrame:
+    """
+    rolling walk forward optimization: for every fold the parameters that
+    maximize objective on window k are backtested on window k + 1. Folds run
+    in parallel, the data is validated once and shared with the workers,
+    which slice the folds by position.
+
+    Returns one row per fold with the out of sample period, the chosen
+    parameters, their in sample objective and the out of sample metrics.
+    """
+    objective = ReturnOnInvestment() if objective is None else objective
+    metrics = [ReturnOnInvestment(), DrawDown()] if metrics is None else metrics
+    combinations = parameter_combinations(parameter_grid)
+
+    strategy = longest_lookback_strategy(
+        strategy_class, combinations, state, fee_market_order, fee_limit_order
+    )
+    data = strategy._validate_backtest_data(data)
+    folds = walk_forward_folds(
+        data, strategy.analysis_dataframe_size_in_minutes, window_size_in_minutes
+    )
+
+    shared_candles = SharedCandles(data)
+    try:
+        with ProcessPoolExecutor(
+            max_workers=max_workers,
+            initializer=_attach_worker,
+            initargs=(shared_candles.descriptor,),
+        ) as pool:
+            rows = list(
+                pool.map(
+                    _walk_forward_task,
+                    folds,
+                    itertools.repeat(strategy_class),
+                    itertools.repeat(combinations),
+                    itertools.repeat(state),
+                    itertools.repeat(fee_market_order),
+                    itertools.repeat(fee_limit_order),
+                    itertools.repeat(objective),
+                    itertools.repeat(metrics),
+                )
+            )
+    finally:
+        shared_candles.close()
+
+    return pd.DataFrame(rows)
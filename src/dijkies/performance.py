@@ -1,12 +1,17 @@
+import copy
 import uuid
 from datetime import datetime
+from functools import cached_property
+from typing import Optional
 
 import numpy as np
+import pandas as pd
+from pandas.core.frame import DataFrame as PandasDataFrame
 from pandas.core.series import Series
 from pandas.core.series import Series as PandasSeries
 from pydantic import BaseModel
 
-from dijkies.executors import State
+from dijkies.entities import ORDER_EVENT_FIELDS, OrderLedger, State
 from dijkies.interfaces import Metric
 
 
@@ -84,6 +89,326 @@ class PerformanceInformationRow(BaseModel):
         )
 
 
+class PerformanceRecorder:
+    """
+    columnar alternative to a list of PerformanceInformationRow. Every candle
+    writes the raw balances into preallocated arrays, derived columns are
+    computed in one go by to_dataframe, which returns the same schema as
+    PerformanceInformationRow.
+
+    A slim recorder does not store the open orders of every candle. It stores
+    the number of open buy and sell orders instead and, after watch(state),
+    one row per order event, see order_event_dataframe.
+    """
+
+    float_fields = [
+        "candle_open",
+        "candle_high",
+        "candle_low",
+        "candle_close",
+        "balance_total_base",
+        "balance_total_quote",
+        "balance_base_on_hold",
+        "balance_quote_on_hold",
+        "total_fee_paid",
+    ]
+    # recorders pickled in a checkpoint before slim existed
+    slim = False
+
+    def __init__(
+        self,
+        start_candle: Series,
+        initialization_value_in_quote: float,
+        capacity: int = 1024,
+        slim: bool = False,
+    ) -> None:
+        self.start_time = pd.Timestamp(start_candle.time)
+        self.start_open = float(start_candle.open)
+        self.initialization_value_in_quote = initialization_value_in_quote
+        self.slim = slim
+        self.order_events: list[tuple] = []
+        self.size = 0
+        self._allocate(max(capacity, 1))
+
+    def _allocate(self, capacity: int) -> None:
+        self.capacity = capacity
+        self.candle_time = np.empty(capacity, dtype="datetime64[ns]")
+        self.number_of_transactions = np.empty(capacity, dtype=np.int64)
+        for field in self._order_fields():
+            dtype = np.int64 if self.slim else object
+            setattr(self, field, np.empty(capacity, dtype=dtype))
+        for field in self.float_fields:
+            setattr(self, field, np.empty(capacity, dtype=np.float64))
+
+    def _grow(self) -> None:
+        size = self.size
+        old = {field: getattr(self, field) for field in self._array_fields()}
+        self._allocate(self.capacity * 2)
+        for field, values in old.items():
+            getattr(self, field)[:size] = values[:size]
+
+    def _order_fields(self) -> list[str]:
+        if self.slim:
+            return ["open_buy_orders", "open_sell_orders"]
+        return ["buy_orders", "sell_orders"]
+
+    def _array_fields(self) -> list[str]:
+        return ["candle_time", "number_of_transactions"] + (
+            self._order_fields() + self.float_fields
+        )
+
+    def watch(self, state: OrderLedger) -> None:
+        """
+        makes a slim recorder collect the order events of state from now on.
+        """
+        if self.slim:
+            state.collect_order_events()
+            state.pop_order_events()
+
+    @property
+    def last_candle_time(self) -> Optional[int]:
+        """
+        time of the last recorded candle in nanoseconds since epoch (UTC).
+        """
+        if self.size == 0:
+            return None
+        return int(self.candle_time[self.size - 1].astype(np.int64))
+
+    def record(self, candle: Series, state: State) -> None:
+        if self.size == self.capacity:
+            self._grow()
+        i = self.size
+        self.candle_time[i] = pd.Timestamp(candle.time).as_unit("ns").asm8
+        self.candle_open[i] = candle.open
+        self.candle_high[i] = candle.high
+        self.candle_low[i] = candle.low
+        self.candle_close[i] = candle.close
+        if self.slim:
+            self.open_buy_orders[i] = state.number_of_open_buy_orders
+            self.open_sell_orders[i] = state.number_of_open_sell_orders
+            candle_time = self.candle_time[i]
+            self.order_events.extend(
+                (candle_time,) + event for event in state.pop_order_events()
+            )
+        else:
+            self.buy_orders[i] = [o.model_dump() for o in state.buy_orders]
+            self.sell_orders[i] = [o.model_dump() for o in state.sell_orders]
+        self.balance_total_base[i] = state.total_base
+        self.balance_total_quote[i] = state.total_quote
+        self.balance_base_on_hold[i] = state.base_on_hold
+        self.balance_quote_on_hold[i] = state.quote_on_hold
+        self.total_fee_paid[i] = state.total_fee_paid
+        self.number_of_transactions[i] = state.number_of_transactions
+        self.size += 1
+
+    def record_arrays(
+        self,
+        candles: PandasDataFrame,
+        total_base: np.ndarray,
+        total_quote: np.ndarray,
+        total_fee_paid: np.ndarray,
+        number_of_transactions: np.ndarray,
+    ) -> None:
+        """
+        records many candles at once, for engines that do not keep open orders.
+        """
+        n = len(candles)
+        while self.size + n > self.capacity:
+            self._grow()
+        rows = slice(self.size, self.size + n)
+        self.candle_time[rows] = candles.time.to_numpy(dtype="datetime64[ns]")
+        self.candle_open[rows] = candles.open.to_numpy(dtype=np.float64)
+        self.candle_high[rows] = candles.high.to_numpy(dtype=np.float64)
+        self.candle_low[rows] = candles.low.to_numpy(dtype=np.float64)
+        self.candle_close[rows] = candles.close.to_numpy(dtype=np.float64)
+        if self.slim:
+            self.open_buy_orders[rows] = 0
+            self.open_sell_orders[rows] = 0
+        else:
+            self.buy_orders[rows] = [[] for _ in range(n)]
+            self.sell_orders[rows] = [[] for _ in range(n)]
+        self.balance_total_base[rows] = total_base
+        self.balance_total_quote[rows] = total_quote
+        self.balance_base_on_hold[rows] = 0.0
+        self.balance_quote_on_hold[rows] = 0.0
+        self.total_fee_paid[rows] = total_fee_paid
+        self.number_of_transactions[rows] = number_of_transactions
+        self.size += n
+
+    def rows(self, start: int, stop: int) -> dict[str, np.ndarray]:
+        """
+        copies of the recorded arrays between positions start and stop.
+        """
+        return {
+            field: getattr(self, field)[start:stop].copy()
+            for field in self._array_fields()
+        }
+
+    def append_rows(self, rows: dict[str, np.ndarray]) -> None:
+        n = len(rows["candle_time"])
+        while self.size + n > self.capacity:
+            self._grow()
+        positions = slice(self.size, self.size + n)
+        for field, values in rows.items():
+            getattr(self, field)[positions] = values
+        self.size += n
+
+    def empty_copy(self) -> "PerformanceRecorder":
+        """
+        recorder with the same start candle and initial value, without rows.
+        """
+        recorder = copy.copy(self)
+        recorder.size = 0
+        recorder.order_events = []
+        recorder._allocate(1)
+        return recorder
+
+    def clear(self) -> None:
+        self.size = 0
+        self.order_events = []
+
+    def _candle_times(self, values: np.ndarray) -> pd.DatetimeIndex:
+        """
+        values (datetime64[ns], UTC) in the timezone and unit of the start
+        candle.
+        """
+        candle_time = pd.DatetimeIndex(values)
+        if self.start_time.tz is not None:
+            candle_time = candle_time.tz_localize("UTC").tz_convert(self.start_time.tz)
+        return candle_time.as_unit(self.start_time.unit)
+
+    def order_event_dataframe(self) -> PandasDataFrame:
+        """
+        one row per order that was placed, filled or cancelled, with the time
+        of the candle it happened in and the order fields at that moment. The
+        status column tells which event it was.
+        """
+        columns = ["candle_time", *ORDER_EVENT_FIELDS]
+        events = pd.DataFrame(self.order_events, columns=columns)
+        events["candle_time"] = self._candle_times(
+            events.candle_time.to_numpy(dtype="datetime64[ns]")
+        )
+        return events
+
+    def to_dataframe(self) -> PandasDataFrame:
+        n = self.size
+        close = self.candle_close[:n]
+        total_base = self.balance_total_base[:n]
+        total_quote = self.balance_total_quote[:n]
+        init_value = self.initialization_value_in_quote
+
+        candle_time = self._candle_times(self.candle_time[:n])
+
+        strategy_value = total_quote + total_base * close
+        hodl_value = (close / self.start_open) * init_value
+        roi_strategy = ((strategy_value / init_value) - 1) * 100
+        roi_hodl = ((close / self.start_open) - 1) * 100
+
+        duration_in_months = (candle_time - self.start_time).total_seconds().to_numpy(
+            dtype=np.float64
+        ) / (60 * 60 * 24 * 30)
+        exponent = 1 / np.maximum(duration_in_months, 0.01)
+
+        if self.slim:
+            orders = {
+                "open_buy_orders": self.open_buy_orders[:n],
+                "open_sell_orders": self.open_sell_orders[:n],
+                "exposure": total_base * close / strategy_value,
+            }
+        else:
+            orders = {
+                "buy_orders": self.buy_orders[:n],
+                "sell_orders": self.sell_orders[:n],
+            }
+
+        return pd.DataFrame(
+            {
+                "id": PerformanceInformationRow.model_fields["id"].default,
+                "candle_time": candle_time,
+                "candle_open": self.candle_open[:n],
+                "candle_high": self.candle_high[:n],
+                "candle_low": self.candle_low[:n],
+                "candle_close": close,
+                **orders,
+                "balance_total_base": total_base,
+                "balance_total_quote": total_quote,
+                "balance_available_base": total_base - self.balance_base_on_hold[:n],
+                "balance_available_quote": total_quote - self.balance_quote_on_hold[:n],
+                "balance_base_on_hold": self.balance_base_on_hold[:n],
+                "balance_quote_on_hold": self.balance_quote_on_hold[:n],
+                "total_fee_paid": self.total_fee_paid[:n],
+                "total_value_strategy": strategy_value,
+                "roi_strategy": roi_strategy,
+                "roi_strategy_per_month": (roi_strategy / 100 + 1) ** exponent,
+                "total_value_hodl": hodl_value,
+                "roi_hodl": roi_hodl,
+                "roi_hodl_per_month": (roi_hodl / 100 + 1) ** exponent,
+                "number_of_transactions": self.number_of_transactions[:n],
+                "absolute_profit": strategy_value - init_value,
+            }
+        )
+
+
+def rolling_total_return(values: np.ndarray, window: int) -> np.ndarray:
+    """
+    last / first value of every window of window values, NaN before the first
+    full window.
+    """
+    first = window - 1
+    result = np.full(len(values), np.nan)
+    result[first:] = values[first:] / values[: len(values) - first]
+    return result
+
+
+def rolling_max_draw_down(values: np.ndarray, window: int) -> np.ndarray:
+    """
+    the largest relative drop from a running peak within every window of
+    window values, NaN before the first full window.
+
+    The values are split in blocks of window values, so every window is a
+    suffix of one block followed by a prefix of the next. Prefix and suffix
+    draw downs, minima and maxima are cumulative per block, which makes this
+    linear (van Herk / Gil-Werman).
+    """
+    length = len(values)
+    number_of_blocks = -(-length // window)
+    padded = np.full(number_of_blocks * window, values[-1], dtype=float)
+    padded[:length] = values
+    blocks = padded.reshape(number_of_blocks, window)
+
+    prefix_max = np.maximum.accumulate(blocks, axis=1)
+    prefix_min = np.minimum.accumulate(blocks, axis=1)
+    prefix_draw_down = np.minimum.accumulate(blocks / prefix_max - 1, axis=1)
+
+    reversed_blocks = blocks[:, ::-1]
+    suffix_max = np.maximum.accumulate(reversed_blocks, axis=1)[:, ::-1]
+    suffix_min = np.minimum.accumulate(reversed_blocks, axis=1)[:, ::-1]
+    suffix_draw_down = np.minimum.accumulate(
+        (suffix_min / blocks - 1)[:, ::-1], axis=1
+    )[:, ::-1]
+
+    prefix_max, prefix_min, prefix_draw_down = (
+        a.ravel() for a in (prefix_max, prefix_min, prefix_draw_down)
+    )
+    suffix_max, suffix_draw_down = suffix_max.ravel(), suffix_draw_down.ravel()
+
+    result = np.full(length, np.nan)
+    ends = np.arange(window - 1, length)
+    starts = ends - window + 1
+    aligned = starts % window == 0
+    result[ends[aligned]] = prefix_draw_down[ends[aligned]]
+
+    ends, starts = ends[~aligned], starts[~aligned]
+    result[ends] = np.minimum.reduce(
+        [
+            suffix_draw_down[starts],
+            prefix_draw_down[ends],
+            prefix_min[ends] / suffix_max[starts] - 1,
+        ]
+    )
+    return result
+
+
 class DrawDown(Metric):
     @property
     def metric_name(self) -> str:
@@ -100,6 +425,14 @@ class DrawDown(Metric):
 
         return result
 
+    def calculate_curves(self, curves: "EquityCurves") -> np.ndarray:
+        return curves.draw_down.min(axis=1) * 100
+
+    def calculate_rolling(self, time_series: PandasSeries, window: int) -> PandasSeries:
+        values = time_series.to_numpy(dtype=float)
+        result = rolling_max_draw_down(values, window) * 100
+        return pd.Series(result, index=time_series.index)
+
 
 class ReturnOnInvestment(Metric):
     @property
@@ -109,6 +442,13 @@ class ReturnOnInvestment(Metric):
     def calculate(self, time_series: PandasSeries) -> float:
         return ((time_series.iloc[-1] / time_series.iloc[0]) - 1) * 100
 
+    def calculate_curves(self, curves: "EquityCurves") -> np.ndarray:
+        return (curves.total_return - 1) * 100
+
+    def calculate_rolling(self, time_series: PandasSeries, window: int) -> PandasSeries:
+        total_return = rolling_total_return(time_series.to_numpy(dtype=float), window)
+        return pd.Series((total_return - 1) * 100, index=time_series.index)
+
 
 class NormalizedReturnOnInvestment(Metric):
     def __init__(self, candle_interval_in_minutes: int) -> None:
@@ -130,6 +470,19 @@ class NormalizedReturnOnInvestment(Metric):
 
         return (return_per_month - 1) * 100
 
+    def calculate_curves(self, curves: "EquityCurves") -> np.ndarray:
+        total_time_in_minutes = curves.length * self.candle_interval_in_minutes
+        total_time_in_months = total_time_in_minutes / (60 * 24 * 30)
+        return_per_month = curves.total_return ** (min(1 / total_time_in_months, 1))
+        return (return_per_month - 1) * 100
+
+    def calculate_rolling(self, time_series: PandasSeries, window: int) -> PandasSeries:
+        total_time_in_minutes = window * self.candle_interval_in_minutes
+        total_time_in_months = total_time_in_minutes / (60 * 24 * 30)
+        total_return = rolling_total_return(time_series.to_numpy(dtype=float), window)
+        return_per_month = total_return ** (min(1 / total_time_in_months, 1))
+        return pd.Series((return_per_month - 1) * 100, index=time_series.index)
+
 
 class SharpeRatio(Metric):
     def __init__(
@@ -151,3 +504,201 @@ class SharpeRatio(Metric):
         volatility = max(returns.std(), 0.00001)
         sharpe_ratio = excess_return / volatility
         return sharpe_ratio * np.sqrt(measurements_per_day)
+
+    def calculate_curves(self, curves: "EquityCurves") -> np.ndarray:
+        risk_free_rate_per_day = (1 + self.risk_free_rate_per_year) ** (1 / 365) - 1
+        measurements_per_day = 60 * 24 / self.candle_interval_in_minutes
+        normalized_std_return = risk_free_rate_per_day / max(measurements_per_day, 1)
+        excess_return = curves.mean_return - normalized_std_return
+        volatility = np.maximum(curves.std_return, 0.00001)
+        sharpe_ratio = excess_return / volatility
+        return sharpe_ratio * np.sqrt(measurements_per_day)
+
+    def calculate_rolling(self, time_series: PandasSeries, window: int) -> PandasSeries:
+        """
+        the mean and std of the window - 1 returns in every window come from
+        cumulative sums of the returns, centered first to limit cancellation.
+        """
+        risk_free_rate_per_day = (1 + self.risk_free_rate_per_year) ** (1 / 365) - 1
+        measurements_per_day = 60 * 24 / self.candle_interval_in_minutes
+        normalized_std_return = risk_free_rate_per_day / max(measurements_per_day, 1)
+
+        values = time_series.to_numpy(dtype=float)
+        result = np.full(len(values), np.nan)
+        number_of_returns = window - 1
+        if number_of_returns >= 2 and len(values) >= window:
+            returns = values[1:] / values[:-1] - 1
+            offset = returns.mean()
+            centered = returns - offset
+            sums = np.r_[0.0, np.cumsum(centered)]
+            squared_sums = np.r_[0.0, np.cumsum(centered**2)]
+
+            window_sums = (
+                sums[number_of_returns:] - sums[: len(sums) - number_of_returns]
+            )
+            window_squared_sums = (
+                squared_sums[number_of_returns:]
+                - squared_sums[: len(squared_sums) - number_of_returns]
+            )
+            mean_return = window_sums / number_of_returns + offset
+            variance = (window_squared_sums - window_sums**2 / number_of_returns) / (
+                number_of_returns - 1
+            )
+            volatility = np.maximum(np.sqrt(np.maximum(variance, 0)), 0.00001)
+            sharpe_ratio = (mean_return - normalized_std_return) / volatility
+            result[number_of_returns:] = sharpe_ratio * np.sqrt(measurements_per_day)
+        return pd.Series(result, index=time_series.index)
+
+
+class OnlineMetrics:
+    """
+    draw down, ROI and Sharpe ratio of an equity curve that is received one
+    value at a time, in constant memory. The values equal DrawDown,
+    ReturnOnInvestment and SharpeRatio calculated on all values so far. The
+    returns are accumulated with Welford's algorithm.
+    """
+
+    def __init__(
+        self,
+        risk_free_rate_per_year: float = 0.0,
+        candle_interval_in_minutes: int = 60,
+    ) -> None:
+        self.risk_free_rate_per_year = risk_free_rate_per_year
+        self.candle_interval_in_minutes = candle_interval_in_minutes
+        self.number_of_values = 0
+        self.first_value = np.nan
+        self.last_value = np.nan
+        self.peak = np.nan
+        self.max_draw_down = 0.0
+        self.mean_return = 0.0
+        self.sum_squared_deviations = 0.0
+
+    def update(self, value: float) -> None:
+        if self.number_of_values == 0:
+            self.first_value = self.peak = value
+        else:
+            step_return = value / self.last_value - 1
+            number_of_returns = self.number_of_values
+            delta = step_return - self.mean_return
+            self.mean_return += delta / number_of_returns
+            self.sum_squared_deviations += delta * (step_return - self.mean_return)
+            self.peak = max(self.peak, value)
+            self.max_draw_down = min(self.max_draw_down, value / self.peak - 1)
+        self.last_value = value
+        self.number_of_values += 1
+
+    @property
+    def roi(self) -> float:
+        return (self.last_value / self.first_value - 1) * 100
+
+    @property
+    def draw_down(self) -> float:
+        """
+        the largest draw down so far, in percent.
+        """
+        return self.max_draw_down * 100
+
+    @property
+    def current_draw_down(self) -> float:
+        return (self.last_value / self.peak - 1) * 100
+
+    @property
+    def sharpe_ratio(self) -> float:
+        if self.number_of_values < 3:
+            return np.nan
+        risk_free_rate_per_day = (1 + self.risk_free_rate_per_year) ** (1 / 365) - 1
+        measurements_per_day = 60 * 24 / self.candle_interval_in_minutes
+        normalized_std_return = risk_free_rate_per_day / max(measurements_per_day, 1)
+        variance = self.sum_squared_deviations / (self.number_of_values - 2)
+        volatility = max(np.sqrt(variance), 0.00001)
+        sharpe_ratio = (self.mean_return - normalized_std_return) / volatility
+        return sharpe_ratio * np.sqrt(measurements_per_day)
+
+    def to_dict(self) -> dict[str, float]:
+        return {
+            "draw_down": self.draw_down,
+            "current_draw_down": self.current_draw_down,
+            "roi": self.roi,
+            "sharpe_ratio": self.sharpe_ratio,
+            "number_of_values": self.number_of_values,
+        }
+
+
+class EquityCurves:
+    """
+    one or more equity curves of equal length as a 2-D array with one curve
+    per row. The intermediates metrics share, like the returns, are computed
+    on first use and then reused by every metric.
+    """
+
+    def __init__(self, curves: "np.ndarray | PandasSeries | PandasDataFrame") -> None:
+        values = np.asarray(curves, dtype=float)
+        self.values = np.atleast_2d(values)
+        self.length = self.values.shape[1]
+
+    @cached_property
+    def returns(self) -> np.ndarray:
+        """
+        returns per step, one column shorter than the curves.
+        """
+        return self.values[:, 1:] / self.values[:, :-1] - 1
+
+    @cached_property
+    def total_return(self) -> np.ndarray:
+        return self.values[:, -1] / self.values[:, 0]
+
+    @cached_property
+    def mean_return(self) -> np.ndarray:
+        if self.length < 2:
+            return np.full(len(self.values), np.nan)
+        return self.returns.mean(axis=1)
+
+    @cached_property
+    def std_return(self) -> np.ndarray:
+        if self.length < 3:
+            return np.full(len(self.values), np.nan)
+        return self.returns.std(axis=1, ddof=1)
+
+    @cached_property
+    def draw_down(self) -> np.ndarray:
+        """
+        relative distance of every step to the running maximum.
+        """
+        cumulative = np.cumprod(self.returns + 1, axis=1)
+        cumulative = np.hstack([np.ones((len(self.values), 1)), cumulative])
+        running_max = np.maximum.accumulate(cumulative, axis=1)
+        return (cumulative - running_max) / running_max
+
+
+class MetricsEngine:
+    """
+    calculates a set of metrics on an equity curve, or on a 2-D array or
+    DataFrame with one curve per row, in one pass over the shared
+    intermediates.
+    """
+
+    def __init__(self, metrics: list[Metric]) -> None:
+        self.metrics = metrics
+
+    def calculate_curves(
+        self, curves: "np.ndarray | PandasDataFrame"
+    ) -> PandasDataFrame:
+        """
+        returns one row per curve and one column per metric.
+        """
+        equity_curves = EquityCurves(curves)
+        index = curves.index if isinstance(curves, PandasDataFrame) else None
+        return pd.DataFrame(
+            {
+                metric.metric_name: metric.calculate_curves(equity_curves)
+                for metric in self.metrics
+            },
+            index=index,
+        )
+
+    def calculate(self, time_series: "np.ndarray | PandasSeries") -> dict[str, float]:
+        """
+        returns the metrics of one equity curve by name.
+        """
+        row = self.calculate_curves(np.asarray(time_series, dtype=float)).iloc[0]
+        return {name: float(value) for name, value in row.items()}
@@ -0,0 +1,338 @@
+import time
+from abc import ABC, abstractmethod
+from typing import Optional
+
+import numpy as np
+import pandas as pd
+from pandas.core.frame import DataFrame as PandasDataFrame
+
+from dijkies.entities import Order, OrderLedger
+from dijkies.exceptions import DataTimeWindowShorterThanSuggestedAnalysisWindowError
+from dijkies.executors import (
+    backtest_order,
+    limit_order_fill,
+    market_buy_fill,
+    market_sell_fill,
+)
+from dijkies.windows import (
+    NANOSECONDS_PER_MINUTE,
+    rolling_window_bounds,
+    simulation_start_position,
+    time_to_int64,
+)
+
+PANEL_FIELDS = ("open", "high", "low", "close", "volume")
+
+
+class PortfolioState(OrderLedger):
+    """
+    State of a basket of bases that share one quote balance. The market of
+    every order is the base it trades.
+    """
+
+    bases: list[str]
+    total_base: dict[str, float]
+    total_quote: float
+    orders: list[Order] = []
+
+    def model_post_init(self, __context) -> None:
+        for base in self.bases:
+            self.total_base.setdefault(base, 0.0)
+
+    def base_on_hold(self, base: str) -> float:
+        return self._base_on_hold_of(base)
+
+    def base_available(self, base: str) -> float:
+        return self.total_base[base] - self.base_on_hold(base)
+
+    def _mutate_base(self, base: str, base_mutation: float) -> None:
+        self.total_base[base] += base_mutation
+
+    def _base_available(self, base: str) -> float:
+        return self.base_available(base)
+
+    def total_value_in_quote(self, prices: dict[str, float]) -> float:
+        return self.total_quote + sum(
+            self.total_base[base] * prices[base] for base in self.bases
+        )
+
+
+class CandlePanel:
+    """
+    time-aligned candles of many bases: times has shape (T,) and every OHLCV
+    field is a (T, number of bases) array. window() returns views.
+    """
+
+    def __init__(
+        self,
+        bases: list[str],
+        times: np.ndarray,
+        fields: dict[str, np.ndarray],
+    ) -> None:
+        self.bases = bases
+        self.times = times
+        self.fields = fields
+        self.base_index = {base: i for i, base in enumerate(bases)}
+
+    @classmethod
+    def from_dataframes(cls, candles: dict[str, PandasDataFrame]) -> "CandlePanel":
+        """
+        aligns the candle DataFrames of every base on the union of their
+        times, starting at the first time all bases have a candle. Missing
+        candles are filled with the previous close and zero volume, of
+        duplicate times the last candle is kept.
+        """
+        bases = list(candles)
+        frames = []
+        for df in candles.values():
+            frame = df.assign(time=time_to_int64(df.time)).set_index("time")
+            frame = frame[~frame.index.duplicated(keep="last")]
+            frames.append(frame[list(PANEL_FIELDS)])
+        panel = pd.concat(frames, axis=1, keys=bases).sort_index()
+
+        close = panel.xs("close", axis=1, level=1).ffill()
+        panel = panel.loc[close.notna().all(axis=1).to_numpy()]
+        close = close.loc[panel.index]
+
+        fields = {}
+        for field in PANEL_FIELDS:
+            values = panel.xs(field, axis=1, level=1)
+            fill = 0.0 if field == "volume" else close
+            fields[field] = np.ascontiguousarray(
+                values.fillna(fill).to_numpy(dtype=np.float64)
+            )
+        return cls(bases, panel.index.to_numpy(dtype=np.int64), fields)
+
+    def __len__(self) -> int:
+        return len(self.times)
+
+    def __getattr__(self, name: str) -> np.ndarray:
+        if name in PANEL_FIELDS:
+            return self.fields[name]
+        raise AttributeError(name)
+
+    def window(self, start: int, stop: int) -> "CandlePanel":
+        return CandlePanel(
+            self.bases,
+            self.times[start:stop],
+            {field: values[start:stop] for field, values in self.fields.items()},
+        )
+
+    def column(self, field: str, base: str) -> np.ndarray:
+        return self.fields[field][:, self.base_index[base]]
+
+    def prices(self, position: int, field: str = "close") -> dict[str, float]:
+        row = self.fields[field][position]
+        return {base: float(row[i]) for i, base in enumerate(self.bases)}
+
+
+class PortfolioBacktestExchangeClient:
+    """
+    simulates orders on many bases with the fee model of
+    BacktestExchangeAssetClient. Orders fill against the current panel row.
+    """
+
+    def __init__(
+        self, state: PortfolioState, fee_market_order: float, fee_limit_order: float
+    ) -> None:
+        self.state = state
+        self.fee_market_order = fee_market_order
+        self.fee_limit_order = fee_limit_order
+        self.current_high: dict[str, float] = {}
+        self.current_low: dict[str, float] = {}
+        self.current_close: dict[str, float] = {}
+        self._candle_time: Optional[int] = None
+
+    def update_current_candles(self, panel: CandlePanel, position: int) -> None:
+        self.current_high = panel.prices(position, "high")
+        self.current_low = panel.prices(position, "low")
+        self.current_close = panel.prices(position, "close")
+        self._candle_time = int(panel.times[position]) // 1_000_000_000
+
+    def _order_time(self) -> int:
+        candle_time = getattr(self, "_candle_time", None)
+        return int(time.time()) if candle_time is None else candle_time
+
+    def _new_order(self, base: str, side: str, **fields) -> Order:
+        return backtest_order(
+            self.state,
+            self._order_time(),
+            exchange="backtest",
+            market=base,
+            side=side,
+            **fields,
+        )
+
+    def place_limit_buy_order(
+        self, base: str, limit_price: float, amount_in_quote: float
+    ) -> Order:
+        order = self._new_order(
+            base,
+            "buy",
+            limit_price=float(limit_price),
+            on_hold=float(amount_in_quote),
+            status="open",
+            is_taker=False,
+        )
+        self.state.add_order(order)
+        return order
+
+    def place_limit_sell_order(
+        self, base: str, limit_price: float, amount_in_base: float
+    ) -> Order:
+        order = self._new_order(
+            base,
+            "sell",
+            limit_price=float(limit_price),
+            on_hold=float(amount_in_base),
+            status="open",
+            is_taker=False,
+        )
+        self.state.add_order(order)
+        return order
+
+    def place_market_buy_order(self, base: str, amount_in_quote: float) -> Order:
+        filled, filled_quote, fee = market_buy_fill(
+            amount_in_quote, self.current_close[base], self.fee_market_order
+        )
+        order = self._new_order(
+            base,
+            "buy",
+            time_filled=self._order_time(),
+            filled=float(filled),
+            filled_quote=float(filled_quote),
+            status="filled",
+            fee=float(fee),
+            is_taker=True,
+        )
+        self.state.process_filled_order(order)
+        return order
+
+    def place_market_sell_order(self, base: str, amount_in_base: float) -> Order:
+        filled, filled_quote, fee = market_sell_fill(
+            amount_in_base, self.current_close[base], self.fee_market_order
+        )
+        order = self._new_order(
+            base,
+            "sell",
+            time_filled=self._order_time(),
+            filled=float(filled),
+            filled_quote=float(filled_quote),
+            status="filled",
+            fee=float(fee),
+            is_taker=True,
+        )
+        self.state.process_filled_order(order)
+        return order
+
+    def cancel_order(self, order: Order) -> Order:
+        self.state.cancel_order(order)
+        return order
+
+    def update_state(self) -> None:
+        for order in self.state.open_orders:
+            if order.side == "buy":
+                if order.limit_price < self.current_low[order.market]:
+                    continue
+            elif order.limit_price > self.current_high[order.market]:
+                continue
+
+            filled, filled_quote, fee = limit_order_fill(
+                order.side, order.on_hold, order.limit_price, self.fee_limit_order
+            )
+            self.state.process_filled_order(
+                order.model_copy(
+                    update={
+                        "time_filled": self._order_time(),
+                        "on_hold": 0,
+                        "status": "filled",
+                        "fee": float(fee),
+                        "filled_quote": float(filled_quote),
+                        "filled": float(filled),
+                    }
+                )
+            )
+
+
+class PortfolioStrategy(ABC):
+    def __init__(self, executor: PortfolioBacktestExchangeClient) -> None:
+        self.executor = executor
+        self.state = self.executor.state
+
+    @property
+    @abstractmethod
+    def analysis_dataframe_size_in_minutes(self) -> int:
+        pass
+
+    @abstractmethod
+    def execute(self, panel: CandlePanel) -> None:
+        pass
+
+    def run(self, panel: CandlePanel) -> None:
+        self.executor.update_state()
+        self.execute(panel)
+
+    def __getstate__(self):
+        state = self.__dict__.copy()
+        state["executor"] = None
+        return state
+
+    def backtest(self, panel: CandlePanel) -> PandasDataFrame:
+        """
+        steps all bases in lockstep over the panel. Returns one row per candle
+        with the shared quote balance, the balance of every base and the value
+        of the strategy and of an equally weighted buy and hold portfolio.
+        """
+        lookback_in_min = self.analysis_dataframe_size_in_minutes
+        timespan_in_min = (panel.times[-1] - panel.times[0]) / NANOSECONDS_PER_MINUTE
+        if lookback_in_min > timespan_in_min:
+            raise DataTimeWindowShorterThanSuggestedAnalysisWindowError()
+
+        first_position = simulation_start_position(panel.times, lookback_in_min)
+        window_starts, window_ends = rolling_window_bounds(panel.times, lookback_in_min)
+
+        start_value = self.state.total_value_in_quote(
+            panel.prices(first_position, "open")
+        )
+
+        n = len(panel) - first_position
+        total_quote = np.empty(n)
+        quote_on_hold = np.empty(n)
+        total_base = np.empty((n, len(panel.bases)))
+        total_fee_paid = np.empty(n)
+        number_of_transactions = np.empty(n, dtype=np.int64)
+
+        for row, position in enumerate(range(first_position, len(panel))):
+            self.executor.update_current_candles(panel, position)
+            self.run(panel.window(window_starts[position], window_ends[position]))
+
+            total_quote[row] = self.state.total_quote
+            quote_on_hold[row] = self.state.quote_on_hold
+            total_base[row] = [self.state.total_base[base] for base in panel.bases]
+            total_fee_paid[row] = self.state.total_fee_paid
+            number_of_transactions[row] = self.state.number_of_transactions
+
+        close = panel.close[first_position:]
+        start_open = panel.open[first_position]
+        strategy_value = total_quote + (total_base * close).sum(axis=1)
+        hodl_value = start_value * (close / start_open).mean(axis=1)
+
+        result = pd.DataFrame(
+            {
+                "candle_time": pd.to_datetime(panel.times[first_position:], utc=True),
+                "balance_total_quote": total_quote,
+                "balance_quote_on_hold": quote_on_hold,
+                **{
+                    f"balance_total_{base}": total_base[:, i]
+                    for i, base in enumerate(panel.bases)
+                },
+                "total_fee_paid": total_fee_paid,
+                "total_value_strategy": strategy_value,
+                "roi_strategy": ((strategy_value / start_value) - 1) * 100,
+                "total_value_hodl": hodl_value,
+                "roi_hodl": ((hodl_value / start_value) - 1) * 100,
+                "number_of_transactions": number_of_transactions,
+                "absolute_profit": strategy_value - start_value,
+            }
+        )
+        return result
@@ -0,0 +1,138 @@
+import time
+from contextlib import contextmanager, nullcontext
+from typing import TYPE_CHECKING, Any, Iterator
+
+import numpy as np
+import pandas as pd
+from pandas.core.frame import DataFrame as PandasDataFrame
+
+if TYPE_CHECKING:
+    from dijkies.interfaces import Strategy
+
+ORDER_METHODS = (
+    "place_limit_buy_order",
+    "place_limit_sell_order",
+    "place_market_buy_order",
+    "place_market_sell_order",
+    "cancel_order",
+)
+
+_no_phase = nullcontext()
+
+
+def no_phase(name: str) -> nullcontext:
+    return _no_phase
+
+
+class BacktestProfiler:
+    """
+    collects the time spent per candle in every phase of a backtest:
+
+    - window: slicing the analysis window
+    - update_state: executor.update_state, filling resting orders
+    - execute: the rest of Strategy.run, without the orders it places
+    - orders: placing and cancelling orders from within execute
+    - record: recording the performance of the candle
+    """
+
+    phases = ("window", "update_state", "execute", "orders", "record")
+
+    def __init__(self) -> None:
+        self.timings: dict[str, list[float]] = {phase: [] for phase in self.phases}
+        self.total_seconds = 0.0
+        self.number_of_candles = 0
+        self._started_at = None
+        self._method_seconds: dict[str, float] = {}
+
+    def start(self) -> None:
+        self._started_at = time.perf_counter()
+
+    def stop(self) -> None:
+        self.total_seconds += time.perf_counter() - self._started_at
+        self.number_of_candles = len(self.timings["record"])
+
+    @contextmanager
+    def phase(self, name: str) -> Iterator[None]:
+        started_at = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.timings[name].append(time.perf_counter() - started_at)
+
+    def _timed_method(self, method: Any, phase: str) -> Any:
+        def timed(*args, **kwargs):
+            started_at = time.perf_counter()
+            try:
+                return method(*args, **kwargs)
+            finally:
+                self._method_seconds[phase] += time.perf_counter() - started_at
+
+        return timed
+
+    def run_strategy(self, strategy: "Strategy", data: Any) -> None:
+        """
+        calls strategy.run, timing update_state and the orders placed from
+        execute by temporarily wrapping those methods of the executor. The
+        rest of the time of run is attributed to execute.
+        """
+        executor = strategy.executor
+        timed_methods = {name: "orders" for name in ORDER_METHODS}
+        timed_methods["update_state"] = "update_state"
+        previous = {
+            name: vars(executor)[name]
+            for name in timed_methods
+            if name in vars(executor)
+        }
+
+        self._method_seconds = {"update_state": 0.0, "orders": 0.0}
+        for name, phase in timed_methods.items():
+            setattr(executor, name, self._timed_method(getattr(executor, name), phase))
+        started_at = time.perf_counter()
+        try:
+            strategy.run(data)
+        finally:
+            run_seconds = time.perf_counter() - started_at
+            for name in timed_methods:
+                if name in previous:
+                    setattr(executor, name, previous[name])
+                else:
+                    delattr(executor, name)
+
+            update_state_seconds = self._method_seconds["update_state"]
+            order_seconds = self._method_seconds["orders"]
+            self.timings["update_state"].append(update_state_seconds)
+            self.timings["execute"].append(
+                run_seconds - update_state_seconds - order_seconds
+            )
+            self.timings["orders"].append(order_seconds)
+
+    @property
+    def candles_per_second(self) -> float:
+        return self.number_of_candles / max(self.total_seconds, 1e-12)
+
+    def summary(self) -> PandasDataFrame:
+        """
+        one row per phase with the total time, its share of the backtest and
+        per candle percentiles in microseconds. The overall throughput is in
+        summary.attrs["candles_per_second"].
+        """
+        rows = []
+        for phase in self.phases:
+            values = np.array(self.timings[phase]) * 1e6
+            if len(values) == 0:
+                values = np.zeros(1)
+            rows.append(
+                {
+                    "phase": phase,
+                    "total_seconds": values.sum() / 1e6,
+                    "share": values.sum() / 1e6 / max(self.total_seconds, 1e-12),
+                    "mean_us": values.mean(),
+                    "p50_us": np.percentile(values, 50),
+                    "p90_us": np.percentile(values, 90),
+                    "p99_us": np.percentile(values, 99),
+                    "max_us": values.max(),
+                }
+            )
+        summary = pd.DataFrame(rows).set_index("phase")
+        summary.attrs["candles_per_second"] = self.candles_per_second
+        return summary
@@ -0,0 +1,175 @@
+import hashlib
+from collections import OrderedDict
+
+import numpy as np
+import pandas as pd
+from pandas.core.frame import DataFrame as PandasDataFrame
+
+from dijkies.exceptions import InvalidCandleIntervalError
+from dijkies.interfaces import validate_candle_columns
+from dijkies.windows import NANOSECONDS_PER_MINUTE, time_to_int64
+
+MINUTES_PER_DAY = 1440
+MINUTES_PER_WEEK = 7 * MINUTES_PER_DAY
+MINUTES_PER_MONTH = 30 * MINUTES_PER_DAY
+
+# weeks start on monday, the epoch (1970-01-01) was a thursday
+WEEK_OFFSET_IN_MINUTES = 4 * MINUTES_PER_DAY
+
+# (upper bound of requested minutes, interval in minutes, Bitvavo label)
+BITVAVO_INTERVALS: tuple[tuple[float, int, str], ...] = (
+    (3, 1, "1m"),
+    (10, 5, "5m"),
+    (23, 15, "15m"),
+    (45, 30, "30m"),
+    (90, 60, "1h"),
+    (180, 120, "2h"),
+    (300, 240, "4h"),
+    (420, 360, "6h"),
+    (600, 480, "8h"),
+    (1080, 720, "12h"),
+    (4 * MINUTES_PER_DAY, MINUTES_PER_DAY, "1d"),
+    (19 * MINUTES_PER_DAY, MINUTES_PER_WEEK, "1W"),
+    (float("inf"), MINUTES_PER_MONTH, "1M"),
+)
+
+AGGREGATIONS = {
+    "high": np.maximum,
+    "low": np.minimum,
+    "volume": np.add,
+}
+
+
+def bitvavo_interval(interval_in_minutes: int) -> tuple[int, str]:
+    """
+    returns the Bitvavo candle interval closest to interval_in_minutes, as
+    (interval in minutes, label).
+    """
+    for upper_bound, minutes, label in BITVAVO_INTERVALS:
+        if interval_in_minutes < upper_bound:
+            return minutes, label
+    raise InvalidCandleIntervalError(interval_in_minutes)
+
+
+def candle_buckets(times: np.ndarray, interval_in_minutes: int) -> np.ndarray:
+    """
+    returns the start of the candle every time (int64 nanoseconds) falls in.
+    Buckets are aligned like Bitvavo candles: to the epoch for intervals up to
+    a day, to monday for 1W and to the first of the month for 1M.
+    """
+    if interval_in_minutes == MINUTES_PER_MONTH:
+        months = times.view("datetime64[ns]").astype("datetime64[M]")
+        return months.astype("datetime64[ns]").view("int64")
+
+    offset = 0
+    if interval_in_minutes == MINUTES_PER_WEEK:
+        offset = WEEK_OFFSET_IN_MINUTES * NANOSECONDS_PER_MINUTE
+    interval = interval_in_minutes * NANOSECONDS_PER_MINUTE
+    return (times - offset) // interval * interval + offset
+
+
+def resample_candles(
+    data: PandasDataFrame, interval_in_minutes: int
+) -> PandasDataFrame:
+    """
+    aggregates candles to interval_in_minutes. Open is the first value in a
+    bucket, high the max, low the min, volume the sum and close and any other
+    column the last value.
+    """
+    validate_candle_columns(data)
+    if not data.time.is_monotonic_increasing:
+        data = data.sort_values("time", kind="stable")
+
+    times = time_to_int64(data.time)
+    spacing = np.diff(times)
+    if interval_in_minutes <= 0 or (
+        len(spacing) and interval_in_minutes * NANOSECONDS_PER_MINUTE < spacing.min()
+    ):
+        raise InvalidCandleIntervalError(interval_in_minutes)
+
+    buckets = candle_buckets(times, interval_in_minutes)
+    starts = np.flatnonzero(np.r_[True, buckets[1:] != buckets[:-1]])
+    lasts = np.r_[starts[1:], len(buckets)] - 1
+
+    time = pd.Series(buckets[starts].view("datetime64[ns]"))
+    if data.time.dt.tz is not None:
+        time = time.dt.tz_localize("UTC").dt.tz_convert(data.time.dt.tz)
+    columns = {"time": time.dt.as_unit(data.time.dt.unit)}
+    for name in data.columns:
+        if name == "time":
+            continue
+        values = data[name].to_numpy()
+        if name == "open":
+            columns[name] = values[starts]
+        elif name in AGGREGATIONS:
+            columns[name] = AGGREGATIONS[name].reduceat(values, starts)
+        else:
+            columns[name] = values[lasts]
+    return pd.DataFrame(columns, columns=data.columns)
+
+
+def candle_fingerprint(data: PandasDataFrame) -> str:
+    """
+    returns a hash of the values and column names of data.
+    """
+    hashes = pd.util.hash_pandas_object(data, index=False).to_numpy()
+    digest = hashlib.blake2b(hashes.tobytes(), digest_size=16)
+    digest.update(",".join(map(str, data.columns)).encode())
+    return digest.hexdigest()
+
+
+def _nests_in(source_interval: int, target_interval: int) -> bool:
+    """
+    whether every source_interval candle falls in exactly one target_interval
+    candle.
+    """
+    if source_interval in (MINUTES_PER_WEEK, MINUTES_PER_MONTH):
+        return False
+    if target_interval in (MINUTES_PER_WEEK, MINUTES_PER_MONTH):
+        return MINUTES_PER_DAY % source_interval == 0
+    return target_interval % source_interval == 0
+
+
+class CandleResampler:
+    """
+    derives higher candle intervals from base candles and caches the results
+    by base data fingerprint and interval, so a sweep over intervals does not
+    aggregate twice. An interval is derived from the largest cached interval of
+    the same base data that nests in it. At most max_entries results are kept,
+    the least recently used is dropped first.
+    """
+
+    def __init__(self, max_entries: int = 32) -> None:
+        self.max_entries = max_entries
+        self._cache: OrderedDict[tuple[str, int], PandasDataFrame] = OrderedDict()
+
+    def resample(
+        self, data: PandasDataFrame, interval_in_minutes: int
+    ) -> PandasDataFrame:
+        fingerprint = candle_fingerprint(data)
+        key = (fingerprint, interval_in_minutes)
+        if key in self._cache:
+            self._cache.move_to_end(key)
+            return self._cache[key].copy(deep=False)
+
+        source = data
+        source_intervals = [
+            interval
+            for cached_fingerprint, interval in self._cache
+            if cached_fingerprint == fingerprint
+            and _nests_in(interval, interval_in_minutes)
+        ]
+        if source_intervals:
+            source = self._cache[(fingerprint, max(source_intervals))]
+
+        result = resample_candles(source, interval_in_minutes)
+        self._cache[key] = result
+        while len(self._cache) > self.max_entries:
+            self._cache.popitem(last=False)
+        return result.copy(deep=False)
+
+    def clear(self) -> None:
+        self._cache.clear()
+
+
+default_resampler = CandleResampler()
@@ -0,0 +1,154 @@
+from abc import abstractmethod
+from pathlib import Path
+from typing import Union
+
+import pandas as pd
+from pandas.core.frame import DataFrame as PandasDataFrame
+
+from dijkies.interfaces import ResultSink
+
+ORDER_LIST_COLUMNS = ("buy_orders", "sell_orders")
+
+
+def _import_pyarrow():
+    try:
+        import pyarrow as pa
+    except ImportError as e:
+        raise ImportError("writing Parquet or Arrow files requires pyarrow") from e
+    return pa
+
+
+def arrow_schema(batch: PandasDataFrame):
+    """
+    Arrow schema of a backtest result batch. The columns with lists of orders
+    get an explicit list of Order structs, so batches in which no order is
+    open have the same schema as the others.
+    """
+    pa = _import_pyarrow()
+    order = pa.struct(
+        [
+            ("order_id", pa.string()),
+            ("exchange", pa.string()),
+            ("market", pa.string()),
+            ("time_created", pa.int64()),
+            ("time_canceled", pa.int64()),
+            ("time_filled", pa.int64()),
+            ("on_hold", pa.float64()),
+            ("side", pa.string()),
+            ("limit_price", pa.float64()),
+            ("actual_price", pa.float64()),
+            ("filled", pa.float64()),
+            ("filled_quote", pa.float64()),
+            ("fee", pa.float64()),
+            ("is_taker", pa.bool_()),
+            ("status", pa.string()),
+        ]
+    )
+    other_columns = [c for c in batch.columns if c not in ORDER_LIST_COLUMNS]
+    inferred = pa.Schema.from_pandas(batch[other_columns], preserve_index=False)
+    return pa.schema(
+        [
+            (
+                pa.field(name, pa.list_(order))
+                if name in ORDER_LIST_COLUMNS
+                else inferred.field(name)
+            )
+            for name in batch.columns
+        ]
+    )
+
+
+class DataFrameSink(ResultSink):
+    """
+    keeps the batches in memory, close returns them as one DataFrame like a
+    backtest without a sink.
+    """
+
+    def open(self) -> None:
+        self.batches: list[PandasDataFrame] = []
+
+    def write(self, batch: PandasDataFrame) -> None:
+        self.batches.append(batch)
+
+    def close(self) -> PandasDataFrame:
+        if not self.batches:
+            return pd.DataFrame()
+        return pd.concat(self.batches, ignore_index=True)
+
+
+class CSVSink(ResultSink):
+    """
+    appends the batches to a CSV file, close returns its path.
+    """
+
+    def __init__(self, path: Union[Path, str], batch_size: int = 10_000) -> None:
+        super().__init__(batch_size)
+        self.path = Path(path)
+
+    def open(self) -> None:
+        self.path.unlink(missing_ok=True)
+
+    def write(self, batch: PandasDataFrame) -> None:
+        batch.to_csv(self.path, mode="a", header=not self.path.exists(), index=False)
+
+    def close(self) -> Path:
+        return self.path
+
+
+class ArrowSink(ResultSink):
+    """
+    streams the batches to a file with typed columns. The schema is taken
+    from the first batch. Needs pyarrow.
+    """
+
+    def __init__(self, path: Union[Path, str], batch_size: int = 10_000) -> None:
+        super().__init__(batch_size)
+        self.path = Path(path)
+        self._writer = None
+        self._schema = None
+
+    @abstractmethod
+    def _new_writer(self, schema):
+        pass
+
+    def open(self) -> None:
+        _import_pyarrow()
+        self.path.unlink(missing_ok=True)
+        self._writer = None
+
+    def write(self, batch: PandasDataFrame) -> None:
+        pa = _import_pyarrow()
+        if self._writer is None:
+            self._schema = arrow_schema(batch)
+            self._writer = self._new_writer(self._schema)
+        table = pa.Table.from_pandas(batch, schema=self._schema, preserve_index=False)
+        self._writer.write_table(table)
+
+    def close(self) -> Path:
+        if self._writer is not None:
+            self._writer.close()
+            self._writer = None
+        return self.path
+
+
+class ParquetSink(ArrowSink):
+    """
+    streams the batches to a Parquet file, one row group per batch.
+    """
+
+    def _new_writer(self, schema):
+        import pyarrow.parquet as pq
+
+        return pq.ParquetWriter(self.path, schema)
+
+
+class ArrowIPCSink(ArrowSink):
+    """
+    streams the batches to an Arrow IPC (Feather v2) file, which can be
+    memory-mapped with pyarrow.memory_map and pyarrow.ipc.open_file.
+    """
+
+    def _new_writer(self, schema):
+        pa = _import_pyarrow()
+
+        return pa.ipc.new_file(str(self.path), schema)
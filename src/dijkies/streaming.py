@@ -0,0 +1,149 @@
+from pathlib import Path
+from typing import Any, Iterable, Iterator, Optional, Union
+
+import numpy as np
+import pandas as pd
+from pandas.core.frame import DataFrame as PandasDataFrame
+
+from dijkies.exceptions import (
+    DataTimeWindowShorterThanSuggestedAnalysisWindowError,
+    InvalidExchangeAssetClientError,
+)
+from dijkies.executors import BacktestExchangeAssetClient
+from dijkies.interfaces import ResultSink, Strategy, validate_candle_columns
+from dijkies.performance import PerformanceRecorder
+from dijkies.sinks import CSVSink
+from dijkies.windows import (
+    NANOSECONDS_PER_MINUTE,
+    CandleWindow,
+    rolling_window_bounds,
+    time_to_int64,
+)
+
+
+def read_candle_chunks(
+    paths: Union[Path, list[Path]], chunksize: int = 100_000
+) -> Iterator[PandasDataFrame]:
+    """
+    reads candles from CSV or Parquet files in chunks of at most chunksize
+    rows. Files are read in the given order. Reading Parquet needs pyarrow.
+    """
+    paths = [paths] if isinstance(paths, (str, Path)) else paths
+    for path in map(Path, paths):
+        if path.suffix == ".parquet":
+            try:
+                import pyarrow.parquet as pq
+            except ImportError as e:
+                raise ImportError("reading parquet files requires pyarrow") from e
+
+            batches = (
+                batch.to_pandas()
+                for batch in pq.ParquetFile(path).iter_batches(batch_size=chunksize)
+            )
+        else:
+            batches = pd.read_csv(path, chunksize=chunksize)
+
+        for chunk in batches:
+            if "time" in chunk.columns and not pd.api.types.is_datetime64_any_dtype(
+                chunk.time
+            ):
+                chunk["time"] = pd.to_datetime(chunk.time, utc=True)
+            yield chunk
+
+
+def _validate_chunk(chunk: PandasDataFrame, previous_time: Optional[int]) -> None:
+    validate_candle_columns(chunk)
+
+    times = time_to_int64(chunk.time)
+    if np.any(np.diff(times) < 0) or (
+        previous_time is not None and len(times) > 0 and times[0] <= previous_time
+    ):
+        raise ValueError("streamed candles should be sorted by time without overlap")
+
+
+def stream_backtest(
+    strategy: Strategy,
+    chunks: Iterable[PandasDataFrame],
+    output_path: Optional[Path] = None,
+    sink: Optional[ResultSink] = None,
+) -> Any:
+    """
+    backtests strategy on candles that arrive in chunks, for histories that
+    do not fit in memory. Only the last analysis_dataframe_size_in_minutes of
+    candles is kept in a rolling buffer, and the performance rows of every
+    chunk are written to sink, by default a CSVSink at output_path. Returns
+    what sink.close returns. Like Strategy.backtest, raises
+    DataTimeWindowShorterThanSuggestedAnalysisWindowError when the candles
+    span less than the analysis window.
+    """
+    if not isinstance(strategy.executor, BacktestExchangeAssetClient):
+        raise InvalidExchangeAssetClientError()
+
+    if sink is None:
+        sink = CSVSink(output_path)
+    sink.open()
+
+    lookback = strategy.analysis_dataframe_size_in_minutes * NANOSECONDS_PER_MINUTE
+    buffer: Optional[PandasDataFrame] = None
+    buffer_times: Optional[np.ndarray] = None
+    simulation_start: Optional[int] = None
+    recorder: Optional[PerformanceRecorder] = None
+
+    for chunk in chunks:
+        _validate_chunk(chunk, None if buffer_times is None else buffer_times[-1])
+        if len(chunk) == 0:
+            continue
+
+        new_candles_from = 0 if buffer is None else len(buffer)
+        buffer = chunk if buffer is None else pd.concat([buffer, chunk])
+        buffer = buffer.reset_index(drop=True)
+        buffer_times = time_to_int64(buffer.time)
+
+        if simulation_start is None:
+            simulation_start = buffer_times[0] + lookback
+        first_position = max(
+            new_candles_from,
+            int(np.searchsorted(buffer_times, simulation_start, side="left")),
+        )
+
+        window_starts, window_ends = rolling_window_bounds(
+            buffer_times, strategy.analysis_dataframe_size_in_minutes
+        )
+        candles = (
+            CandleWindow.from_dataframe(buffer) if strategy.uses_candle_window else None
+        )
+
+        for position, (_, candle) in enumerate(
+            buffer.iloc[first_position:].iterrows(), start=first_position
+        ):
+            if recorder is None:
+                recorder = PerformanceRecorder(
+                    candle,
+                    strategy.state.total_value_in_quote(candle.open),
+                    capacity=len(chunk),
+                )
+
+            window_start, window_end = window_starts[position], window_ends[position]
+            if candles is None:
+                analysis_data = buffer.iloc[window_start:window_end]
+            else:
+                analysis_data = candles.window(window_start, window_end)
+            strategy.executor.update_current_candle(candle)
+
+            strategy.run(analysis_data)
+
+            recorder.record(candle, strategy.state)
+
+        if recorder is not None and recorder.size > 0:
+            sink.write(recorder.to_dataframe())
+            recorder.clear()
+
+        keep_from = np.searchsorted(buffer_times, buffer_times[-1] - lookback)
+        buffer = buffer.iloc[keep_from:]
+        buffer_times = buffer_times[keep_from:]
+
+    result = sink.close()
+    if recorder is None:
+        raise DataTimeWindowShorterThanSuggestedAnalysisWindowError()
+
+    return result
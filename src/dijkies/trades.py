@@ -0,0 +1,224 @@
+from typing import Optional, Union
+
+import numpy as np
+import pandas as pd
+from pandas.core.frame import DataFrame as PandasDataFrame
+
+from dijkies.entities import Order, OrderLedger, State
+
+ORDER_COLUMNS = ["order_id", "market", "side", "time", "filled", "filled_quote", "fee"]
+
+ARCHIVE_COLUMNS = (
+    "order_id",
+    "market",
+    "is_buy",
+    "time_created",
+    "time_filled",
+    "filled",
+    "filled_quote",
+    "fee",
+)
+
+ROUND_TRIP_COLUMNS = [
+    "market",
+    "buy_order_id",
+    "sell_order_id",
+    "time_opened",
+    "time_closed",
+    "holding_time",
+    "amount",
+    "buy_price",
+    "sell_price",
+    "fees",
+    "pnl",
+    "return",
+]
+
+
+def filled_order_frame(orders: Union[list[Order], OrderLedger]) -> PandasDataFrame:
+    """
+    one row per filled order, sorted by the time it was filled. For a state,
+    archived orders are read from the archive columns without creating Order
+    objects.
+    """
+    frames = []
+    if isinstance(orders, OrderLedger):
+        archive = orders.closed_order_archive
+        if archive is not None and archive.size:
+            filled = archive.is_filled[: archive.size]
+            columns = {
+                name: getattr(archive, name)[: archive.size][filled]
+                for name in ARCHIVE_COLUMNS
+            }
+            missing_time = columns["time_filled"] == archive.MISSING_TIME
+            columns["side"] = np.where(columns.pop("is_buy"), "buy", "sell")
+            columns["time"] = np.where(
+                missing_time, columns.pop("time_created"), columns.pop("time_filled")
+            )
+            frames.append(pd.DataFrame(columns, columns=ORDER_COLUMNS))
+        orders = orders.orders
+
+    frames.append(
+        pd.DataFrame(
+            [
+                (
+                    order.order_id,
+                    order.market,
+                    order.side,
+                    (
+                        order.time_created
+                        if order.time_filled is None
+                        else order.time_filled
+                    ),
+                    order.filled,
+                    order.filled_quote,
+                    order.fee,
+                )
+                for order in orders
+                if order.is_filled
+            ],
+            columns=ORDER_COLUMNS,
+        )
+    )
+    frame = pd.concat([f for f in frames if len(f)] or frames, ignore_index=True)
+    return frame.sort_values("time", kind="stable", ignore_index=True)
+
+
+def _match_market(
+    orders: PandasDataFrame, market: str, initial_base: float
+) -> PandasDataFrame:
+    """
+    FIFO matching of the buys and sells of one market. The cumulative bought
+    and sold amounts are merged into segments, every segment is a lot that was
+    bought by one order and sold by another. initial_base is a lot held before
+    the first order, its sells are not round trips. A sell only takes lots that
+    were bought before it, the part of a sell that exceeds them is dropped.
+    """
+    is_buy = (orders.side == "buy").to_numpy()
+    buys = orders[is_buy]
+    sells = orders[~is_buy]
+
+    buy_amounts = np.r_[initial_base, buys.filled.to_numpy()]
+    sell_amounts = sells.filled.to_numpy()
+    cumulative_bought = np.cumsum(buy_amounts)
+    cumulative_sold = np.cumsum(sell_amounts)
+
+    # bought before every sell, the shortfall so far is dropped from the sells
+    buys_before = np.searchsorted(np.flatnonzero(is_buy), np.flatnonzero(~is_buy))
+    shortfall = np.maximum.accumulate(
+        np.r_[0.0, cumulative_sold - cumulative_bought[buys_before]]
+    )
+    cumulative_sold = cumulative_sold - shortfall[1:]
+    matched = cumulative_sold[-1] if len(sells) else 0.0
+
+    edges = np.unique(np.r_[0.0, cumulative_bought, cumulative_sold])
+    edges = np.r_[edges[edges < matched], matched]
+    lower, amount = edges[:-1], np.diff(edges)
+    keep = amount > 1e-12 * max(matched, 1.0)
+    lower, amount = lower[keep], amount[keep]
+
+    buy = np.searchsorted(cumulative_bought, lower, side="right")
+    sell = np.searchsorted(cumulative_sold, lower, side="right")
+    from_orders = buy > 0
+    amount = amount[from_orders]
+    buy, sell = buy[from_orders] - 1, sell[from_orders]
+
+    buy_filled = buys.filled.to_numpy()[buy]
+    sell_filled = sells.filled.to_numpy()[sell]
+    buy_price = buys.filled_quote.to_numpy()[buy] / buy_filled
+    sell_price = sells.filled_quote.to_numpy()[sell] / sell_filled
+    fees = (
+        buys.fee.to_numpy()[buy] * amount / buy_filled
+        + sells.fee.to_numpy()[sell] * amount / sell_filled
+    )
+    time_opened = buys.time.to_numpy()[buy]
+    time_closed = sells.time.to_numpy()[sell]
+    pnl = amount * (sell_price - buy_price) - fees
+
+    return pd.DataFrame(
+        {
+            "market": market,
+            "buy_order_id": buys.order_id.to_numpy()[buy],
+            "sell_order_id": sells.order_id.to_numpy()[sell],
+            "time_opened": time_opened,
+            "time_closed": time_closed,
+            "holding_time": time_closed - time_opened,
+            "amount": amount,
+            "buy_price": buy_price,
+            "sell_price": sell_price,
+            "fees": fees,
+            "pnl": pnl,
+            "return": pnl / (amount * buy_price),
+        },
+        columns=ROUND_TRIP_COLUMNS,
+    )
+
+
+def round_trips(
+    orders: Union[list[Order], OrderLedger],
+    initial_base: Optional[dict[str, float]] = None,
+) -> PandasDataFrame:
+    """
+    pairs filled buys and sells first in, first out into round trips, one row
+    per lot that was bought by one order and sold by another. Times are in
+    seconds, holding_time is time_closed - time_opened. pnl is in quote and
+    includes the fees of both orders pro rata, return is pnl over the cost of
+    the lot.
+
+    initial_base is the base held per market before the first order, sells of
+    it are not round trips. For a State it is derived from total_base, for a
+    list of orders it defaults to 0 and sells of base that was held before
+    the first order are dropped.
+    """
+    frame = filled_order_frame(orders)
+    if isinstance(orders, State) and initial_base is None:
+        bought = frame.filled[frame.side == "buy"].sum()
+        sold = frame.filled[frame.side == "sell"].sum()
+        held_before = max(orders.total_base - bought + sold, 0.0)
+        initial_base = {market: held_before for market in frame.market.unique()}
+    initial_base = {} if initial_base is None else initial_base
+
+    trips = [
+        _match_market(market_orders, market, initial_base.get(market, 0.0))
+        for market, market_orders in frame.groupby("market", sort=False)
+    ]
+    if not trips:
+        return pd.DataFrame(columns=ROUND_TRIP_COLUMNS)
+    return pd.concat(trips, ignore_index=True)
+
+
+def trade_statistics(
+    trips: PandasDataFrame,
+    start_time: Optional[int] = None,
+    end_time: Optional[int] = None,
+) -> dict[str, float]:
+    """
+    summarizes round trips. exposure is the fraction of start_time - end_time
+    (default: the first opening to the last closing) in which at least one lot
+    was held.
+    """
+    pnl = trips.pnl.to_numpy(dtype=float)
+    wins = pnl[pnl > 0].sum()
+    losses = -pnl[pnl < 0].sum()
+
+    opened = trips.time_opened.to_numpy(dtype=float)
+    closed = trips.time_closed.to_numpy(dtype=float)
+    start_time = opened.min(initial=np.inf) if start_time is None else start_time
+    end_time = closed.max(initial=-np.inf) if end_time is None else end_time
+
+    order = np.argsort(opened, kind="stable")
+    opened, closed = opened[order], closed[order]
+    latest_close = np.r_[-np.inf, np.maximum.accumulate(closed)[:-1]]
+    held = np.clip(closed - np.maximum(opened, latest_close), 0, None).sum()
+    period = end_time - start_time
+
+    return {
+        "number_of_round_trips": len(trips),
+        "total_pnl": pnl.sum(),
+        "total_fees": trips.fees.sum(),
+        "win_rate": (pnl > 0).mean() if len(pnl) else np.nan,
+        "profit_factor": wins / losses if losses else np.inf,
+        "average_pnl": pnl.mean() if len(pnl) else np.nan,
+        "average_holding_time": trips.holding_time.mean(),
+        "exposure": held / period if period > 0 else np.nan,
+    }
@@ -0,0 +1,112 @@
+import numpy as np
+from pandas.core.frame import DataFrame as PandasDataFrame
+
+from dijkies.interfaces import SignalStrategy
+from dijkies.performance import PerformanceRecorder
+from dijkies.windows import simulation_start_position, time_to_int64
+
+
+def effective_trades(signals: np.ndarray) -> tuple[np.ndarray, np.ndarray]:
+    """
+    returns the positions and sides (1 buy, -1 sell) of the signals that result
+    in a trade, i.e. non-zero signals that differ from the previous one.
+    """
+    positions = np.flatnonzero(signals)
+    sides = signals[positions]
+    keep = np.ones(len(sides), dtype=bool)
+    keep[1:] = sides[1:] != sides[:-1]
+    return positions[keep], sides[keep]
+
+
+def simulate_signal_trades(
+    close: np.ndarray,
+    signals: np.ndarray,
+    total_base: float,
+    total_quote: float,
+    fee_market_order: float,
+) -> tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray]:
+    """
+    simulates all-in market orders at the candle close, using the fee formulas
+    of BacktestExchangeAssetClient. Returns the per candle total base, total
+    quote, total fee paid and number of transactions.
+    """
+    positions, sides = effective_trades(np.sign(signals))
+    prices = close[positions]
+    is_buy = sides > 0
+    fee = fee_market_order
+    n_trades = len(positions)
+
+    # after the first trade, everything is either in base or in quote. Each next
+    # trade converts the full amount, so the amount evolves as a product.
+    amount = np.empty(n_trades)
+    fees = np.empty(n_trades)
+    if n_trades > 0:
+        if is_buy[0]:
+            fees[0] = total_quote * fee / (1 + fee)
+            amount[0] = total_base + (total_quote - fees[0]) / prices[0]
+        else:
+            fees[0] = total_base * prices[0] * fee
+            amount[0] = total_quote + total_base * prices[0] - fees[0]
+
+        growth = np.where(is_buy, 1 / ((1 + fee) * prices), prices * (1 - fee))
+        amount[1:] = amount[0] * np.cumprod(growth[1:])
+        previous_amount = amount[:-1]
+        fees[1:] = np.where(
+            is_buy[1:],
+            previous_amount * fee / (1 + fee),
+            previous_amount * prices[1:] * fee,
+        )
+
+    base_after_trade = np.concatenate([[total_base], np.where(is_buy, amount, 0.0)])
+    quote_after_trade = np.concatenate([[total_quote], np.where(is_buy, 0.0, amount)])
+    fee_after_trade = np.concatenate([[0.0], np.cumsum(fees)])
+
+    trade_number = np.searchsorted(positions, np.arange(len(close)), side="right")
+
+    return (
+        base_after_trade[trade_number],
+        quote_after_trade[trade_number],
+        fee_after_trade[trade_number],
+        trade_number,
+    )
+
+
+def vectorized_backtest(
+    strategy: SignalStrategy, data: PandasDataFrame
+) -> PandasDataFrame:
+    data = strategy._validate_backtest_data(data)
+    times = time_to_int64(data.time)
+    first_position = simulation_start_position(
+        times, strategy.analysis_dataframe_size_in_minutes
+    )
+
+    signals = strategy.generate_signals(data).to_numpy(dtype=np.float64)
+    signals = np.nan_to_num(signals[first_position:])
+
+    simulation_df = data.iloc[first_position:]
+    start_candle = simulation_df.iloc[0]
+    state = strategy.state
+
+    total_base, total_quote, total_fee_paid, number_of_transactions = (
+        simulate_signal_trades(
+            simulation_df.close.to_numpy(dtype=np.float64),
+            signals,
+            state.total_base,
+            state.total_quote,
+            strategy.executor.fee_market_order,
+        )
+    )
+
+    recorder = PerformanceRecorder(
+        start_candle,
+        state.total_value_in_quote(start_candle.open),
+        capacity=len(simulation_df),
+    )
+    recorder.record_arrays(
+        simulation_df,
+        total_base,
+        total_quote,
+        total_fee_paid,
+        number_of_transactions,
+    )
+    return recorder.to_dataframe()
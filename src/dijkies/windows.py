@@ -0,0 +1,181 @@
+import numpy as np
+import pandas as pd
+from pandas.core.frame import DataFrame as PandasDataFrame
+from pandas.core.series import Series as PandasSeries
+
+NANOSECONDS_PER_MINUTE = 60 * 1_000_000_000
+
+
+def time_to_int64(time: PandasSeries) -> np.ndarray:
+    """
+    returns the time column as int64 nanoseconds since epoch (UTC).
+    """
+    return time.to_numpy(dtype="datetime64[ns]").view("int64")
+
+
+def simulation_start_position(times: np.ndarray, lookback_in_minutes: int) -> int:
+    """
+    returns the position of the first candle that has a full analysis window
+    of lookback_in_minutes behind it. times should be sorted.
+    """
+    first_time = times[0] + lookback_in_minutes * NANOSECONDS_PER_MINUTE
+    return int(np.searchsorted(times, first_time, side="left"))
+
+
+def rolling_window_bounds(
+    times: np.ndarray, lookback_in_minutes: int
+) -> tuple[np.ndarray, np.ndarray]:
+    """
+    returns the start (inclusive) and end (exclusive) positions of the analysis
+    window of every candle, so that times[starts[i]:ends[i]] covers
+    [times[i] - lookback_in_minutes, times[i]]. times should be sorted.
+    """
+    lookback = lookback_in_minutes * NANOSECONDS_PER_MINUTE
+    starts = np.searchsorted(times, times - lookback, side="left")
+    ends = np.searchsorted(times, times, side="right")
+    return starts, ends
+
+
+def regular_start_position(lookback_in_minutes: int, interval_in_minutes: int) -> int:
+    """
+    simulation_start_position for candles that are exactly interval_in_minutes
+    apart.
+    """
+    return -(-lookback_in_minutes // interval_in_minutes)
+
+
+def regular_window_bounds(
+    length: int, lookback_in_minutes: int, interval_in_minutes: int
+) -> tuple[np.ndarray, np.ndarray]:
+    """
+    rolling_window_bounds for length candles that are exactly
+    interval_in_minutes apart, computed from positions instead of times.
+    """
+    ends = np.arange(1, length + 1)
+    starts = np.maximum(ends - 1 - lookback_in_minutes // interval_in_minutes, 0)
+    return starts, ends
+
+
+def analysis_window_positions(
+    times: np.ndarray,
+    lookback_in_minutes: int,
+    interval_in_minutes: int | None = None,
+) -> tuple[int, np.ndarray, np.ndarray]:
+    """
+    returns the simulation start position and the rolling window bounds. When
+    interval_in_minutes is given, the candles are known to be exactly that far
+    apart and the times are not searched.
+    """
+    if interval_in_minutes is None:
+        return (
+            simulation_start_position(times, lookback_in_minutes),
+            *rolling_window_bounds(times, lookback_in_minutes),
+        )
+    return (
+        regular_start_position(lookback_in_minutes, interval_in_minutes),
+        *regular_window_bounds(len(times), lookback_in_minutes, interval_in_minutes),
+    )
+
+
+class CandleWindow:
+    """
+    read-only view over contiguous candle arrays. Windows created with
+    window() share the underlying arrays and scratch area, so slicing does not
+    copy. Derived columns are written with window["name"] = values and are
+    stored in the scratch area.
+    """
+
+    def __init__(
+        self,
+        columns: dict[str, np.ndarray],
+        scratch: dict[str, np.ndarray] | None = None,
+        start: int = 0,
+        stop: int | None = None,
+        time_dtype=None,
+    ) -> None:
+        self._columns = columns
+        self._scratch = {} if scratch is None else scratch
+        self._length = len(next(iter(columns.values()))) if columns else 0
+        self._start = start
+        self._stop = self._length if stop is None else stop
+        self._time_dtype = time_dtype
+
+    @classmethod
+    def from_dataframe(cls, data: PandasDataFrame) -> "CandleWindow":
+        columns = {}
+        time_dtype = None
+        for name in data.columns:
+            if name == "time":
+                time_dtype = data.time.dtype
+                array = data.time.to_numpy(dtype="datetime64[ns]")
+            elif pd.api.types.is_numeric_dtype(data[name]):
+                array = data[name].to_numpy(dtype=float)
+            else:
+                array = data[name].to_numpy()
+            array = np.ascontiguousarray(array)
+            array.setflags(write=False)
+            columns[name] = array
+        return cls(columns, time_dtype=time_dtype)
+
+    def with_own_scratch(self) -> "CandleWindow":
+        """
+        CandleWindow over the same read-only columns with an empty scratch
+        area, so several users can derive columns without seeing each other's.
+        """
+        return CandleWindow(
+            self._columns, None, self._start, self._stop, self._time_dtype
+        )
+
+    def window(self, start: int, stop: int) -> "CandleWindow":
+        return CandleWindow(
+            self._columns,
+            self._scratch,
+            self._start + start,
+            self._start + stop,
+            self._time_dtype,
+        )
+
+    @property
+    def _positions(self) -> slice:
+        return slice(self._start, self._stop)
+
+    @property
+    def columns(self) -> list[str]:
+        return list(self._columns) + list(self._scratch)
+
+    def __len__(self) -> int:
+        return self._stop - self._start
+
+    def __contains__(self, name: str) -> bool:
+        return name in self._columns or name in self._scratch
+
+    def __getitem__(self, name: str) -> np.ndarray:
+        if name in self._columns:
+            return self._columns[name][self._positions]
+        if name in self._scratch:
+            return self._scratch[name][self._positions]
+        raise KeyError(name)
+
+    def __setitem__(self, name: str, values) -> None:
+        if name in self._columns:
+            raise KeyError(f"candle column '{name}' is read-only")
+        if name not in self._scratch:
+            self._scratch[name] = np.full(self._length, np.nan)
+        self._scratch[name][self._positions] = np.asarray(values, dtype=float)
+
+    def __getattr__(self, name: str) -> np.ndarray:
+        if name.startswith("_"):
+            raise AttributeError(name)
+        try:
+            return self[name]
+        except KeyError:
+            raise AttributeError(name) from None
+
+    def to_dataframe(self) -> PandasDataFrame:
+        data = pd.DataFrame({name: self[name] for name in self.columns})
+        if self._time_dtype is not None:
+            time = data.time
+            if getattr(self._time_dtype, "tz", None) is not None:
+                time = time.dt.tz_localize("UTC")
+            data["time"] = time.astype(self._time_dtype)
+        return data
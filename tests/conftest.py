@@ -16,6 +16,7 @@ from dijkies.executors import (
     State,
 )
 from dijkies.interfaces import DataPipeline, Strategy
+from dijkies.windows import CandleWindow
 
 
 class RSIStrategy(Strategy):
@@ -68,6 +69,50 @@ class RSIStrategy(Strategy):
         )
 
 
+class WindowRSIStrategy(RSIStrategy):
+    uses_candle_window = True
+
+    def execute(self, candle_window: CandleWindow) -> None:
+        candle_window["momentum_rsi"] = RSIIndicator(
+            pd.Series(candle_window.close)
+        ).rsi()
+        previous_rsi, current_rsi = candle_window.momentum_rsi[-2:]
+
+        if previous_rsi > self.lower_threshold and current_rsi < self.lower_threshold:
+            self.executor.place_market_buy_order(
+                self.executor.state.base,
+                self.executor.state.quote_available,
+            )
+
+        if previous_rsi < self.higher_threshold and current_rsi > self.higher_threshold:
+            self.executor.place_market_sell_order(
+                self.executor.state.base,
+                self.executor.state.base_available,
+            )
+
+
+class GridStrategy(Strategy):
+    analysis_dataframe_size_in_minutes = 60 * 24
+
+    def execute(self, candle_df: PandasDataFrame) -> None:
+        price = candle_df.close.iloc[-1]
+        for order in self.state.open_orders:
+            if abs(order.limit_price / price - 1) > 0.05:
+                self.executor.cancel_order(order)
+
+        if len(self.state.open_orders) > 20:
+            return
+        for level in range(1, 6):
+            if self.state.quote_available > 200:
+                self.executor.place_limit_buy_order(
+                    self.state.base, price * (1 - level * 0.004), 100
+                )
+            if self.state.base_available > 0.002:
+                self.executor.place_limit_sell_order(
+                    self.state.base, price * (1 + level * 0.004), 0.001
+                )
+
+
 def get_state() -> State:
     return State(base="BTC", total_base=0.1, total_quote=10000)
 
@@ -0,0 +1,29 @@
+import numpy as np
+import pandas as pd
+
+from benchmarks.synthetic import generate_candles
+
+
+def test_generate_candles_is_deterministic_and_consistent() -> None:
+    # arrange
+
+    number_of_candles = 5000
+
+    # act
+
+    candles = generate_candles(number_of_candles, interval_in_minutes=5, seed=3)
+    same_seed = generate_candles(number_of_candles, interval_in_minutes=5, seed=3)
+    other_seed = generate_candles(number_of_candles, interval_in_minutes=5, seed=4)
+
+    # assert
+
+    assert len(candles) == number_of_candles
+    assert candles.equals(same_seed)
+    assert not candles.close.equals(other_seed.close)
+    assert (candles.low <= np.minimum(candles.open, candles.close)).all()
+    assert (candles.high >= np.maximum(candles.open, candles.close)).all()
+    assert (candles.volume > 0).all()
+    assert (candles.time.diff().iloc[1:] == pd.Timedelta(minutes=5)).all()
+    assert (
+        candles.open.iloc[1:].to_numpy() == candles.close.iloc[:-1].to_numpy()
+    ).all()
@@ -0,0 +1,95 @@
+import pickle
+from pathlib import Path
+from typing import Optional
+
+import pytest
+from conftest import RSIStrategy, get_executor
+from pandas.core.frame import DataFrame as PandasDataFrame
+
+from dijkies.checkpoint import BacktestCheckpoint
+from dijkies.performance import PerformanceRecorder
+
+
+class CrashingRSIStrategy(RSIStrategy):
+    crash_after: Optional[int] = None
+
+    def execute(self, candle_df: PandasDataFrame) -> None:
+        if CrashingRSIStrategy.crash_after is not None:
+            CrashingRSIStrategy.crash_after -= 1
+            if CrashingRSIStrategy.crash_after == 0:
+                raise RuntimeError("preempted")
+        super().execute(candle_df)
+
+
+def test_resume_backtest_from_checkpoint(
+    candle_df: PandasDataFrame, tmp_path: Path
+) -> None:
+    # arrange
+
+    checkpoint = BacktestCheckpoint(tmp_path / "backtest.pkl", every_n_candles=100)
+    expected = RSIStrategy(get_executor(), 35, 65).backtest(candle_df)
+
+    # act
+
+    CrashingRSIStrategy.crash_after = 450
+    with pytest.raises(RuntimeError):
+        CrashingRSIStrategy(get_executor(), 35, 65).backtest(candle_df, checkpoint)
+    CrashingRSIStrategy.crash_after = None
+
+    _, recorder = checkpoint.load()
+    result = checkpoint.resume(candle_df)
+
+    # assert
+
+    assert recorder.size == 400
+    assert result.drop(columns=["buy_orders", "sell_orders"]).equals(
+        expected.drop(columns=["buy_orders", "sell_orders"])
+    )
+
+
+def test_checkpoint_saves_only_new_rows(
+    candle_df: PandasDataFrame, tmp_path: Path
+) -> None:
+    # arrange
+
+    checkpoint = BacktestCheckpoint(tmp_path / "backtest.pkl", every_n_candles=100)
+    strategy = RSIStrategy(get_executor(), 35, 65)
+
+    # act
+
+    result = strategy.backtest(candle_df, checkpoint)
+    chunk_sizes = []
+    with open(checkpoint.rows_path, "rb") as file:
+        while file.tell() < checkpoint.rows_path.stat().st_size:
+            chunk_sizes.append(len(pickle.load(file)["candle_time"]))
+    _, recorder = BacktestCheckpoint(checkpoint.path, every_n_candles=100).load()
+
+    # assert
+
+    assert chunk_sizes == [100] * (len(result) // 100)
+    assert recorder.size == 100 * (len(result) // 100)
+    assert recorder.to_dataframe().equals(result.iloc[: recorder.size])
+
+
+def test_resume_from_checkpoint_without_rows(
+    candle_df: PandasDataFrame, tmp_path: Path
+) -> None:
+    # arrange
+
+    checkpoint = BacktestCheckpoint(tmp_path / "backtest.pkl", every_n_candles=100)
+    strategy = RSIStrategy(get_executor(), 35, 65)
+    expected = RSIStrategy(get_executor(), 35, 65).backtest(candle_df)
+    start_candle = strategy._validate_backtest_data(candle_df).iloc[0]
+    recorder = PerformanceRecorder(
+        start_candle, strategy.state.total_value_in_quote(start_candle.open)
+    )
+    checkpoint.save(strategy, recorder)
+
+    # act
+
+    result = checkpoint.resume(candle_df)
+
+    # assert
+
+    assert len(result) == len(expected)
+    assert result.total_value_strategy.equals(expected.total_value_strategy)
@@ -0,0 +1,121 @@
+import numpy as np
+import pandas as pd
+import pytest
+from conftest import RSIStrategy, WindowRSIStrategy, get_executor
+from pandas.core.frame import DataFrame as PandasDataFrame
+
+from dijkies.datasets import CandleDataset
+from dijkies.exceptions import IrregularCandleSpacingError
+from dijkies.optimization import broadcast_backtest
+from dijkies.windows import analysis_window_positions, time_to_int64
+
+
+@pytest.fixture
+def regular_df(candle_df: PandasDataFrame) -> PandasDataFrame:
+    return candle_df.iloc[:892]
+
+
+def test_candle_dataset_sorts_and_drops_duplicates(regular_df: PandasDataFrame) -> None:
+    # arrange
+
+    duplicate = regular_df.iloc[[10]].assign(close=1.0)
+    data = pd.concat([regular_df.iloc[::-1], duplicate])
+
+    # act
+
+    dataset = CandleDataset.validate(data)
+
+    # assert
+
+    assert dataset.is_regular
+    assert dataset.interval_in_minutes == 60
+    assert dataset.number_of_duplicates == 1
+    assert dataset.data.time.equals(regular_df.time)
+    assert dataset.data.close.iloc[10] == 1.0
+
+
+def test_candle_dataset_reports_and_fills_gaps(regular_df: PandasDataFrame) -> None:
+    # arrange
+
+    data = regular_df.drop(index=[5, 6, 20])
+
+    # act
+
+    dataset = CandleDataset.validate(data)
+    filled = CandleDataset.validate(data, fill_gaps=True)
+
+    # assert
+
+    assert not dataset.is_regular
+    assert dataset.gaps.start.tolist() == regular_df.time.iloc[[4, 19]].tolist()
+    assert dataset.gaps.end.tolist() == regular_df.time.iloc[[7, 21]].tolist()
+    assert dataset.gaps.missing_candles.tolist() == [2, 1]
+    assert filled.is_regular
+    assert filled.data.time.equals(regular_df.time)
+    assert (filled.data.loc[[5, 6], "open"] == regular_df.close.iloc[4]).all()
+    assert (filled.data.loc[[5, 6], "volume"] == 0).all()
+    assert filled.data.loc[21].equals(regular_df.loc[21])
+
+
+def test_candle_dataset_reports_gap_in_fixture(candle_df: PandasDataFrame) -> None:
+    # act
+
+    dataset = CandleDataset.validate(candle_df)
+
+    # assert
+
+    assert not dataset.is_regular
+    assert dataset.gaps.missing_candles.tolist() == [4]
+
+
+def test_candle_dataset_rejects_filling_off_grid_candles(
+    regular_df: PandasDataFrame,
+) -> None:
+    # arrange
+
+    data = regular_df.copy()
+    data.loc[10, "time"] += pd.Timedelta(minutes=90)
+
+    # act & assert
+
+    with pytest.raises(IrregularCandleSpacingError):
+        CandleDataset.validate(data.drop(index=[11, 12, 13]), fill_gaps=True)
+
+
+@pytest.mark.parametrize("lookback_in_minutes", [60 * 5, 60 * 5 + 30, 60 * 24 * 30])
+def test_regular_window_positions_match_time_search(
+    regular_df: PandasDataFrame, lookback_in_minutes: int
+) -> None:
+    # arrange
+
+    times = time_to_int64(regular_df.time)
+
+    # act
+
+    expected = analysis_window_positions(times, lookback_in_minutes)
+    result = analysis_window_positions(times, lookback_in_minutes, 60)
+
+    # assert
+
+    assert result[0] == expected[0]
+    assert np.array_equal(result[1], expected[1])
+    assert np.array_equal(result[2], expected[2])
+
+
+def test_backtest_on_candle_dataset(regular_df: PandasDataFrame) -> None:
+    # arrange
+
+    dataset = CandleDataset.validate(regular_df)
+    expected = RSIStrategy(get_executor(), 35, 65).backtest(regular_df)
+
+    # act
+
+    result = RSIStrategy(get_executor(), 35, 65).backtest(dataset)
+    broadcast_results = broadcast_backtest(
+        [WindowRSIStrategy(get_executor(), 35, 65)], dataset
+    )
+
+    # assert
+
+    assert result.drop(columns="id").equals(expected.drop(columns="id"))
+    assert broadcast_results[0].drop(columns="id").equals(expected.drop(columns="id"))
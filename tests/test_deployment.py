@@ -1,11 +1,25 @@
 from pathlib import Path
 
+import pandas as pd
 import pytest
+from conftest import RSIStrategy, get_executor
 from pandas.core.frame import DataFrame as PandasDataFrame
 
 from dijkies.deployment import Bot, LocalCredentialsRepository, LocalStrategyRepository
 from dijkies.executors import Order, State
-from dijkies.interfaces import Strategy
+from dijkies.interfaces import DataPipeline, Strategy
+
+
+class FixedPriceDataPipeline(DataPipeline):
+    def run(self) -> PandasDataFrame:
+        return pd.DataFrame({"close": [100.0, 110.0, 90.0]})
+
+
+class FixedPriceRSIStrategy(RSIStrategy):
+    online_metrics_interval_in_minutes = 15
+
+    def get_data_pipeline(self) -> DataPipeline:
+        return FixedPriceDataPipeline()
 
 
 def fail_execute(data: PandasDataFrame) -> None:
@@ -87,6 +101,35 @@ def test_bot_run_method_success(rsi_strategy: Strategy, tmp_path: Path) -> None:
     assert src_file.exists()
 
 
+def test_bot_run_updates_online_metrics(tmp_path: Path) -> None:
+    # arrange
+
+    person_id = "AD"
+    exchange = "backtest"
+    bot_id = "ddd"
+    status = "active"
+
+    strategy = FixedPriceRSIStrategy(get_executor(), 30, 70)
+    # strategies stored before online metrics existed
+    del strategy.online_metrics
+    strategy_repository = LocalStrategyRepository(tmp_path)
+    strategy_repository.store(strategy, person_id, exchange, bot_id, status)
+    bot = Bot(strategy_repository, LocalCredentialsRepository())
+
+    # act
+
+    bot.run(person_id, exchange, bot_id, status)
+    bot.run(person_id, exchange, bot_id, status)
+
+    # assert
+
+    loaded = strategy_repository.read(person_id, exchange, bot_id, status)
+    assert loaded.online_metrics.number_of_values == 2
+    assert loaded.online_metrics.roi == 0
+    assert loaded.online_metrics.first_value == strategy.state.total_value_in_quote(90)
+    assert loaded.online_metrics.candle_interval_in_minutes == 15
+
+
 def test_bot_run_method_failure(rsi_strategy: Strategy, tmp_path: Path) -> None:
     # arrange
 
@@ -0,0 +1,125 @@
+import pandas as pd
+from conftest import GridStrategy, get_state
+from pandas.core.frame import DataFrame as PandasDataFrame
+
+from dijkies.entities import Order
+from dijkies.executors import BacktestExchangeAssetClient, ExchangeAssetClient
+
+
+class LinearScanExchangeAssetClient(BacktestExchangeAssetClient):
+    def update_state(self) -> None:
+        ExchangeAssetClient.update_state(self)
+
+
+def test_order_book_fills_match_linear_scan(candle_df: PandasDataFrame) -> None:
+    # arrange
+
+    columns = [
+        "balance_total_base",
+        "balance_total_quote",
+        "balance_base_on_hold",
+        "balance_quote_on_hold",
+        "total_fee_paid",
+        "number_of_transactions",
+    ]
+    expected_strategy = GridStrategy(
+        LinearScanExchangeAssetClient(get_state(), 0.0025, 0.0015)
+    )
+    strategy = GridStrategy(BacktestExchangeAssetClient(get_state(), 0.0025, 0.0015))
+
+    # act
+
+    expected = expected_strategy.backtest(candle_df)
+    result = strategy.backtest(candle_df)
+
+    # assert
+
+    assert result.number_of_transactions.iloc[-1] > 100
+    assert result[columns].equals(expected[columns])
+    assert [o.status for o in strategy.state.orders] == [
+        o.status for o in expected_strategy.state.orders
+    ]
+
+
+def test_order_book_picks_up_orders_added_to_state() -> None:
+    # arrange
+
+    executor = BacktestExchangeAssetClient(get_state(), 0.0025, 0.0015)
+    order = executor.place_limit_buy_order("BTC", 100, 50)
+    executor.update_current_candle(pd.Series({"low": 150, "high": 160, "close": 155}))
+    executor.update_state()
+    other_client = BacktestExchangeAssetClient(executor.state, 0.0025, 0.0015)
+    cancelled = other_client.place_limit_sell_order("BTC", 200, 0.01)
+    other_client.cancel_order(cancelled)
+    executor.state.add_order(order.model_copy(update={"order_id": "external"}))
+
+    # act
+
+    executor.update_current_candle(pd.Series({"low": 90, "high": 110, "close": 95}))
+    executor.update_state()
+
+    # assert
+
+    assert [o.status for o in executor.state.orders] == [
+        "filled",
+        "cancelled",
+        "filled",
+    ]
+
+
+def test_backtest_orders_are_reproducible(candle_df: PandasDataFrame) -> None:
+    # arrange
+
+    first_strategy = GridStrategy(
+        BacktestExchangeAssetClient(get_state(), 0.0025, 0.0015)
+    )
+    second_strategy = GridStrategy(
+        BacktestExchangeAssetClient(get_state(), 0.0025, 0.0015)
+    )
+
+    # act
+
+    first_result = first_strategy.backtest(candle_df)
+    second_result = second_strategy.backtest(candle_df)
+
+    # assert
+
+    orders = first_strategy.state.orders
+    assert [o.order_id for o in orders[:3]] == [
+        "backtest-0",
+        "backtest-1",
+        "backtest-2",
+    ]
+    assert orders == second_strategy.state.orders
+    assert first_result.buy_orders.equals(second_result.buy_orders)
+    first_candle_time = int(first_result.candle_time.iloc[0].timestamp())
+    assert orders[0].time_created == first_candle_time
+    filled_order = first_strategy.state.filled_orders[0]
+    assert filled_order.time_filled >= filled_order.time_created
+    assert filled_order == Order.model_validate(filled_order.model_dump())
+
+
+def test_order_book_picks_up_orders_placed_after_an_archive() -> None:
+    # arrange
+
+    state = get_state()
+    state.enable_closed_order_archive(max_closed_orders=0)
+    executor = BacktestExchangeAssetClient(state, 0.0025, 0.0015)
+    executor.update_current_candle(pd.Series({"low": 150, "high": 160, "close": 155}))
+    executor.place_limit_buy_order("BTC", 100, 50)
+    executor.update_state()
+    executor.update_current_candle(pd.Series({"low": 90, "high": 110, "close": 95}))
+    executor.update_state()
+
+    # act
+
+    executor.place_limit_buy_order("BTC", 99.7, 50)
+    executor.update_current_candle(pd.Series({"low": 99, "high": 110, "close": 100}))
+    executor.update_state()
+    executor.update_state()
+
+    # assert
+
+    assert state.archive_generation > 0
+    assert state.open_orders == []
+    assert state.number_of_transactions == 2
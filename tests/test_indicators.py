@@ -0,0 +1,115 @@
+import pickle
+
+import numpy as np
+import pytest
+from pandas.core.frame import DataFrame as PandasDataFrame
+from ta.momentum import RSIIndicator
+from ta.trend import MACD, EMAIndicator
+from ta.volatility import AverageTrueRange as TAAverageTrueRange
+from ta.volatility import BollingerBands as TABollingerBands
+
+from dijkies.indicators import (
+    AverageTrueRange,
+    BollingerBands,
+    ExponentialMovingAverage,
+    MovingAverageConvergenceDivergence,
+    RelativeStrengthIndex,
+    RollingMaximum,
+    RollingMinimum,
+)
+from dijkies.windows import CandleWindow
+
+
+def feed(indicator, candle_df: PandasDataFrame) -> list:
+    columns = [candle_df[name].to_numpy() for name in indicator.source_columns]
+    return [indicator.update(*values) for values in zip(*columns)]
+
+
+def as_array(values: list, item: int | None = None) -> np.ndarray:
+    return np.array(
+        [np.nan if v is None else (v if item is None else v[item]) for v in values]
+    )
+
+
+@pytest.mark.parametrize(
+    "indicator, expected",
+    [
+        (
+            ExponentialMovingAverage(20),
+            lambda df: EMAIndicator(df.close, 20).ema_indicator(),
+        ),
+        (RelativeStrengthIndex(14), lambda df: RSIIndicator(df.close, 14).rsi()),
+        (
+            AverageTrueRange(14),
+            lambda df: TAAverageTrueRange(
+                df.high, df.low, df.close, 14
+            ).average_true_range(),
+        ),
+        (RollingMinimum(24), lambda df: df.close.rolling(24).min()),
+        (RollingMaximum(24), lambda df: df.close.rolling(24).max()),
+    ],
+)
+def test_scalar_indicators_match_full_computation(
+    candle_df: PandasDataFrame, indicator, expected
+) -> None:
+    # act
+
+    values = as_array(feed(indicator, candle_df))
+    expected_values = expected(candle_df).to_numpy(dtype=float)
+
+    # assert
+
+    valid = ~np.isnan(values)
+    assert valid.sum() > len(candle_df) - 30
+    assert np.allclose(values[valid], expected_values[valid])
+
+
+def test_band_indicators_match_full_computation(candle_df: PandasDataFrame) -> None:
+    # act
+
+    bands = feed(BollingerBands(20, 2), candle_df)
+    macd = feed(MovingAverageConvergenceDivergence(), candle_df)
+
+    ta_bands = TABollingerBands(candle_df.close, 20, 2)
+    ta_macd = MACD(candle_df.close)
+
+    # assert
+
+    for item, expected in enumerate(
+        [
+            ta_bands.bollinger_lband(),
+            ta_bands.bollinger_mavg(),
+            ta_bands.bollinger_hband(),
+        ]
+    ):
+        assert np.allclose(as_array(bands, item)[19:], expected[19:])
+    for item, expected in enumerate(
+        [ta_macd.macd(), ta_macd.macd_signal(), ta_macd.macd_diff()]
+    ):
+        values = as_array(macd, item)
+        valid = ~np.isnan(values)
+        assert np.allclose(values[valid], expected[valid])
+
+
+def test_update_from_data_only_feeds_new_candles(candle_df: PandasDataFrame) -> None:
+    # arrange
+
+    dataframe_rsi = RelativeStrengthIndex(14)
+    window_rsi = RelativeStrengthIndex(14)
+    candles = CandleWindow.from_dataframe(candle_df)
+    expected = RSIIndicator(candle_df.close, 14).rsi()
+
+    # act
+
+    for end in range(30, len(candle_df)):
+        start = max(end - 30, 0)
+        dataframe_rsi.update_from_data(candle_df.iloc[start:end])
+        window_rsi.update_from_data(candles.window(start, end))
+
+    restored = pickle.loads(pickle.dumps(dataframe_rsi))
+
+    # assert
+
+    assert dataframe_rsi.value == pytest.approx(expected.iloc[-2])
+    assert window_rsi.value == pytest.approx(expected.iloc[-2])
+    assert restored.update_from_data(candle_df) == pytest.approx(expected.iloc[-1])
@@ -0,0 +1,115 @@
+import numpy as np
+import pandas as pd
+import pytest
+from pandas.core.frame import DataFrame as PandasDataFrame
+from pandas.core.series import Series as PandasSeries
+
+from dijkies.interfaces import Metric
+from dijkies.performance import (
+    DrawDown,
+    MetricsEngine,
+    NormalizedReturnOnInvestment,
+    OnlineMetrics,
+    ReturnOnInvestment,
+    SharpeRatio,
+)
+
+
+class LastValue(Metric):
+    @property
+    def metric_name(self) -> str:
+        return "last_value"
+
+    def calculate(self, time_series: PandasSeries) -> float:
+        return time_series.iloc[-1]
+
+
+def get_metrics() -> list[Metric]:
+    return [
+        DrawDown(),
+        ReturnOnInvestment(),
+        NormalizedReturnOnInvestment(60),
+        SharpeRatio(0.02, 60),
+        LastValue(),
+    ]
+
+
+def test_metrics_engine_matches_calculate(candle_df: PandasDataFrame) -> None:
+    # arrange
+
+    rng = np.random.default_rng(42)
+    curves = candle_df.close.to_numpy() * rng.uniform(0.98, 1.02, size=(5, 1))
+    curves[1] = curves[1, ::-1]
+    metrics = get_metrics()
+
+    # act
+
+    result = MetricsEngine(metrics).calculate_curves(curves)
+
+    # assert
+
+    assert list(result.columns) == [metric.metric_name for metric in metrics]
+    for metric in metrics:
+        expected = [metric.calculate(pd.Series(curve)) for curve in curves]
+        np.testing.assert_allclose(result[metric.metric_name], expected, rtol=1e-9)
+
+
+def test_metrics_engine_single_curve(candle_df: PandasDataFrame) -> None:
+    # arrange
+
+    metrics = get_metrics()
+
+    # act
+
+    result = MetricsEngine(metrics).calculate(candle_df.close)
+
+    # assert
+
+    for metric in metrics:
+        assert np.isclose(result[metric.metric_name], metric.calculate(candle_df.close))
+
+
+def test_online_metrics_match_metrics(candle_df: PandasDataFrame) -> None:
+    # arrange
+
+    online_metrics = OnlineMetrics(0.02, 60)
+    curve = candle_df.close
+
+    # act
+
+    for value in curve:
+        online_metrics.update(value)
+
+    # assert
+
+    assert online_metrics.number_of_values == len(curve)
+    assert np.isclose(online_metrics.roi, ReturnOnInvestment().calculate(curve))
+    assert np.isclose(online_metrics.draw_down, DrawDown().calculate(curve))
+    assert np.isclose(
+        online_metrics.sharpe_ratio, SharpeRatio(0.02, 60).calculate(curve)
+    )
+    assert np.isclose(
+        online_metrics.current_draw_down,
+        (curve.iloc[-1] / curve.max() - 1) * 100,
+    )
+
+
+@pytest.mark.parametrize("window", [3, 24, 24 * 30, 1000])
+def test_rolling_metrics_match_calculate(
+    candle_df: PandasDataFrame, window: int
+) -> None:
+    # arrange
+
+    curve = candle_df.close
+
+    for metric in get_metrics():
+        # act
+
+        result = metric.calculate_rolling(curve, window)
+
+        # assert
+
+        expected = Metric.calculate_rolling(metric, curve, window)
+        assert result.index.equals(curve.index)
+        assert result.iloc[: window - 1].isna().all()
+        np.testing.assert_allclose(result, expected, rtol=1e-7)
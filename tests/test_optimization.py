@@ -0,0 +1,148 @@
+import numpy as np
+import pytest
+from conftest import RSIStrategy, WindowRSIStrategy, get_executor, get_state
+from pandas.core.frame import DataFrame as PandasDataFrame
+
+from dijkies.exceptions import DataTimeWindowShorterThanSuggestedAnalysisWindowError
+from dijkies.interfaces import ExchangeAssetClient, Strategy
+from dijkies.optimization import (
+    SharedCandles,
+    broadcast_backtest,
+    parameter_sweep,
+    walk_forward,
+    walk_forward_folds,
+)
+from dijkies.performance import ReturnOnInvestment
+
+
+class LookbackRSIStrategy(RSIStrategy):
+    def __init__(self, executor: ExchangeAssetClient, lookback_in_days: int) -> None:
+        self.analysis_dataframe_size_in_minutes = 60 * 24 * lookback_in_days
+        super().__init__(executor, 35, 65)
+
+
+def test_shared_candles_round_trip(candle_df: PandasDataFrame) -> None:
+    # arrange
+
+    shared_candles = SharedCandles(candle_df)
+
+    # act
+
+    shared_memory, data = SharedCandles.attach(shared_candles.descriptor)
+
+    # assert
+
+    assert data.equals(candle_df)
+
+    del data
+    shared_memory.close()
+    shared_candles.close()
+
+
+def test_parameter_sweep(candle_df: PandasDataFrame) -> None:
+    # act
+
+    result = parameter_sweep(
+        RSIStrategy,
+        {"lower_threshold": [30, 35], "higher_threshold": [65]},
+        candle_df,
+        get_state(),
+        metrics=[ReturnOnInvestment()],
+        max_workers=2,
+    )
+
+    # assert
+
+    expected = RSIStrategy(get_executor(), 35, 65).backtest(candle_df)
+
+    assert list(result.columns) == ["lower_threshold", "higher_threshold", "roi"]
+    assert result.lower_threshold.tolist() == [30, 35]
+    assert np.isclose(
+        result.roi.iloc[1],
+        ReturnOnInvestment().calculate(expected.total_value_strategy),
+    )
+
+
+def test_parameter_sweep_validates_the_longest_lookback(
+    candle_df: PandasDataFrame,
+) -> None:
+    # act
+
+    with pytest.raises(DataTimeWindowShorterThanSuggestedAnalysisWindowError):
+        parameter_sweep(
+            LookbackRSIStrategy, {"lookback_in_days": [1, 60]}, candle_df, get_state()
+        )
+
+
+def test_walk_forward_validates_the_longest_lookback(
+    candle_df: PandasDataFrame,
+) -> None:
+    # act
+
+    with pytest.raises(DataTimeWindowShorterThanSuggestedAnalysisWindowError):
+        walk_forward(
+            LookbackRSIStrategy,
+            {"lookback_in_days": [1, 60]},
+            candle_df,
+            get_state(),
+            window_size_in_minutes=60 * 24 * 7,
+        )
+
+
+def test_walk_forward_folds(candle_df: PandasDataFrame) -> None:
+    # act
+
+    folds = walk_forward_folds(candle_df, 60 * 24 * 30, 60 * 24 * 7)
+
+    # assert
+
+    assert len(folds) == 4
+    for fold, next_fold in zip(folds, folds[1:]):
+        assert next_fold[:2] == fold[2:]
+    assert all(start < stop for start, stop, _, _ in folds)
+
+
+def test_walk_forward(candle_df: PandasDataFrame) -> None:
+    # act
+
+    result = walk_forward(
+        RSIStrategy,
+        {"lower_threshold": [30, 35], "higher_threshold": [65]},
+        candle_df,
+        get_state(),
+        window_size_in_minutes=60 * 24 * 7,
+        max_workers=2,
+    )
+
+    # assert
+
+    assert len(result) == 4
+    assert result.out_of_sample_start.is_monotonic_increasing
+    assert set(result.lower_threshold) <= {30, 35}
+    assert {"in_sample_roi", "roi", "draw_down"} <= set(result.columns)
+
+
+def test_broadcast_backtest_matches_backtests(candle_df: PandasDataFrame) -> None:
+    # arrange
+
+    def create_strategies() -> list[Strategy]:
+        short_lookback = RSIStrategy(get_executor(), 40, 60)
+        short_lookback.analysis_dataframe_size_in_minutes = 60 * 24 * 10
+        return [
+            RSIStrategy(get_executor(), 35, 65),
+            WindowRSIStrategy(get_executor(), 30, 70),
+            short_lookback,
+            RSIStrategy(get_executor(), 30, 70),
+        ]
+
+    expected = [strategy.backtest(candle_df) for strategy in create_strategies()]
+
+    # act
+
+    results = broadcast_backtest(create_strategies(), candle_df)
+
+    # assert
+
+    assert [len(result) for result in results] == [716, 716, 716 + 20 * 24, 716]
+    for result, expected_result in zip(results, expected):
+        assert result.drop(columns="id").equals(expected_result.drop(columns="id"))
@@ -0,0 +1,100 @@
+from datetime import datetime, timezone
+
+import numpy as np
+import pandas as pd
+from conftest import GridStrategy, get_state
+from pandas.core.frame import DataFrame as PandasDataFrame
+
+from dijkies.executors import BacktestExchangeAssetClient, State
+from dijkies.performance import PerformanceInformationRow, PerformanceRecorder
+
+
+def test_performance_recorder_matches_performance_information_row() -> None:
+    # arrange
+
+    candles = [
+        pd.Series(
+            {
+                "time": datetime(2025, 8, 8, hour, tzinfo=timezone.utc),
+                "open": 1201 + hour,
+                "high": 1246 + hour,
+                "low": 1178 + hour,
+                "close": 1212 + hour,
+                "volume": 234,
+            }
+        )
+        for hour in range(5)
+    ]
+    state = State(base="BTC", total_base=1, total_quote=10000)
+    client = BacktestExchangeAssetClient(state, 0.0025, 0.0015)
+    start_value = state.total_value_in_quote(candles[0].open)
+    recorder = PerformanceRecorder(candles[0], start_value, capacity=2)
+    rows = []
+
+    # act
+
+    for candle in candles:
+        client.update_current_candle(candle)
+        client.place_limit_buy_order("BTC", limit_price=1000, amount_in_quote=100)
+        recorder.record(candle, state)
+        rows.append(
+            PerformanceInformationRow.from_objects(
+                candle, candles[0], state, start_value
+            ).model_dump()
+        )
+
+    result = recorder.to_dataframe()
+    expected = pd.DataFrame(rows)
+
+    # assert
+
+    assert list(result.columns) == list(expected.columns)
+    assert result.buy_orders.tolist() == expected.buy_orders.tolist()
+    numeric_columns = expected.select_dtypes("number").columns
+    assert np.allclose(result[numeric_columns], expected[numeric_columns])
+    assert (result.candle_time == expected.candle_time).all()
+
+
+def test_slim_backtest_matches_backtest(candle_df: PandasDataFrame) -> None:
+    # arrange
+
+    strategy = GridStrategy(BacktestExchangeAssetClient(get_state(), 0.0025, 0.0015))
+    slim_strategy = GridStrategy(
+        BacktestExchangeAssetClient(get_state(), 0.0025, 0.0015)
+    )
+
+    # act
+
+    expected = strategy.backtest(candle_df)
+    result, order_events = slim_strategy.slim_backtest(candle_df)
+
+    # assert
+
+    assert "buy_orders" not in result.columns
+    shared_columns = [c for c in expected.columns if c in result.columns]
+    assert len(shared_columns) == len(expected.columns) - 2
+    assert (
+        result[shared_columns]
+        .drop(columns="id")
+        .equals(expected[shared_columns].drop(columns="id"))
+    )
+    assert list(result.open_buy_orders) == [len(o) for o in expected.buy_orders]
+    assert list(result.open_sell_orders) == [len(o) for o in expected.sell_orders]
+    np.testing.assert_allclose(
+        result.exposure,
+        expected.balance_total_base
+        * expected.candle_close
+        / expected.total_value_strategy,
+    )
+
+    orders = slim_strategy.state.orders
+    last_events = order_events.groupby("order_id").last()
+    assert len(last_events) == len(orders)
+    assert all(last_events.status[o.order_id] == o.status for o in orders)
+    assert (order_events.status == "filled").sum() == len(
+        slim_strategy.state.filled_orders
+    )
+    assert order_events.candle_time.dtype == result.candle_time.dtype
+    assert order_events.candle_time.isin(result.candle_time).all()
+    slim_strategy.executor.place_limit_buy_order("BTC", 1, 10)
+    assert slim_strategy.state.pop_order_events() == []
@@ -0,0 +1,131 @@
+import numpy as np
+import pandas as pd
+from conftest import RSIStrategy, get_executor
+from pandas.core.frame import DataFrame as PandasDataFrame
+from pandas.core.series import Series as PandasSeries
+from ta.momentum import RSIIndicator
+
+from dijkies.portfolio import (
+    CandlePanel,
+    PortfolioBacktestExchangeClient,
+    PortfolioState,
+    PortfolioStrategy,
+)
+
+
+class PortfolioRSIStrategy(PortfolioStrategy):
+    analysis_dataframe_size_in_minutes = 60 * 24 * 30
+
+    def __init__(
+        self,
+        executor: PortfolioBacktestExchangeClient,
+        lower_threshold: float,
+        higher_threshold: float,
+    ) -> None:
+        self.lower_threshold = lower_threshold
+        self.higher_threshold = higher_threshold
+        super().__init__(executor)
+
+    def execute(self, panel: CandlePanel) -> None:
+        for base in panel.bases:
+            rsi = RSIIndicator(PandasSeries(panel.column("close", base))).rsi()
+            previous_rsi, current_rsi = rsi.iloc[-2], rsi.iloc[-1]
+
+            if previous_rsi > self.lower_threshold > current_rsi:
+                self.executor.place_market_buy_order(
+                    base, self.state.quote_available / len(panel.bases)
+                )
+            if previous_rsi < self.higher_threshold < current_rsi:
+                self.executor.place_market_sell_order(
+                    base, self.state.base_available(base)
+                )
+
+
+def test_candle_panel_aligns_bases(candle_df: PandasDataFrame) -> None:
+    # arrange
+
+    eth_df = candle_df.iloc[5:].drop(index=[10, 11]).copy()
+    eth_df[["open", "high", "low", "close"]] *= 0.05
+
+    # act
+
+    panel = CandlePanel.from_dataframes({"BTC": candle_df, "ETH": eth_df})
+
+    # assert
+
+    assert len(panel) == len(candle_df) - 5
+    assert panel.close.shape == (len(panel), 2)
+    assert panel.column("close", "ETH")[5] == panel.column("close", "ETH")[4]
+    assert panel.column("volume", "ETH")[5] == 0
+    assert np.shares_memory(panel.window(10, 20).close, panel.close)
+
+
+def test_candle_panel_keeps_last_of_duplicate_times(
+    candle_df: PandasDataFrame,
+) -> None:
+    # arrange
+
+    duplicate = candle_df.iloc[[20]].assign(close=1.0)
+    eth_df = pd.concat([candle_df, duplicate]).sort_values("time", kind="stable")
+
+    # act
+
+    panel = CandlePanel.from_dataframes({"BTC": candle_df, "ETH": eth_df})
+
+    # assert
+
+    assert len(panel) == len(candle_df)
+    assert panel.column("close", "ETH")[20] == 1.0
+    assert panel.column("close", "BTC")[20] == candle_df.close.iloc[20]
+
+
+def test_portfolio_backtest_with_one_base_matches_backtest(
+    candle_df: PandasDataFrame,
+) -> None:
+    # arrange
+
+    state = PortfolioState(bases=["BTC"], total_base={"BTC": 0.1}, total_quote=10000)
+    strategy = PortfolioRSIStrategy(
+        PortfolioBacktestExchangeClient(state, 0.0025, 0.0015), 35, 65
+    )
+
+    # act
+
+    result = strategy.backtest(CandlePanel.from_dataframes({"BTC": candle_df}))
+    expected = RSIStrategy(get_executor(), 35, 65).backtest(candle_df)
+
+    # assert
+
+    assert np.allclose(result.total_value_strategy, expected.total_value_strategy)
+    assert np.allclose(result.total_value_hodl, expected.total_value_hodl)
+    assert result.number_of_transactions.equals(expected.number_of_transactions)
+
+
+def test_portfolio_limit_orders_share_quote(candle_df: PandasDataFrame) -> None:
+    # arrange
+
+    eth_df = candle_df.copy()
+    eth_df[["open", "high", "low", "close"]] *= 0.05
+    panel = CandlePanel.from_dataframes({"BTC": candle_df, "ETH": eth_df})
+    state = PortfolioState(bases=["BTC", "ETH"], total_base={}, total_quote=1000)
+    client = PortfolioBacktestExchangeClient(state, 0.0025, 0.0015)
+    client.update_current_candles(panel, 0)
+
+    # act
+
+    client.place_limit_buy_order("BTC", panel.close[0, 0] * 2, 400)
+    client.place_limit_buy_order("ETH", 1, 500)
+    quote_available_before_fill = state.quote_available
+    client.update_state()
+
+    # assert
+
+    assert quote_available_before_fill == 100
+    assert state.total_base["BTC"] > 0
+    assert state.total_base["ETH"] == 0
+    assert state.quote_on_hold == 500
+    assert state.number_of_transactions == 1
+    assert [o.order_id for o in state.orders] == ["backtest-0", "backtest-1"]
+    first_candle_time = int(panel.times[0]) // 1_000_000_000
+    assert state.filled_orders[0].time_filled == first_candle_time
+    assert state.open_orders[0].time_created == first_candle_time
@@ -0,0 +1,50 @@
+from conftest import RSIStrategy, get_executor
+from pandas.core.frame import DataFrame as PandasDataFrame
+
+from dijkies.profiling import BacktestProfiler
+
+
+def test_profile_backtest(candle_df: PandasDataFrame) -> None:
+    # arrange
+
+    strategy = RSIStrategy(get_executor(), 35, 65)
+
+    # act
+
+    result, summary = strategy.profile_backtest(candle_df)
+
+    # assert
+
+    assert list(summary.index) == list(BacktestProfiler.phases)
+    assert summary.loc["orders", "total_seconds"] > 0
+    assert summary.loc["execute", "p50_us"] > 0
+    assert summary.share.sum() <= 1
+    assert summary.attrs["candles_per_second"] > 0
+    assert result.number_of_transactions.iloc[-1] > 0
+    assert "place_market_buy_order" not in vars(strategy.executor)
+
+
+class CountingRSIStrategy(RSIStrategy):
+    def run(self, data: PandasDataFrame) -> None:
+        self.number_of_runs = getattr(self, "number_of_runs", 0) + 1
+        super().run(data)
+
+
+def test_profiler_calls_run_and_restores_executor(candle_df: PandasDataFrame) -> None:
+    # arrange
+
+    strategy = CountingRSIStrategy(get_executor(), 35, 65)
+    executor = strategy.executor
+    place_market_buy_order = executor.place_market_buy_order
+    executor.place_market_buy_order = place_market_buy_order
+
+    # act
+
+    result, summary = strategy.profile_backtest(candle_df)
+
+    # assert
+
+    assert strategy.number_of_runs == len(result)
+    assert summary.loc["update_state", "total_seconds"] > 0
+    assert vars(executor)["place_market_buy_order"] == place_market_buy_order
+    assert "update_state" not in vars(executor)
@@ -0,0 +1,171 @@
+import pandas as pd
+import pytest
+from conftest import RSIStrategy, get_executor
+from pandas.core.frame import DataFrame as PandasDataFrame
+
+from dijkies.data_pipeline import OHLCVDataPipeline
+from dijkies.exceptions import InvalidCandleIntervalError
+from dijkies.interfaces import ExchangeMarketAPI
+from dijkies.resampling import (
+    MINUTES_PER_MONTH,
+    MINUTES_PER_WEEK,
+    CandleResampler,
+    bitvavo_interval,
+    resample_candles,
+)
+
+
+def pandas_resample(data: PandasDataFrame, rule: str) -> PandasDataFrame:
+    return (
+        data.set_index("time")
+        .resample(rule)
+        .agg(
+            {
+                "open": "first",
+                "high": "max",
+                "low": "min",
+                "close": "last",
+                "volume": "sum",
+            }
+        )
+        .dropna()
+        .reset_index()
+    )
+
+
+class CountingMarketAPI(ExchangeMarketAPI):
+    def __init__(self, candles: PandasDataFrame) -> None:
+        self.candles = candles
+        self.requests = []
+
+    def get_candles(
+        self, base: str, interval_in_minutes: int, lookback_in_minutes: int
+    ) -> PandasDataFrame:
+        self.requests.append((base, interval_in_minutes, lookback_in_minutes))
+        return self.candles
+
+    def get_price(self, base: str) -> float:
+        return self.candles.close.iloc[-1]
+
+
+@pytest.mark.parametrize(
+    "interval_in_minutes, rule",
+    [
+        (240, "4h"),
+        (1440, "1D"),
+        (MINUTES_PER_WEEK, "W-MON"),
+        (MINUTES_PER_MONTH, "MS"),
+    ],
+)
+def test_resample_candles_matches_pandas(
+    candle_df: PandasDataFrame, interval_in_minutes: int, rule: str
+) -> None:
+    # arrange
+
+    if rule == "W-MON":
+        expected = (
+            candle_df.set_index("time")
+            .resample(rule, label="left", closed="left")
+            .agg(
+                {
+                    "open": "first",
+                    "high": "max",
+                    "low": "min",
+                    "close": "last",
+                    "volume": "sum",
+                }
+            )
+            .reset_index()
+        )
+    else:
+        expected = pandas_resample(candle_df, rule)
+
+    # act
+
+    result = resample_candles(candle_df, interval_in_minutes)
+
+    # assert
+
+    pd.testing.assert_frame_equal(result, expected, check_freq=False)
+
+
+def test_resampler_derives_from_cached_intervals(candle_df: PandasDataFrame) -> None:
+    # arrange
+
+    resampler = CandleResampler()
+    four_hour = resampler.resample(candle_df, 240)
+
+    # act
+
+    eight_hour = resampler.resample(candle_df, 480)
+    cached = resampler.resample(candle_df, 240)
+
+    # assert
+
+    pd.testing.assert_frame_equal(eight_hour, resample_candles(candle_df, 480))
+    pd.testing.assert_frame_equal(cached, four_hour)
+    assert len(resampler._cache) == 2
+
+
+def test_resampler_rejects_interval_shorter_than_data(
+    candle_df: PandasDataFrame,
+) -> None:
+    # arrange
+
+    resampler = CandleResampler()
+
+    # act & assert
+
+    with pytest.raises(InvalidCandleIntervalError):
+        resampler.resample(candle_df, 15)
+
+
+def test_backtest_with_candle_interval(candle_df: PandasDataFrame) -> None:
+    # arrange
+
+    strategy = RSIStrategy(get_executor(), 35, 65)
+    expected_strategy = RSIStrategy(get_executor(), 35, 65)
+
+    # act
+
+    result = strategy.backtest(candle_df, candle_interval_in_minutes=240)
+    expected = expected_strategy.backtest(resample_candles(candle_df, 240))
+
+    # assert
+
+    assert result.drop(columns="id").equals(expected.drop(columns="id"))
+
+
+def test_ohlcv_data_pipeline_resamples_base_candles(
+    candle_df: PandasDataFrame,
+) -> None:
+    # arrange
+
+    market_api = CountingMarketAPI(candle_df)
+    pipeline = OHLCVDataPipeline(
+        market_api,
+        "BTC",
+        240,
+        60 * 24 * 7,
+        resampler=CandleResampler(),
+        base_interval_in_minutes=60,
+    )
+
+    # act
+
+    result = pipeline.run()
+
+    # assert
+
+    assert market_api.requests == [("BTC", 60, 60 * 24 * 7 + 240)]
+    pd.testing.assert_frame_equal(result, resample_candles(candle_df, 240))
+
+
+def test_bitvavo_interval() -> None:
+    # act & assert
+
+    assert bitvavo_interval(1) == (1, "1m")
+    assert bitvavo_interval(60) == (60, "1h")
+    assert bitvavo_interval(200) == (240, "4h")
+    assert bitvavo_interval(10 * 1440) == (MINUTES_PER_WEEK, "1W")
+    assert bitvavo_interval(60 * 1440) == (MINUTES_PER_MONTH, "1M")
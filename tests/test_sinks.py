@@ -0,0 +1,159 @@
+from pathlib import Path
+
+import pandas as pd
+import pytest
+from conftest import GridStrategy, RSIStrategy, get_executor, get_state
+from pandas.core.frame import DataFrame as PandasDataFrame
+
+from dijkies.checkpoint import BacktestCheckpoint
+from dijkies.executors import BacktestExchangeAssetClient
+from dijkies.sinks import ArrowIPCSink, CSVSink, DataFrameSink, ParquetSink
+from dijkies.streaming import read_candle_chunks, stream_backtest
+
+BALANCE_COLUMNS = [
+    "balance_total_base",
+    "balance_total_quote",
+    "total_fee_paid",
+    "number_of_transactions",
+]
+
+
+def test_backtest_with_dataframe_sink_matches_backtest(
+    candle_df: PandasDataFrame,
+) -> None:
+    # arrange
+
+    expected = RSIStrategy(get_executor(), 35, 65).backtest(candle_df)
+
+    # act
+
+    result = RSIStrategy(get_executor(), 35, 65).backtest(
+        candle_df, sink=DataFrameSink(batch_size=100)
+    )
+
+    # assert
+
+    pd.testing.assert_frame_equal(result, expected)
+
+
+def test_backtest_with_csv_sink_matches_backtest(
+    candle_df: PandasDataFrame, tmp_path: Path
+) -> None:
+    # arrange
+
+    expected = RSIStrategy(get_executor(), 35, 65).backtest(candle_df)
+
+    # act
+
+    path = RSIStrategy(get_executor(), 35, 65).backtest(
+        candle_df, sink=CSVSink(tmp_path / "performance.csv", batch_size=100)
+    )
+
+    # assert
+
+    result = pd.read_csv(path)
+    assert len(result) == len(expected)
+    assert result.total_value_strategy.to_numpy() == pytest.approx(
+        expected.total_value_strategy.to_numpy()
+    )
+
+
+@pytest.mark.parametrize("sink_class", [ParquetSink, ArrowIPCSink])
+def test_backtest_with_arrow_sink_round_trips(
+    candle_df: PandasDataFrame, tmp_path: Path, sink_class: type
+) -> None:
+    # arrange
+
+    pa = pytest.importorskip("pyarrow")
+    pq = pytest.importorskip("pyarrow.parquet")
+    expected = GridStrategy(
+        BacktestExchangeAssetClient(get_state(), 0.0025, 0.0015)
+    ).backtest(candle_df)
+    strategy = GridStrategy(BacktestExchangeAssetClient(get_state(), 0.0025, 0.0015))
+
+    # act
+
+    path = strategy.backtest(
+        candle_df, sink=sink_class(tmp_path / "performance", batch_size=100)
+    )
+
+    # assert
+
+    if sink_class is ParquetSink:
+        table = pq.read_table(path)
+        assert pq.ParquetFile(path).num_row_groups == -(-len(expected) // 100)
+    else:
+        with pa.memory_map(str(path)) as source:
+            table = pa.ipc.open_file(source).read_all()
+    result = table.to_pandas()
+    assert result.candle_time.equals(expected.candle_time)
+    assert result[BALANCE_COLUMNS].equals(expected[BALANCE_COLUMNS])
+    assert [len(orders) for orders in result.buy_orders] == [
+        len(orders) for orders in expected.buy_orders
+    ]
+    assert list(result.sell_orders.iloc[-1]) == expected.sell_orders.iloc[-1]
+
+
+def test_stream_backtest_writes_to_sink(candle_df: PandasDataFrame) -> None:
+    # arrange
+
+    chunks = read_candle_chunks(
+        Path("tests") / "fixtures" / "candle_df.csv", chunksize=200
+    )
+    expected = RSIStrategy(get_executor(), 35, 65).backtest(candle_df)
+
+    # act
+
+    result = stream_backtest(
+        RSIStrategy(get_executor(), 35, 65), chunks, sink=DataFrameSink()
+    )
+
+    # assert
+
+    assert len(result) == len(expected)
+    assert result.total_value_strategy.to_numpy() == pytest.approx(
+        expected.total_value_strategy.to_numpy()
+    )
+
+
+def test_backtest_with_sink_cannot_be_checkpointed(
+    candle_df: PandasDataFrame, tmp_path: Path
+) -> None:
+    # arrange
+
+    checkpoint = BacktestCheckpoint(tmp_path / "checkpoint", every_n_candles=100)
+
+    # act
+
+    with pytest.raises(ValueError):
+        RSIStrategy(get_executor(), 35, 65).backtest(
+            candle_df,
+            checkpoint=checkpoint,
+            sink=DataFrameSink(),
+        )
+
+    # assert
+
+    assert not checkpoint.path.exists()
+
+
+class FailingStrategy(RSIStrategy):
+    def execute(self, candle_df: PandasDataFrame) -> None:
+        raise RuntimeError("strategy failed")
+
+
+def test_backtest_with_sink_raises_the_error_of_the_strategy(
+    candle_df: PandasDataFrame,
+) -> None:
+    # arrange
+
+    sink = DataFrameSink()
+
+    # act
+
+    with pytest.raises(RuntimeError, match="strategy failed"):
+        FailingStrategy(get_executor(), 35, 65).backtest(candle_df, sink=sink)
+
+    # assert
+
+    assert sink.close().empty
@@ -1,3 +1,7 @@
+import math
+import pickle
+import random
+
 import pandas as pd
 
 from dijkies.executors import BacktestExchangeAssetClient, State
@@ -124,3 +128,177 @@ def test_multiple_limit_orders_create_fill_cancel():
     retrieved_order = client.get_order_info(order3)
 
     assert retrieved_order.status == "cancelled"
+
+
+def assert_index_matches_orders(state: State) -> None:
+    open_orders = [o for o in state.orders if o.is_open]
+    filled_orders = [o for o in state.orders if o.is_filled]
+    assert state.open_orders == open_orders
+    assert state.buy_orders == [o for o in open_orders if o.side == "buy"]
+    assert state.sell_orders == [o for o in open_orders if o.side == "sell"]
+    assert state.filled_orders == filled_orders
+    assert state.cancelled_orders == [o for o in state.orders if o.is_cancelled]
+    assert state.number_of_transactions == len(filled_orders)
+    assert math.isclose(
+        state.total_fee_paid, sum(o.fee for o in filled_orders), abs_tol=1e-9
+    )
+    assert math.isclose(
+        state.quote_on_hold,
+        sum(o.on_hold for o in open_orders if o.side == "buy"),
+        abs_tol=1e-9,
+    )
+    assert math.isclose(
+        state.base_on_hold,
+        sum(o.on_hold for o in open_orders if o.side == "sell"),
+        abs_tol=1e-9,
+    )
+
+
+def test_state_index_follows_orders():
+    # Arrange
+    rng = random.Random(7)
+    state = State(base="BTC", total_base=10, total_quote=100000)
+    client = BacktestExchangeAssetClient(
+        state, fee_limit_order=0.0015, fee_market_order=0.0025
+    )
+
+    # Act & Assert
+    for _ in range(300):
+        price = rng.uniform(9000, 11000)
+        client.update_current_candle(
+            pd.Series({"low": price * 0.99, "high": price * 1.01, "close": price})
+        )
+        client.update_state()
+        action = rng.random()
+        if action < 0.3:
+            client.place_limit_buy_order("BTC", price * rng.uniform(0.9, 1), 100)
+        elif action < 0.6:
+            client.place_limit_sell_order("BTC", price * rng.uniform(1, 1.1), 0.01)
+        elif action < 0.7:
+            client.place_market_buy_order("BTC", 50)
+        elif action < 0.8:
+            client.place_market_sell_order("BTC", 0.005)
+        elif state.open_orders:
+            client.cancel_order(rng.choice(state.open_orders))
+        assert_index_matches_orders(state)
+
+
+def test_state_index_is_rebuilt_after_unpickling_and_direct_changes_to_orders():
+    # Arrange
+    state = State(base="BTC", total_base=1, total_quote=1000)
+    client = BacktestExchangeAssetClient(
+        state, fee_limit_order=0.0015, fee_market_order=0.0025
+    )
+    order = client.place_limit_buy_order("BTC", 100, 50)
+    client.place_limit_sell_order("BTC", 200, 0.5)
+    pickled = pickle.loads(pickle.dumps(state))
+    pickled.__pydantic_private__ = None
+
+    # Act
+    state.orders.append(order.model_copy(update={"order_id": "appended"}))
+    copied_state = state.model_copy()
+    copied_state.orders = state.orders[1:]
+
+    # Assert
+    assert pickled.quote_on_hold == 50
+    assert pickled.get_order(order.order_id).limit_price == 100
+    assert_index_matches_orders(pickled)
+    assert_index_matches_orders(state)
+    assert_index_matches_orders(copied_state)
+    assert state.get_order("appended").status == "open"
+    assert copied_state.quote_on_hold == 50
+
+
+def test_closed_order_archive_keeps_counters_and_orders():
+    # Arrange
+    rng = random.Random(11)
+    state = State(base="BTC", total_base=10, total_quote=100000)
+    archived_state = State(base="BTC", total_base=10, total_quote=100000)
+    archived_state.enable_closed_order_archive(max_closed_orders=5)
+    clients = [
+        BacktestExchangeAssetClient(s, fee_limit_order=0.0015, fee_market_order=0.0025)
+        for s in (state, archived_state)
+    ]
+
+    # Act
+    for _ in range(200):
+        price = rng.uniform(9000, 11000)
+        amount = rng.uniform(10, 100)
+        for client in clients:
+            client.update_current_candle(
+                pd.Series({"low": price * 0.99, "high": price * 1.01, "close": price})
+            )
+            client.update_state()
+            client.place_limit_buy_order("BTC", price * 0.995, amount)
+            client.place_market_buy_order("BTC", amount)
+            if len(client.state.open_orders) > 3:
+                client.cancel_order(client.state.open_orders[0])
+    unpickled_state = pickle.loads(pickle.dumps(archived_state))
+
+    # Assert
+    assert len(archived_state.orders) <= len(archived_state.open_orders) + 6
+    assert len(archived_state.closed_order_archive) > 100
+    for s in (archived_state, unpickled_state):
+        assert s.number_of_transactions == state.number_of_transactions
+        assert math.isclose(s.total_fee_paid, state.total_fee_paid)
+        assert s.quote_available == state.quote_available
+        assert [o.limit_price for o in s.open_orders] == [
+            o.limit_price for o in state.open_orders
+        ]
+        assert sorted(o.fee for o in s.filled_orders) == sorted(
+            o.fee for o in state.filled_orders
+        )
+        assert len(s.cancelled_orders) == len(state.cancelled_orders)
+    order = archived_state.filled_orders[0]
+    assert order not in archived_state.orders
+    assert archived_state.get_order(order.order_id) == order
+
+
+def test_state_equality_ignores_the_index():
+    # Arrange
+    state = State(base="BTC", total_base=10, total_quote=100000)
+    other_state = State(base="BTC", total_base=10, total_quote=100000)
+    client = BacktestExchangeAssetClient(
+        state, fee_limit_order=0.0015, fee_market_order=0.0025
+    )
+    client.place_limit_buy_order("BTC", 9000, 100)
+    other_state.orders = [state.orders[0].model_copy()]
+
+    # Act
+    state.quote_available
+
+    # Assert
+    assert state == other_state
+    other_state.total_quote = 0
+    assert state != other_state
+
+
+def test_filled_maker_order_keeps_the_reported_fill():
+    # Arrange
+    state = State(base="BTC", total_base=1, total_quote=1000)
+    client = BacktestExchangeAssetClient(
+        state, fee_limit_order=0.0015, fee_market_order=0.0025
+    )
+    order = client.place_limit_sell_order("BTC", 200, 0.5)
+    filled_order = order.model_copy(
+        update={
+            "status": "filled",
+            "on_hold": 0,
+            "time_filled": 1700000000,
+            "filled": 0.5,
+            "filled_quote": 100.0,
+            "fee": 0.15,
+        }
+    )
+
+    # Act
+    state.process_filled_order(filled_order)
+
+    # Assert
+    stored_order = state.get_order(order.order_id)
+    assert stored_order.status == "filled"
+    assert stored_order.time_filled == 1700000000
+    assert stored_order.filled == 0.5
+    assert stored_order.filled_quote == 100.0
+    assert stored_order.fee == 0.15
+    assert state.total_quote == 1000 + 100.0 - 0.15
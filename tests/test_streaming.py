@@ -0,0 +1,54 @@
+import os
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+import pytest
+from conftest import RSIStrategy, get_executor
+from pandas.core.frame import DataFrame as PandasDataFrame
+
+from dijkies.exceptions import DataTimeWindowShorterThanSuggestedAnalysisWindowError
+from dijkies.streaming import read_candle_chunks, stream_backtest
+
+
+def test_stream_backtest_matches_backtest(
+    candle_df: PandasDataFrame, tmp_path: Path
+) -> None:
+    # arrange
+
+    output_path = tmp_path / "performance.csv"
+    chunks = read_candle_chunks(
+        os.path.join("tests", "fixtures", "candle_df.csv"), chunksize=200
+    )
+
+    # act
+
+    stream_backtest(RSIStrategy(get_executor(), 35, 65), chunks, output_path)
+
+    result = pd.read_csv(output_path)
+    expected = RSIStrategy(get_executor(), 35, 65).backtest(candle_df)
+
+    # assert
+
+    assert list(result.columns) == list(expected.columns)
+    assert len(result) == len(expected)
+    numeric_columns = expected.select_dtypes("number").columns
+    assert np.allclose(result[numeric_columns], expected[numeric_columns])
+
+
+def test_stream_backtest_raises_when_history_is_shorter_than_lookback(
+    candle_df: PandasDataFrame, tmp_path: Path
+) -> None:
+    # arrange
+
+    output_path = tmp_path / "performance.csv"
+    chunks = [candle_df.iloc[:100], candle_df.iloc[100:200]]
+
+    # act
+
+    with pytest.raises(DataTimeWindowShorterThanSuggestedAnalysisWindowError):
+        stream_backtest(RSIStrategy(get_executor(), 35, 65), chunks, output_path)
+
+    # assert
+
+    assert not output_path.exists()
@@ -0,0 +1,145 @@
+from collections import deque
+
+import numpy as np
+import pandas as pd
+from conftest import GridStrategy
+from pandas.core.frame import DataFrame as PandasDataFrame
+
+from dijkies.entities import Order, State
+from dijkies.executors import BacktestExchangeAssetClient
+from dijkies.trades import round_trips, trade_statistics
+
+
+def fifo_round_trips(orders: list[Order], initial_base: float) -> list[tuple]:
+    lots = deque([[initial_base, None]]) if initial_base else deque()
+    trips = []
+    for order in sorted(orders, key=lambda o: o.time_filled):
+        if order.side == "buy":
+            lots.append([order.filled, order])
+            continue
+        remaining = order.filled
+        while remaining > 1e-12 and lots:
+            lot = lots[0]
+            amount = min(lot[0], remaining)
+            if lot[1] is not None:
+                trips.append((lot[1].order_id, order.order_id, amount))
+            lot[0] -= amount
+            remaining -= amount
+            if lot[0] <= 1e-12:
+                lots.popleft()
+    return trips
+
+
+def get_state() -> State:
+    return State(base="BTC", total_base=0.005, total_quote=10000)
+
+
+def get_grid_strategy(candle_df: PandasDataFrame) -> GridStrategy:
+    strategy = GridStrategy(BacktestExchangeAssetClient(get_state(), 0.0025, 0.0015))
+    strategy.backtest(candle_df)
+    return strategy
+
+
+def test_round_trips_match_fifo_matching(candle_df: PandasDataFrame) -> None:
+    # arrange
+
+    strategy = get_grid_strategy(candle_df)
+    filled_orders = strategy.state.filled_orders
+    initial_base = get_state().total_base
+
+    # act
+
+    trips = round_trips(strategy.state)
+
+    # assert
+
+    expected = fifo_round_trips(filled_orders, initial_base)
+    assert len(trips) > 50
+    assert list(trips.buy_order_id) == [trip[0] for trip in expected]
+    assert list(trips.sell_order_id) == [trip[1] for trip in expected]
+    np.testing.assert_allclose(trips.amount, [trip[2] for trip in expected])
+    assert (trips.holding_time >= 0).all()
+
+    orders = {order.order_id: order for order in filled_orders}
+    first = trips.iloc[0]
+    buy, sell = orders[first.buy_order_id], orders[first.sell_order_id]
+    expected_pnl = (
+        first.amount * (sell.filled_quote / sell.filled - buy.filled_quote / buy.filled)
+        - buy.fee * first.amount / buy.filled
+        - sell.fee * first.amount / sell.filled
+    )
+    assert np.isclose(first.pnl, expected_pnl)
+
+
+def test_round_trips_read_the_closed_order_archive(candle_df: PandasDataFrame) -> None:
+    # arrange
+
+    strategy = get_grid_strategy(candle_df)
+    state = get_state()
+    state.enable_closed_order_archive(max_closed_orders=10)
+    archived_strategy = GridStrategy(BacktestExchangeAssetClient(state, 0.0025, 0.0015))
+    archived_strategy.backtest(candle_df)
+
+    # act
+
+    trips = round_trips(archived_strategy.state)
+
+    # assert
+
+    expected = round_trips(strategy.state)
+    columns = ["amount", "buy_price", "sell_price", "fees", "pnl", "holding_time"]
+    assert archived_strategy.state.closed_order_archive.size > 0
+    pd.testing.assert_frame_equal(trips[columns], expected[columns])
+
+
+def test_trade_statistics() -> None:
+    # arrange
+
+    trips = pd.DataFrame(
+        {
+            "time_opened": [0, 10, 50],
+            "time_closed": [20, 30, 60],
+            "holding_time": [20, 20, 10],
+            "fees": [1.0, 1.0, 1.0],
+            "pnl": [10.0, -5.0, 15.0],
+        }
+    )
+
+    # act
+
+    statistics = trade_statistics(trips, start_time=0, end_time=100)
+
+    # assert
+
+    assert statistics["number_of_round_trips"] == 3
+    assert statistics["total_pnl"] == 20
+    assert statistics["win_rate"] == 2 / 3
+    assert statistics["profit_factor"] == 5
+    assert statistics["exposure"] == 0.4
+    assert statistics["total_fees"] == 3
+
+
+def test_round_trips_drop_sells_before_the_first_buy() -> None:
+    # arrange
+
+    state = State(base="BTC", total_base=1, total_quote=10000)
+    executor = BacktestExchangeAssetClient(state, 0.0025, 0.0015)
+    start = pd.Timestamp("2024-01-01", tz="UTC")
+    executor.update_current_candle(pd.Series({"time": start, "close": 100.0}))
+    executor.place_market_sell_order("BTC", 0.5)
+    hour_later = start + pd.Timedelta(hours=1)
+    executor.update_current_candle(pd.Series({"time": hour_later, "close": 90.0}))
+    executor.place_market_buy_order("BTC", 45)
+    executor.place_market_sell_order("BTC", 0.8)
+
+    # act
+
+    trips = round_trips(state.filled_orders)
+
+    # assert
+
+    expected = fifo_round_trips(state.filled_orders, 0.0)
+    assert list(trips.buy_order_id) == [trip[0] for trip in expected]
+    assert list(trips.sell_order_id) == ["backtest-2"]
+    np.testing.assert_allclose(trips.amount, [trip[2] for trip in expected])
+    assert (trips.holding_time >= 0).all()
@@ -0,0 +1,49 @@
+import numpy as np
+import pandas as pd
+from conftest import get_executor
+from pandas.core.frame import DataFrame as PandasDataFrame
+from pandas.core.series import Series as PandasSeries
+
+from dijkies.interfaces import ExchangeAssetClient, SignalStrategy
+from dijkies.vectorized import effective_trades
+
+
+class MeanReversionStrategy(SignalStrategy):
+    analysis_dataframe_size_in_minutes = 60 * 24 * 30
+
+    def __init__(self, executor: ExchangeAssetClient, window: int) -> None:
+        self.window = window
+        super().__init__(executor)
+
+    def generate_signals(self, data: PandasDataFrame) -> PandasSeries:
+        mean = data.close.rolling(self.window).mean()
+        return pd.Series(
+            np.where(data.close < mean * 0.98, 1, np.where(data.close > mean, -1, 0)),
+            index=data.index,
+        )
+
+
+def test_effective_trades_skips_repeated_signals() -> None:
+    # act
+
+    positions, sides = effective_trades(np.array([0, 1, 1, 0, -1, -1, 1, 0]))
+
+    # assert
+
+    assert positions.tolist() == [1, 4, 6]
+    assert sides.tolist() == [1, -1, 1]
+
+
+def test_vectorized_backtest_matches_backtest(candle_df: PandasDataFrame) -> None:
+    # act
+
+    expected = MeanReversionStrategy(get_executor(), 24).backtest(candle_df)
+    result = MeanReversionStrategy(get_executor(), 24).vectorized_backtest(candle_df)
+
+    # assert
+
+    assert list(result.columns) == list(expected.columns)
+    assert expected.number_of_transactions.iloc[-1] > 0
+    assert result.number_of_transactions.equals(expected.number_of_transactions)
+    assert np.allclose(result.total_value_strategy, expected.total_value_strategy)
+    assert np.allclose(result.total_fee_paid, expected.total_fee_paid)
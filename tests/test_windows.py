@@ -0,0 +1,72 @@
+import numpy as np
+import pandas as pd
+import pytest
+from conftest import RSIStrategy, WindowRSIStrategy, get_executor
+from pandas.core.frame import DataFrame as PandasDataFrame
+
+from dijkies.windows import (
+    CandleWindow,
+    rolling_window_bounds,
+    simulation_start_position,
+    time_to_int64,
+)
+
+
+def test_rolling_window_bounds_match_time_mask() -> None:
+    # arrange
+
+    time = pd.Series(pd.date_range("2025-01-01", periods=100, freq="h", tz="UTC"))
+    lookback_in_minutes = 60 * 5
+
+    # act
+
+    times = time_to_int64(time)
+    first_position = simulation_start_position(times, lookback_in_minutes)
+    starts, ends = rolling_window_bounds(times, lookback_in_minutes)
+
+    # assert
+
+    assert first_position == 5
+    for position in range(first_position, len(time)):
+        current_time = time.iloc[position]
+        mask = (time >= current_time - pd.Timedelta(minutes=lookback_in_minutes)) & (
+            time <= current_time
+        )
+        assert list(time.index[mask]) == list(range(starts[position], ends[position]))
+
+
+def test_candle_window_is_read_only_view(candle_df: PandasDataFrame) -> None:
+    # arrange
+
+    candles = CandleWindow.from_dataframe(candle_df)
+
+    # act
+
+    window = candles.window(10, 20)
+    window["double_close"] = window.close * 2
+
+    # assert
+
+    assert len(window) == 10
+    assert np.shares_memory(window.close, candles.close)
+    assert not window.close.flags.writeable
+    with pytest.raises(ValueError):
+        window.close[0] = 1.0
+    assert np.allclose(candles.double_close[10:20], candle_df.close[10:20] * 2)
+    assert window.to_dataframe().time.equals(
+        candle_df.time.iloc[10:20].reset_index(drop=True)
+    )
+
+
+def test_backtest_with_candle_window_matches_dataframe(
+    candle_df: PandasDataFrame,
+) -> None:
+    # act
+
+    expected = RSIStrategy(get_executor(), 35, 65).backtest(candle_df)
+    result = WindowRSIStrategy(get_executor(), 35, 65).backtest(candle_df)
+
+    # assert
+
+    assert np.allclose(result.total_value_strategy, expected.total_value_strategy)
+    assert result.number_of_transactions.equals(expected.number_of_transactions)